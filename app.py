@@ -1,22 +1,28 @@
 # app.py
+import json
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pydeck as pdk
 import streamlit as st
-import matplotlib.pyplot as plt
-import io
-
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer,
-    Table, TableStyle, Image
-)
-from reportlab.lib.units import inch
 
 # Import fungsi proses data dan dictionary info area
-from utils.analysis import process_all_data, area_info_for_app
-
-# Matplotlib backend for Streamlit compatibility
-plt.switch_backend('Agg')
+from utils.analysis import (
+    run_analysis, data_fingerprint, kecamatan_fingerprints,
+    subset_area_info, prefetch_in_background, load_buildings,
+)
+from utils.catalog import catalog_area_info, catalog_index, update_catalog
+from utils.centroid_store import DEFAULT_STORE_DIR, open_store
+from utils.results_store import DEFAULT_OUTPUT_DIR, read_results
+# Fungsi grafik & laporan PDF (dengan render cache)
+from utils.report import get_rekomendasi, pie_chart_png, som_bar_png, pdf_report_bytes, render_cache
+from utils.profiling import CAPTURE_MODES, Profiler
+from utils.region_query import METRICS, RegionQuery, build_region_table
+from utils.snapshots import DEFAULT_SNAPSHOT_DIR, diff_snapshots, growth_table, list_snapshots, load_snapshot
+from utils.scenario import region_arrays, scenario_grid, sweep_scenarios, scenario_summary, scenario_kecamatan_table
+from utils.tiles import DEFAULT_MAX_CELLS, build_tiles, read_tiles, select_tiles
 
 
 # --------------------------------------------------
@@ -45,179 +51,93 @@ h1,h2,h3,h4 { color: #FFD700; font-family:'Bebas Neue',sans-serif; letter-spacin
 # --------------------------------------------------
 # LOAD DATA
 # --------------------------------------------------
-with st.spinner("🔄 Memuat dan memproses data dari semua area..."):
-    all_kecamatan_dfs = process_all_data(area_info_for_app)
-
-if not all_kecamatan_dfs:
-    st.error("❌ Gagal memuat data untuk semua kecamatan yang dikonfigurasi. Mohon cek folder data dan konfigurasi di analysis.py.")
-    st.stop()
-
-# --------------------------------------------------
-# HELPER FUNCTIONS
-# --------------------------------------------------
-def get_rekomendasi(row):
-    kategori = row["kategori_potensi"]
-    som = row["SOM"]
-    sam = row["SAM"]
-
-    # === Mempersingkat teks rekomendasi lebih jauh ===
-    if som > 0:
-        if "High Potential" in kategori:
-            return ("Promosi/Perluas Cover" # Sangat singkat
-                    if som < sam * 0.6 else "Performa Baik") # Sangat singkat
-        elif "Low Potential" in kategori:
-             return "Strategi Lokal/Beda" # Sangat singkat
+# Data dimuat secara lazy: selector diisi dari listing folder saja, dan data satu
+# kecamatan baru dibaca saat kecamatan itu pertama kali dipilih.
+PREFETCH_NEIGHBOURS = True  # Hangatkan cache kecamatan sebelah/sesudah di latar belakang
+
+@st.cache_data(ttl=60)
+def load_catalog():
+    # Indeks katalog diperbarui inkremental (hanya os.stat), sehingga folder kecamatan atau
+    # kabupaten baru muncul di selector tanpa restart dan tanpa membuka GeoJSON
+    return update_catalog()
+
+area_info_for_app = catalog_area_info(load_catalog())
+
+def load_directory_index(area_info):
+    return catalog_index(load_catalog(), area_info)
+
+@st.cache_data(ttl=600)
+def load_precomputed():
+    return read_results()
+
+@st.cache_data(ttl=600)
+def load_kecamatan(area, kecamatan, fingerprint, odp_capacity=16):
+    # Pakai hasil pra-hitung dari `python -m utils.cli run` jika masih sesuai data di disk,
+    # jika tidak hitung langsung (tetap memakai cache ingestion di disk)
+    precomputed = load_precomputed()
+    if (precomputed is not None
+            and precomputed["meta"].get("kecamatan_fingerprints", {}).get(kecamatan) == fingerprint
+            and precomputed["meta"].get("odp_capacity") == odp_capacity
+            and precomputed["meta"].get("dedup", False)
+            and precomputed["meta"].get("weights") is None
+            and kecamatan in precomputed["results"]):
+        return {
+            "results": {kecamatan: precomputed["results"][kecamatan]},
+            "diagnostics": [d for d in precomputed["diagnostics"] if d.get("kecamatan") == kecamatan],
+        }
+    # Kepemilikan bangunan perbatasan ditentukan terhadap seluruh region, sama seperti run penuh
+    return run_analysis(subset_area_info(area_info_for_app, area, [kecamatan]), odp_capacity,
+                        store_dir=DEFAULT_STORE_DIR, dedup_region=area_info_for_app)
+
+def load_region_results(areas):
+    # Muat (lazy, per kecamatan ter-cache) semua kecamatan pada area terpilih
+    index = load_directory_index(area_info_for_app)
+    results = {}
+    for area in areas:
+        for kec in sorted(index.get(area, {})):
+            sel_info = subset_area_info(area_info_for_app, area, [kec])
+            results.update(load_kecamatan(area, kec, data_fingerprint(sel_info))["results"])
+    return results
+
+@st.cache_resource(ttl=600)
+def load_region_query(fingerprint):
+    # Tabel region (Categorical + urutan per metrik) disusun sekali per versi data,
+    # setiap rerun hanya menjalankan query di atasnya
+    areas = list(area_info_for_app)
+    return RegionQuery(build_region_table(load_region_results(areas), area_info_for_app))
+
+@st.cache_data(ttl=60)
+def load_growth():
+    return list_snapshots(DEFAULT_SNAPSHOT_DIR), growth_table(DEFAULT_SNAPSHOT_DIR)
+
+@st.cache_data(ttl=600)
+def load_snapshot_diff(old_path, new_path):
+    return diff_snapshots(load_snapshot(old_path), load_snapshot(new_path))
+
+@st.cache_data(ttl=600)
+def load_tiles(fingerprint):
+    # Piramida grid dari `python -m utils.cli tiles` jika masih sesuai data, jika tidak dibangun
+    # dari centroid store (atau cache ingestion) dengan overlay SAM/SOM dari alokasi
+    tiles = read_tiles(DEFAULT_OUTPUT_DIR)
+    if tiles is not None and tiles["meta"].get("data_fingerprint") == fingerprint:
+        return tiles
+    store = open_store(DEFAULT_STORE_DIR)
+    if store is not None and store.meta.get("kecamatan_fingerprints") == kecamatan_fingerprints(area_info_for_app):
+        buildings = store.buildings()
     else:
-        return "Tidak Prioritas" # Sangat singkat
-    # === Akhir Persingkatan ===
-
-
-def plot_market_pie_agg(df):
-    total_hp = df["homepass"].sum()
-    total_sam = df["SAM"].sum()
-    total_som = df["SOM"].sum()
-
-    labels = ["Homepass","SAM","SOM"]
-    values = [total_hp, total_sam, total_som]
-    colors_pie = ["#6EC1E4","#FFD700","#FF5733"]
-
-    if sum(values) == 0:
-        fig, ax = plt.subplots(figsize=(6,6)) # Ukuran sama
-        ax.text(0.5, 0.5, "Tidak Ada Data > 0", horizontalalignment='center', verticalalignment='center', transform=ax.transAxes, color="white")
-        ax.axis('off')
-        return fig
-
-    # === Ukuran Figure untuk Streamlit UI - Pie Chart ===
-    fig, ax = plt.subplots(figsize=(6,6)) # Square figure for pie chart
-
-    pie_values = [v for v in values if v > 0]
-    pie_labels_for_slices = [labels[i] for i, v in enumerate(values) if v > 0]
-    pie_colors = [colors_pie[i] for i, v in enumerate(values) if v > 0]
-
-    if pie_values:
-        total_sum_all = sum(values)
-        percentages_all = [v / total_sum_all * 100 for v in values]
-
-        wedges, texts = ax.pie(pie_values,
-                               startangle=140,
-                               colors=pie_colors) # Tidak pakai autopct di sini
-
-        ax.axis("equal")
-
-        full_legend_labels = [f"{l}: {v} ({percentages_all[i]:.1f}%)" for i, (l, v) in enumerate(zip(labels, values))]
-
-        # Add legend outside (seperti screenshot)
-        ax.legend(wedges, full_legend_labels, loc="center left", bbox_to_anchor=(1,0.5), fontsize=8)
-
-    else:
-        fig, ax = plt.subplots(figsize=(6,6)) # Ukuran sama
-        ax.text(0.5, 0.5, "Data Nol", horizontalalignment='center', verticalalignment='center', transform=ax.transAxes, color="white")
-        ax.axis('off')
-
-    plt.tight_layout()
-    return fig
-
-
-def create_pdf_report_kecamatan(area, kecamatan, df):
-    buf = io.BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=letter,
-                            leftMargin=40, rightMargin=40,
-                            topMargin=60, bottomMargin=40)
-    styles = getSampleStyleSheet()
-    styles['Title'].fontName = 'Helvetica-Bold'
-    styles['Heading2'].fontName = 'Helvetica-Bold'
-    styles['Heading4'].fontName = 'Helvetica-Bold'
-    styles['BodyText'].fontName = 'Helvetica'
-
-    elems = []
-
-    elems.append(Paragraph("Kapten Naratel – Laporan Pasar Homepass", styles['Title']))
-    elems.append(Paragraph(f"Area {area} - Kecamatan {kecamatan.title()}", styles['Heading2']))
-    elems.append(Spacer(1, 12))
-
-    intro = (
-        f"Ringkasan potensi pasar Homepass untuk semua kelurahan "
-        f"di Kecamatan <b>{kecamatan.title()}</b> (Area <b>{area}</b>)."
-    )
-    elems.append(Paragraph(intro, styles['BodyText']))
-    elems.append(Spacer(1, 12))
-
-    table_data = [["Ranking", "Kelurahan", "Homepass", "ODP", "SAM", "SOM", "Kategori", "Rekomendasi"]]
-    for _, row in df.iterrows():
-        table_data.append([
-            row["ranking"],
-            row["kelurahan"],
-            row["homepass"],
-            row["ODP"],
-            row["SAM"],
-            row["SOM"],
-            row["kategori_potensi"],
-            get_rekomendasi(row) # Menggunakan rekomendasi yang sudah dipersingkat
-        ])
-
-    # === Sesuaikan lebar kolom untuk rekomendasi yang SANGAT singkat ===
-    # Sesuaikan proporsi total lebar agar pas di halaman letter
-    col_widths = [0.4*inch, 1.4*inch, 0.7*inch, 0.6*inch, 0.7*inch, 0.7*inch, 1*inch, 1.3*inch] # Rekomendasi lebih pendek
-    total_width_target = 7.5 * inch
-    total_current_width = sum(col_widths)
-    if total_current_width > 0:
-         col_widths_scaled = [w * (total_width_target / total_current_width) for w in col_widths]
-    else:
-         col_widths_scaled = [total_width_target / len(col_widths)] * len(col_widths)
-
-
-    tbl = Table(table_data, colWidths=col_widths_scaled)
-    tbl.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#FFD700")),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('ALIGN', (1,1), (1,-1), 'LEFT'),
-        ('ALIGN', (6,1), (-1,-1), 'LEFT'), # Align Kategori ke kiri
-        ('ALIGN', (-1,1), (-1,-1), 'LEFT'), # Align Rekomendasi ke kiri
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0,0), (-1,-1), 7),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('ROWBACKGROUNDS',(0,1),(-1,-1),[colors.whitesmoke, colors.lightgrey]),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('WORDWRAP', (-1, 1), (-1, -1), True), # Pastikan word wrap aktif
-    ]))
-    elems.append(tbl)
-    elems.append(Spacer(1, 12))
-
-    buf_bar = io.BytesIO()
-    if not df.empty and "SOM" in df.columns and df["SOM"].sum() > 0:
-        # === Ukuran Figure untuk PDF - Bar Chart ===
-        fig_bar, ax = plt.subplots(figsize=(6,4)) # Bar chart rectangle
-        colors_bar = df["kategori_potensi"].apply(
-            lambda x: "#FFD700" if "High Potential" in x else ("#808080" if "Low Potential" in x else "#dc3545")
-        )
-        ax.bar(df["kelurahan"], df["SOM"], color=colors_bar)
-        ax.set_title("SOM per Kelurahan")
-        ax.set_ylabel("Jumlah SOM")
-        ax.tick_params(axis='x', labelsize=8)
-        plt.xticks(rotation=60, ha="right") # Rotasi 60 derajat
-        plt.tight_layout()
-        fig_bar.savefig(buf_bar, format="PNG", bbox_inches="tight")
-        plt.close(fig_bar)
-        buf_bar.seek(0)
-        elems.append(Paragraph("Grafik SOM per Kelurahan:", styles['Heading4']))
-        # === Ukuran Gambar di PDF agar sesuai Figure size ===
-        elems.append(Image(buf_bar, width=6*inch, height=4*inch)) # Ukuran gambar 6x4 inch
-        elems.append(Spacer(1, 12))
-    else:
-        elems.append(Paragraph("Tidak ada data SOM > 0 untuk grafik.", styles['BodyText']))
-        elems.append(Spacer(1, 12))
-
-    doc.build(elems)
-    buf.seek(0)
-    return buf
+        buildings = load_buildings(area_info_for_app)
+    return build_tiles(buildings, load_region_results(list(area_info_for_app)))
 
 
 # --------------------------------------------------
 # SIDEBAR NAVIGATION
 # --------------------------------------------------
 st.sidebar.title("🏡 Kapten Naratel")
-page = st.sidebar.radio("Pilih Halaman", ["Homepage", "Analisis Pasar"])
+PAGES = ["Homepage", "Analisis Pasar", "Peluang Region", "Simulasi Skenario", "Peta Kepadatan", "Pertumbuhan"]
+# Halaman diagnostik tersembunyi, dibuka lewat URL ...?diagnostics=1
+if st.query_params.get("diagnostics") == "1":
+    PAGES.append("Diagnostik")
+page = st.sidebar.radio("Pilih Halaman", PAGES)
 
 # --------------------------------------------------
 # HOMEPAGE
@@ -259,17 +179,16 @@ if page == "Homepage":
 # --------------------------------------------------
 # ANALISIS PASAR
 # --------------------------------------------------
-else:
+elif page == "Analisis Pasar":
     st.title("📍 Analisis Pasar Homepass Kapten Naratel")
 
     areas = list(area_info_for_app.keys())
     if not areas:
-         st.error("❌ Tidak ada area yang dikonfigurasi atau ditemukan data. Mohon cek `area_kecamatan_info` di `analysis.py`.")
+         st.error("❌ Tidak ada area yang dikonfigurasi atau ditemukan data. Mohon cek folder `data/` dan `config/wilayah.json`.")
     else:
         selected_area = st.selectbox("Pilih Area:", areas)
 
-        kecamatan_in_selected_area = list(area_info_for_app.get(selected_area, {}).keys())
-        kecamatan_in_selected_area = [k for k in kecamatan_in_selected_area if k in all_kecamatan_dfs]
+        kecamatan_in_selected_area = list(load_directory_index(area_info_for_app).get(selected_area, {}).keys())
 
         kecamatan_in_selected_area.sort()
 
@@ -277,7 +196,17 @@ else:
             st.warning(f"Tidak ada data kecamatan yang berhasil dimuat untuk Area {selected_area}. Mohon cek folder data dan konfigurasi di analysis.py.")
         else:
             sel_kec = st.selectbox("Pilih Kecamatan:", kecamatan_in_selected_area)
-            df_kec = all_kecamatan_dfs.get(sel_kec)
+            with st.spinner(f"🔄 Memuat data Kecamatan {sel_kec.title()}..."):
+                sel_info = subset_area_info(area_info_for_app, selected_area, [sel_kec])
+                kec_analysis = load_kecamatan(selected_area, sel_kec, data_fingerprint(sel_info))
+            for diag in kec_analysis["diagnostics"]:
+                (st.error if diag["level"] == "error" else st.warning)(diag["message"])
+            df_kec = kec_analysis["results"].get(sel_kec)
+
+            if PREFETCH_NEIGHBOURS:
+                idx = kecamatan_in_selected_area.index(sel_kec)
+                neighbours = kecamatan_in_selected_area[max(idx - 1, 0):idx] + kecamatan_in_selected_area[idx + 1:idx + 2]
+                prefetch_in_background(subset_area_info(area_info_for_app, selected_area, neighbours))
 
             if df_kec is None or df_kec.empty:
                  st.warning(f"Data untuk Kecamatan {sel_kec.title()} di Area {selected_area} tidak tersedia atau kosong.")
@@ -304,38 +233,264 @@ else:
                          left, right = st.columns(2) # Membagi ruang
                          with left:
                              st.markdown("#### 📊 Ringkasan Homepass, SAM, SOM (Kecamatan)")
-                             # Pie chart figure size set in plot_market_pie_agg
-                             fig_pie = plot_market_pie_agg(df_kec)
-                             if fig_pie: st.pyplot(fig_pie)
+                             # Pie chart figure size set in plot_market_pie_agg (PNG di-cache)
+                             st.image(pie_chart_png(df_kec))
 
                          with right:
                              st.markdown("#### 📶 SOM per Kelurahan")
                              if df_kec["SOM"].sum() > 0:
-                                 # === Bar chart figure size - sesuaikan dengan yang di PDF ===
-                                 fig_bar, ax = plt.subplots(figsize=(6,4)) # Figure size (lebar, tinggi)
-                                 colors_bar = df_kec["kategori_potensi"].apply(
-                                     lambda x: "#FFD700" if "High Potential" in x else ("#808080" if "Low Potential" in x else "#dc3545")
-                                 )
-                                 ax.bar(df_kec["kelurahan"], df_kec["SOM"], color=colors_bar)
-                                 ax.set_title("SOM per Kelurahan")
-                                 ax.set_ylabel("Jumlah SOM")
-                                 ax.tick_params(axis='x', labelsize=8)
-                                 plt.xticks(rotation=60, ha="right") # Rotasi 60 derajat untuk nama panjang
-                                 plt.tight_layout()
-                                 st.pyplot(fig_bar)
-                                 plt.close(fig_bar)
+                                 # === Bar chart sama dengan yang di PDF (PNG di-cache) ===
+                                 st.image(som_bar_png(df_kec))
                              else:
                                   st.info("Semua kelurahan di kecamatan ini memiliki SOM 0. Grafik SOM per Kelurahan tidak ditampilkan.")
 
                          st.subheader("📑 Unduh Laporan Kecamatan")
-                         pdf_buf = create_pdf_report_kecamatan(selected_area, sel_kec, df_kec)
+                         # PDF hanya dibangun ulang jika isi df_kec berubah (render cache)
+                         pdf_bytes = pdf_report_bytes(selected_area, sel_kec, df_kec)
                          st.download_button(
                              f"📥 Download PDF Laporan {selected_area} - {sel_kec.title()}",
-                             data=pdf_buf,
+                             data=pdf_bytes,
                              file_name=f"laporan_{selected_area.lower().replace(' ', '_')}_{sel_kec.lower()}.pdf", # Nama file PDF singkat
                              mime="application/pdf"
                          )
                     else:
                          st.warning(f"Data rinci untuk kelurahan '{sel_kel}' tidak ditemukan dalam DataFrame.")
                 else:
-                     st.warning(f"Tidak ada data kelurahan yang ditemukan untuk Kecamatan {sel_kec.title()} dalam DataFrame.")
\ No newline at end of file
+                     st.warning(f"Tidak ada data kelurahan yang ditemukan untuk Kecamatan {sel_kec.title()} dalam DataFrame.")
+
+
+# --------------------------------------------------
+# PELUANG REGION
+# --------------------------------------------------
+elif page == "Peluang Region":
+    st.title("🎯 Peluang Lintas Kecamatan")
+    st.markdown("Ranking kelurahan di seluruh region, dengan kategori dari persentil SOM tingkat region.")
+
+    with st.spinner("🔄 Menyusun tabel region..."):
+        query = load_region_query(data_fingerprint(area_info_for_app))
+    if not len(query):
+        st.warning("Tidak ada data kecamatan yang berhasil dimuat.")
+    else:
+        q1, q2, q3 = st.columns(3)
+        area_choice = q1.selectbox("Pilih Area:", ["Semua Area"] + list(query.table["area"].cat.categories))
+        area_sel = None if area_choice == "Semua Area" else area_choice
+        kec_options = sorted(query.table.loc[query.mask(area_sel), "kecamatan"].unique())
+        kec_sel = q2.multiselect("Kecamatan (kosong = semua):", kec_options) or None
+        n = q3.slider("Jumlah kelurahan (N)", 5, 50, 10, step=5)
+
+        mode = st.radio("Query:", ["Top N", "Gap Homepass-SAM terbesar", "ODP 0 & Homepass tinggi"], horizontal=True)
+        if mode == "Top N":
+            metric = st.selectbox("Urutkan berdasarkan:", METRICS, index=METRICS.index("SOM"))
+            hasil = query.top(metric, n, area_sel, kec_sel)
+        elif mode == "Gap Homepass-SAM terbesar":
+            hasil = query.largest_gap(n, area_sel, kec_sel)
+        else:
+            min_pct = st.slider("Persentil Homepass minimal (region)", 0, 95, 75, step=5)
+            hasil = query.zero_odp_high_homepass(min_pct / 100, n, area_sel, kec_sel)
+
+        if hasil.empty:
+            st.info("Tidak ada kelurahan yang memenuhi kriteria.")
+        else:
+            st.dataframe(hasil, use_container_width=True)
+            st.download_button("📥 Download hasil (CSV)", data=hasil.to_csv(index=False),
+                               file_name="peluang_region.csv", mime="text/csv")
+
+        st.subheader("Kategori Persentil Region")
+        st.dataframe(query.category_summary(area_sel, kec_sel), use_container_width=True)
+
+
+# --------------------------------------------------
+# SIMULASI SKENARIO
+# --------------------------------------------------
+elif page == "Simulasi Skenario":
+    st.title("🧪 Simulasi Skenario ODP, SAM & SOM")
+    st.markdown("Bandingkan banyak skenario kapasitas ODP, persentase SOM dan anggaran ODP sekaligus.")
+
+    index = load_directory_index(area_info_for_app)
+    area_choice = st.selectbox("Pilih Area:", ["Semua Area"] + list(index.keys()))
+    areas_sel = list(index.keys()) if area_choice == "Semua Area" else [area_choice]
+
+    c1, c2, c3 = st.columns(3)
+    capacities = c1.multiselect("Kapasitas ODP (Homepass/ODP)", [8, 16, 24, 32, 48, 64], default=[8, 16, 32])
+    som_min, som_max = c2.slider("Rentang SOM (% dari SAM)", 5, 80, (10, 50), step=5)
+    som_step = c2.number_input("Langkah SOM (%)", min_value=1, max_value=20, value=5)
+    budget_factors = c3.multiselect("Pengali Anggaran ODP (x ODP aktual)", [0.5, 0.75, 1.0, 1.5, 2.0, 3.0], default=[1.0, 1.5, 2.0])
+
+    if not capacities or not budget_factors:
+        st.warning("Pilih minimal satu kapasitas ODP dan satu pengali anggaran.")
+    else:
+        with st.spinner("🔄 Memuat data kecamatan..."):
+            region_results = load_region_results(areas_sel)
+        if not region_results:
+            st.warning("Tidak ada data kecamatan yang berhasil dimuat untuk area terpilih.")
+        else:
+            region = region_arrays(region_results, area_info_for_app)
+            som_rates = np.round(np.arange(som_min, som_max + 1e-9, som_step) / 100, 4)
+            grid = scenario_grid(capacities, som_rates, budget_factors)
+
+            t0 = time.perf_counter()
+            sweep = sweep_scenarios(region, grid)
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            st.caption(f"{len(grid)} skenario x {int(region['mask'].sum())} kelurahan dihitung dalam {elapsed_ms:.1f} ms")
+
+            summary = scenario_summary(sweep)
+            summary["som_rate"] = (summary["som_rate"] * 100).round(1)
+            summary = summary.rename(columns={
+                "odp_capacity": "Kapasitas ODP", "som_rate": "SOM (%)", "budget_factor": "Pengali Anggaran",
+                "total_odp": "Anggaran ODP", "high_potential": "Kelurahan High Potential",
+            })
+            st.subheader("📋 Ringkasan per Skenario")
+            st.dataframe(summary.sort_values("SOM", ascending=False), use_container_width=True)
+
+            st.subheader("🔍 Detail Skenario per Kecamatan")
+            d1, d2 = st.columns(2)
+            sel_kec = d1.selectbox("Pilih Kecamatan:", sorted(region["kecamatan"]))
+            sel_scen = d2.selectbox(
+                "Pilih Skenario:", list(range(len(grid))),
+                format_func=lambda i: (f"Kapasitas {grid.at[i, 'odp_capacity']} | SOM {grid.at[i, 'som_rate'] * 100:.0f}% "
+                                       f"| Anggaran x{grid.at[i, 'budget_factor']}"),
+            )
+            st.dataframe(scenario_kecamatan_table(sweep, sel_scen, sel_kec), use_container_width=True)
+
+
+# --------------------------------------------------
+# PETA KEPADATAN
+# --------------------------------------------------
+elif page == "Peta Kepadatan":
+    st.title("🗺️ Peta Kepadatan Homepass")
+    st.markdown("Jumlah bangunan per sel grid; ukuran sel menyesuaikan luas wilayah yang ditampilkan.")
+
+    index = load_directory_index(area_info_for_app)
+    m1, m2, m3 = st.columns(3)
+    area_choice = m1.selectbox("Pilih Area:", ["Semua Area"] + list(index.keys()))
+    kec_options = sorted(k for a, kecs in index.items() if area_choice in ("Semua Area", a) for k in kecs)
+    kec_choice = m2.selectbox("Pilih Kecamatan:", ["Semua Kecamatan"] + kec_options)
+    metric = m3.radio("Tampilkan:", ["homepass", "SAM", "SOM"], horizontal=True)
+
+    with st.spinner("🔄 Memuat grid kepadatan..."):
+        tiles = load_tiles(data_fingerprint(area_info_for_app))
+    cells = select_tiles(
+        tiles,
+        area=None if area_choice == "Semua Area" else area_choice,
+        kecamatan=None if kec_choice == "Semua Kecamatan" else kec_choice,
+        max_cells=DEFAULT_MAX_CELLS,
+    )
+    if cells.empty:
+        st.warning("Tidak ada bangunan untuk wilayah terpilih.")
+    else:
+        cell_size = float(cells["cell_size_m"].iloc[0])
+        values = cells[metric].to_numpy(dtype=float)
+        scaled = np.sqrt(values / values.max()) if values.max() > 0 else np.zeros(len(values))
+        cells["color"] = [[255, int(220 - 200 * v), int(120 - 100 * v), 40 + int(200 * v)] for v in scaled]
+        layer = pdk.Layer(
+            "GridCellLayer", cells, get_position=["lon", "lat"], cell_size=cell_size,
+            get_fill_color="color", extruded=False, pickable=True,
+        )
+        view = pdk.ViewState(
+            latitude=float(cells["lat"].mean()), longitude=float(cells["lon"].mean()),
+            zoom=float(np.clip(14 - np.log2(cell_size / 125), 8, 15)),
+        )
+        st.pydeck_chart(pdk.Deck(
+            layers=[layer], initial_view_state=view, map_style=None,
+            tooltip={"text": "Homepass: {homepass}\nSAM: {SAM}\nSOM: {SOM}"},
+        ))
+        st.caption(f"{len(cells)} sel @ {cell_size:g} m | Homepass {int(cells['homepass'].sum())}, "
+                   f"SAM {cells['SAM'].sum():.0f}, SOM {cells['SOM'].sum():.0f}")
+
+
+# --------------------------------------------------
+# PERTUMBUHAN
+# --------------------------------------------------
+elif page == "Pertumbuhan":
+    st.title("📈 Pertumbuhan Homepass")
+    st.markdown("Perubahan jumlah bangunan antar ekspor OSM, dari snapshot osm_id tiap run "
+                "(`python -m utils.cli run` atau `python -m utils.cli snapshot`).")
+
+    snapshots, growth = load_growth()
+    if len(snapshots) < 2:
+        st.info(f"Butuh minimal dua snapshot di `{DEFAULT_SNAPSHOT_DIR}/` untuk melihat pertumbuhan "
+                f"(saat ini {len(snapshots)}).")
+    else:
+        labels = {row.id: f"{row.id} {row.label}".strip() for row in snapshots.itertuples()}
+        g1, g2, g3 = st.columns(3)
+        area_choice = g1.selectbox("Pilih Area:", ["Semua Area"] + sorted(growth["area"].unique()))
+        old_id = g2.selectbox("Snapshot lama:", list(labels), index=len(labels) - 2, format_func=labels.get)
+        new_id = g3.selectbox("Snapshot baru:", list(labels), index=len(labels) - 1, format_func=labels.get)
+
+        if area_choice != "Semua Area":
+            growth = growth[growth["area"] == area_choice]
+        st.subheader("Homepass per Kecamatan")
+        trend = growth.pivot_table(index="id", columns="kecamatan", values="homepass", aggfunc="sum")
+        st.line_chart(trend)
+
+        paths = snapshots.set_index("id")["path"]
+        diff = load_snapshot_diff(paths[old_id], paths[new_id])
+        if area_choice != "Semua Area":
+            diff = diff[diff["area"] == area_choice]
+        d1, d2, d3 = st.columns(3)
+        d1.metric("➕ Ditambah", int(diff["ditambah"].sum()))
+        d2.metric("➖ Dihapus", int(diff["dihapus"].sum()))
+        d3.metric("📊 Selisih", int(diff["selisih"].sum()))
+
+        cols = ["sebelum", "sesudah", "ditambah", "dihapus", "selisih"]
+        st.subheader("Per Kecamatan")
+        per_kec = diff.groupby("kecamatan", as_index=False)[cols].sum().sort_values("selisih", ascending=False)
+        st.dataframe(per_kec, use_container_width=True)
+        kec_choice = st.selectbox("Detail kelurahan untuk kecamatan:", per_kec["kecamatan"])
+        st.dataframe(diff[diff["kecamatan"] == kec_choice][["kelurahan"] + cols], use_container_width=True)
+        st.download_button("📥 Download selisih (CSV)", data=diff.to_csv(index=False),
+                           file_name=f"growth_{old_id}_{new_id}.csv", mime="text/csv")
+
+
+# --------------------------------------------------
+# DIAGNOSTIK (tersembunyi)
+# --------------------------------------------------
+elif page == "Diagnostik":
+    st.title("🩺 Diagnostik Pipeline")
+    st.markdown("Profil waktu, byte, jumlah feature dan memori per tahap, per file dan per kecamatan.")
+
+    p1, p2 = st.columns(2)
+    capture = p1.selectbox("Mode capture:", CAPTURE_MODES, format_func=lambda m: m or "tanpa (waktu saja)")
+    cold = p2.checkbox("Cache ingestion kosong (baca ulang semua GeoJSON)")
+    with_reports = p2.checkbox("Ikut render grafik & PDF")
+
+    if st.button("▶️ Jalankan profil"):
+        with st.spinner("🔄 Menjalankan pipeline dengan instrumentasi..."):
+            with tempfile.TemporaryDirectory() as cold_cache:
+                kwargs = {"cache_dir": cold_cache, "workers": 1} if cold else {"store_dir": DEFAULT_STORE_DIR}
+                with Profiler(capture=capture) as prof:
+                    analysis = run_analysis(area_info_for_app, **kwargs)
+                    if with_reports:
+                        area_of = {kec: area for area, kecs in area_info_for_app.items() for kec in kecs}
+                        for kec, df in analysis["results"].items():
+                            pdf_report_bytes(area_of[kec], kec, df)
+                            pie_chart_png(df)
+                            if df["SOM"].sum() > 0:
+                                som_bar_png(df)
+        st.session_state["profile_report"] = prof.report()
+
+    report = st.session_state.get("profile_report")
+    if report is not None:
+        c1, c2, c3 = st.columns(3)
+        c1.metric("⏱️ Total", f"{report['total_seconds']:.3f} s")
+        c2.metric("🧩 Span", len(report["spans"]))
+        if report["peak_bytes"] is not None:
+            c3.metric("🧠 Puncak memori Python", f"{report['peak_bytes'] / 1e6:.1f} MB")
+        elif report["max_rss_bytes"] is not None:
+            c3.metric("🧠 Puncak RSS proses", f"{report['max_rss_bytes'] / 1e6:.1f} MB")
+
+        st.subheader("Per Tahap")
+        st.dataframe(pd.DataFrame(report["stages"]), use_container_width=True)
+        st.subheader("Per Kecamatan")
+        st.dataframe(pd.DataFrame(report["kecamatan"]), use_container_width=True)
+        with st.expander("Per File"):
+            spans = pd.DataFrame(report["spans"])
+            st.dataframe(spans[spans["stage"] == "ingest_file"].drop(columns=["depth"], errors="ignore"), use_container_width=True)
+        if report["cprofile"]:
+            st.subheader("cProfile (kumulatif)")
+            st.dataframe(pd.DataFrame(report["cprofile"]), use_container_width=True)
+        st.download_button("📥 Download profil (JSON)", data=json.dumps(report, indent=1, default=str),
+                           file_name="profile.json", mime="application/json")
+
+    st.subheader("Render Cache")
+    st.json(render_cache.stats())
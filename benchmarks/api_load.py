@@ -0,0 +1,141 @@
+# api_load.py
+# Uji beban API JSON (utils/api.py): N klien paralel dengan koneksi keep-alive mengirim
+# campuran endpoint (paginasi kelurahan, ranking, skenario), sebagian dengan If-None-Match.
+#
+# Jalankan dari root project (butuh hasil `python -m utils.cli run` di folder output):
+#     python benchmarks/api_load.py [--clients 16] [--seconds 10] [--revalidate 0.5]
+#     python benchmarks/api_load.py --url http://127.0.0.1:8765   # server yang sudah berjalan
+import argparse
+import http.client
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.api import HomepassApi, make_server
+from utils.results_store import DEFAULT_OUTPUT_DIR
+
+
+def _paths(snap):
+    """Campuran path yang mewakili pemakaian CRM / lembar perencanaan."""
+    paths = ["/v1/meta", "/v1/areas", "/v1/kecamatan", "/v1/scenarios?page_size=50",
+             "/v1/ranking/top?metric=SOM&n=20", "/v1/ranking/gap?n=20", "/v1/ranking/zero-odp?n=50"]
+    for area, kecamatan_list in snap.areas.items():
+        paths.append(f"/v1/kelurahan?area={quote(area)}&sort=SOM&page_size=50")
+        paths += [f"/v1/kelurahan?kecamatan={quote(kec)}" for kec in kecamatan_list[:5]]
+        paths.append(f"/v1/ranking/top?metric=homepass&n=10&area={quote(area)}")
+    pages = max(1, -(-len(snap.query) // 100))
+    paths += [f"/v1/kelurahan?page={p}&page_size=100" for p in range(1, min(pages, 20) + 1)]
+    if len(snap.scenarios):
+        kec = snap.sweep["region"]["kecamatan"][0]
+        paths += [f"/v1/scenarios/{i}?kecamatan={quote(kec)}" for i in range(0, len(snap.scenarios), max(1, len(snap.scenarios) // 10))]
+    return paths
+
+
+def _client(host, port, paths, deadline, revalidate, gzip, seed, out):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    etags, latencies, statuses, n_bytes = {}, [], {}, 0
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        headers = {"Accept-Encoding": "gzip"} if gzip else {}
+        if path in etags and rng.random() < revalidate:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            statuses["error"] = statuses.get("error", 0) + 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        n_bytes += len(body)
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+    conn.close()
+    out.append((latencies, statuses, n_bytes))
+
+
+def run_load(host, port, paths, clients, seconds, revalidate, gzip=True):
+    """Jalankan uji beban; kembalikan ringkasan throughput & latensi."""
+    deadline = time.perf_counter() + seconds
+    out = []
+    threads = [threading.Thread(target=_client, args=(host, port, paths, deadline, revalidate, gzip, i, out))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([np.asarray(lat) for lat, _, _ in out]) if out else np.zeros(0)
+    statuses = {}
+    for _, st, _ in out:
+        for code, n in st.items():
+            statuses[code] = statuses.get(code, 0) + n
+    p50, p95, p99 = (np.percentile(latencies, [50, 95, 99]) * 1000) if latencies.size else (0, 0, 0)
+    return {
+        "requests": int(latencies.size),
+        "req_per_s": latencies.size / elapsed,
+        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+        "mb_per_s": sum(b for _, _, b in out) / elapsed / 1e6,
+        "statuses": statuses,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban API JSON Homepass")
+    parser.add_argument("--url", default=None, help="Server yang sudah berjalan (default: server in-process di port acak)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil pra-hitung (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--clients", type=int, default=16, help="Jumlah klien paralel (default: 16)")
+    parser.add_argument("--seconds", type=float, default=10, help="Durasi per putaran (default: 10)")
+    parser.add_argument("--revalidate", type=float, default=0.5,
+                        help="Peluang klien mengirim If-None-Match untuk path yang ETag-nya sudah diketahui (default: 0.5)")
+    parser.add_argument("--no-gzip", action="store_true", help="Jangan kirim Accept-Encoding: gzip")
+    args = parser.parse_args(argv)
+
+    api = HomepassApi(args.output)
+    snap = api.snapshot()
+    paths = _paths(snap)
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = make_server(api, "127.0.0.1", 0)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{len(paths)} path, {args.clients} klien, {args.seconds:g} s per putaran -> http://{host}:{port}")
+    try:
+        # Putaran dingin mengisi cache respons server; putaran hangat mengukur kondisi tunak
+        for name in ("dingin", "hangat"):
+            r = run_load(host, port, paths, args.clients, args.seconds, args.revalidate, not args.no_gzip)
+            codes = ", ".join(f"{code}: {n}" for code, n in sorted(r["statuses"].items(), key=str))
+            print(f"{name:<7} {r['requests']:>7} request  {r['req_per_s']:>8.0f} req/s  "
+                  f"p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  p99 {r['p99_ms']:.1f} ms  "
+                  f"{r['mb_per_s']:.1f} MB/s  ({codes})")
+        if server is not None:
+            stats = api.responses.stats()
+            print(f"Cache respons: {stats['items']} item, {stats['bytes'] / 1e6:.1f} MB, "
+                  f"hit {stats['hits']}, miss {stats['misses']}")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# bench_ingest.py
+# Bandingkan pembacaan GeoJSON penuh (gpd.read_file) dengan pembaca bertahap
+# (count_features / read_feature_properties) untuk semua file di folder data.
+#
+# Jalankan dari root project:
+#     python benchmarks/bench_ingest.py [--data data] [--repeat 3]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geopandas as gpd
+
+from utils.geojson_stream import count_features, read_feature_properties
+
+
+def _time_call(func, repeat):
+    """Kembalikan (hasil, waktu terbaik dalam detik) dari beberapa pengulangan."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def _peak_python_memory(func):
+    """Puncak alokasi memori Python (byte) selama satu pemanggilan func."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion GeoJSON Homepass")
+    parser.add_argument("--data", default="data", help="Folder root data (default: data)")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan per metode")
+    args = parser.parse_args(argv)
+
+    files = sorted(
+        os.path.join(root, f)
+        for root, _, names in os.walk(args.data)
+        for f in names if f.lower().endswith(".geojson")
+    )
+    if not files:
+        print(f"Tidak ada file .geojson di {args.data}")
+        return 1
+
+    methods = {
+        "gpd.read_file": lambda p: len(gpd.read_file(p)),
+        "count_features": count_features,
+        "read_feature_properties": lambda p: read_feature_properties(p)["count"],
+    }
+    totals = {name: 0.0 for name in methods}
+    peaks = {name: 0 for name in methods}
+    total_bytes = 0
+
+    print(f"{'file':<60} {'MB':>6} {'features':>9} " + " ".join(f"{n:>24}" for n in methods))
+    for path in files:
+        size = os.path.getsize(path)
+        total_bytes += size
+        row = []
+        counts = set()
+        for name, func in methods.items():
+            count, elapsed = _time_call(lambda: func(path), args.repeat)
+            counts.add(count)
+            totals[name] += elapsed
+            peaks[name] = max(peaks[name], _peak_python_memory(lambda: func(path)))
+            row.append(f"{elapsed * 1000:>21.1f} ms")
+        flag = "" if len(counts) == 1 else "  !! jumlah berbeda"
+        print(f"{os.path.relpath(path, args.data)[:60]:<60} {size / 1e6:>6.2f} {counts.pop():>9} " + " ".join(row) + flag)
+
+    print()
+    print(f"Total {len(files)} file, {total_bytes / 1e6:.1f} MB")
+    baseline = totals["gpd.read_file"]
+    for name in methods:
+        print(
+            f"  {name:<24} {totals[name]:>7.2f} s  "
+            f"({baseline / totals[name]:>5.1f}x vs gpd.read_file, "
+            f"{total_bytes / 1e6 / totals[name]:>6.1f} MB/s, "
+            f"puncak memori Python {peaks[name] / 1e6:.1f} MB)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# bench_suite.py
+# Benchmark pipeline Homepass di atas data sintetis (benchmarks/synth_data.py) dengan ukuran
+# yang bisa diatur, dari satu kelurahan sampai skala provinsi. Setiap run ditambahkan ke
+# riwayat JSONL dan dibandingkan dengan run sebelumnya (preset & mesin sama) untuk regresi.
+#
+# Jalankan dari root project:
+#     python benchmarks/bench_suite.py --preset small
+#     python benchmarks/bench_suite.py --preset province --workers 8 --fail-on-regression 0.25
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synth_data import generate_region
+from utils.analysis import run_analysis
+from utils.profiling import Profiler
+from utils.report import pdf_report_bytes, pie_chart_png, render_cache, som_bar_png
+
+# (jumlah kecamatan, kelurahan per kecamatan, bangunan per kelurahan)
+PRESETS = {
+    "kelurahan": (1, 1, 2_000),
+    "small": (9, 5, 400),
+    "medium": (50, 10, 1_000),
+    "large": (150, 12, 1_000),
+    "province": (300, 12, 1_000),
+}
+
+DEFAULT_HISTORY = os.path.join("benchmarks", "history.jsonl")
+DEFAULT_DATA_DIR = os.path.join(".cache", "bench_data")
+
+# Selisih absolut minimal (detik) sebelum perlambatan dianggap regresi, agar noise kecil diabaikan
+_MIN_REGRESSION_SECONDS = 0.05
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ensure_dataset(data_dir, preset, seed):
+    """Buat data sintetis preset sekali saja; dipakai ulang jika parameter sama."""
+    params = {"preset": preset, "shape": PRESETS[preset], "seed": seed}
+    out_dir = os.path.join(data_dir, f"{preset}-{seed}")
+    manifest = os.path.join(out_dir, "bench_manifest.json")
+    if os.path.exists(manifest):
+        with open(manifest, "r", encoding="utf-8") as fh:
+            if json.load(fh).get("params") == json.loads(json.dumps(params)):
+                with open(os.path.join(out_dir, "area_info.json"), "r", encoding="utf-8") as info:
+                    return json.load(info), None
+    start = time.perf_counter()
+    area_info = generate_region(out_dir, *PRESETS[preset], seed=seed)
+    elapsed = time.perf_counter() - start
+    with open(manifest, "w", encoding="utf-8") as fh:
+        json.dump({"params": params}, fh)
+    return area_info, elapsed
+
+
+def _stage_seconds(report, *stages):
+    return sum(row["seconds"] for row in report["stages"] if row["stage"] in stages)
+
+
+def _best_of(repeat, func):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmarks(area_info, workers=None, repeat=3, render_kecamatan=5):
+    """Jalankan semua benchmark; kembalikan (results {nama: detik}, counts)."""
+    results, counts = {}, {}
+    files = [os.path.join(info["path"], f) for kecs in area_info.values() for info in kecs.values()
+             for f in os.listdir(info["path"]) if f.endswith(".geojson")]
+    counts["files"] = len(files)
+    counts["bytes"] = sum(os.path.getsize(f) for f in files)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Start dingin: cache ingestion kosong, semua GeoJSON dibaca
+        with Profiler() as cold:
+            analysis = run_analysis(area_info, cache_dir=cache_dir, workers=workers)
+        cold_report = cold.report()
+        results["e2e_cold"] = cold_report["total_seconds"]
+        results["ingest_cold"] = _stage_seconds(cold_report, "ingest")
+        counts["kecamatan"] = len(analysis["results"])
+        counts["buildings"] = int(analysis["dedup"]["kecamatan"]["homepass_mentah"].sum())
+
+        # Start hangat: hanya membaca artefak cache
+        results["e2e_warm"], _ = _best_of(repeat, lambda: run_analysis(area_info, cache_dir=cache_dir, workers=workers))
+        with Profiler() as warm:
+            run_analysis(area_info, cache_dir=cache_dir, workers=workers)
+        warm_report = warm.report()
+        results["ingest_warm"] = _stage_seconds(warm_report, "ingest")
+        for stage in ("dedup", "allocation", "ranking", "parse_name"):
+            results[stage] = _stage_seconds(warm_report, stage)
+
+    # Render grafik & PDF beberapa kecamatan tanpa render cache (memori kosong, disk sementara)
+    area_of = {kec: area for area, kecs in area_info.items() for kec in kecs}
+    render_cache.clear()
+    disk_dir = render_cache.disk_dir
+    with tempfile.TemporaryDirectory() as render_dir, Profiler() as render:
+        render_cache.disk_dir = render_dir
+        try:
+            for kec, df in list(analysis["results"].items())[:render_kecamatan]:
+                pie_chart_png(df)
+                som_bar_png(df)
+                pdf_report_bytes(area_of[kec], kec, df)
+        finally:
+            render_cache.disk_dir = disk_dir
+    render_report = render.report()
+    for stage in ("render_pie", "render_bar", "render_pdf"):
+        results[stage] = _stage_seconds(render_report, stage)
+    return results, counts
+
+
+def find_regressions(entry, history, threshold):
+    """Bandingkan dengan entry terakhir yang preset, parameter dan mesinnya sama."""
+    previous = next((h for h in reversed(history)
+                     if h["preset"] == entry["preset"] and h["params"] == entry["params"]
+                     and h["machine"] == entry["machine"]), None)
+    if previous is None:
+        return None, []
+    regressions = []
+    for name, seconds in entry["results"].items():
+        old = previous["results"].get(name)
+        if old and seconds > old * (1 + threshold) and seconds - old > _MIN_REGRESSION_SECONDS:
+            regressions.append((name, old, seconds))
+    return previous, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite pipeline Homepass (data sintetis)")
+    parser.add_argument("--preset", default="small", choices=sorted(PRESETS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan untuk benchmark hangat")
+    parser.add_argument("--render-kecamatan", type=int, default=5, help="Jumlah kecamatan untuk benchmark render")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help=f"File riwayat JSONL (default: {DEFAULT_HISTORY})")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Batas perlambatan relatif (default: 0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit code 1 jika ada regresi")
+    args = parser.parse_args(argv)
+
+    area_info, generate_seconds = ensure_dataset(args.data_dir, args.preset, args.seed)
+    results, counts = run_benchmarks(area_info, args.workers, args.repeat, args.render_kecamatan)
+
+    entry = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "preset": args.preset,
+        "params": {"shape": list(PRESETS[args.preset]), "seed": args.seed, "workers": args.workers,
+                   "repeat": args.repeat, "render_kecamatan": args.render_kecamatan},
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "counts": counts,
+        "generate_seconds": generate_seconds,
+        "results": results,
+    }
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history, "r", encoding="utf-8") as fh:
+            history = [json.loads(line) for line in fh if line.strip()]
+    previous, regressions = find_regressions(entry, history, args.threshold)
+    os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry) + "\n")
+
+    print(f"Preset {args.preset}: {counts['buildings']} bangunan, {counts['kecamatan']} kecamatan, "
+          f"{counts['files']} file ({counts['bytes'] / 1e6:.0f} MB)")
+    for name, seconds in results.items():
+        old = previous["results"].get(name) if previous else None
+        delta = f"  ({(seconds / old - 1) * 100:+.0f}%)" if old else ""
+        print(f"  {name:<12} {seconds:>9.3f} s{delta}")
+    for name, old, new in regressions:
+        print(f"REGRESI {name}: {old:.3f} s -> {new:.3f} s", file=sys.stderr)
+    print(f"Riwayat: {args.history}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,172 +1,431 @@
 # analysis.py
+import hashlib
+import logging
 import os
-import re
-import geopandas as gpd
+import threading
 import pandas as pd
 import numpy as np
-import streamlit as st
-
-# Dictionary lokasi folder dan alokasi ODP per kecamatan, dikelompokkan per area
-# Path sekarang relatif ke folder 'data' di root project
-# Menambahkan kecamatan Kabupaten Malang dengan ODP aktual dan path sesuai screenshot terakhir
-area_kecamatan_info = {
-    "Kota Malang": {
-        # Folder untuk Kota Malang langsung di dalam data
-        "lowokwaru":     {"path": os.path.join("data", "Lowokwaru"),      "total_odp": 329},
-        "blimbing":      {"path": os.path.join("data", "Blimbing"),       "total_odp": 42},
-        "klojen":        {"path": os.path.join("data", "Klojen"),         "total_odp": 40},
-        "kedungkandang": {"path": os.path.join("data", "Kedungkandang"),  "total_odp": 101},
-        # PERHATIAN: Nama folder Sukun di screenshot terakhir adalah 'Kecamatan Sukun'
-        "sukun":         {"path": os.path.join("data", "Kecamatan Sukun"), "total_odp": 5},
-    },
-    "Kabupaten Malang": {
-        # Folder untuk Kabupaten Malang langsung di dalam data (sesuai screenshot terakhir)
-        # Nama folder di disk tanpa "Kecamatan "
-        "dau":           {"path": os.path.join("data", "Dau"),           "total_odp": 242}, # ODP Aktual
-        "pakis":         {"path": os.path.join("data", "Pakis"),         "total_odp": 47},  # ODP Aktual
-        "pakisaji":      {"path": os.path.join("data", "Pakisaji"),      "total_odp": 0},   # ODP Aktual
-        "pujon":         {"path": os.path.join("data", "Pujon"),         "total_odp": 3}    # ODP Aktual
-    }
-}
 
-@st.cache_data(ttl=600)
-def process_all_data(area_kec_info: dict, odp_capacity: int = 16) -> dict:
+from utils.catalog import catalog_area_info, parse_kelurahan_name, update_catalog
+from utils.centroid_store import open_store
+from utils.dedup import building_keys, deduplicate, overlap_report
+from utils.ingest_cache import DEFAULT_CACHE_DIR
+from utils.parallel_ingest import ingest_files
+from utils.profiling import profile_stage, profiling_enabled, record_span
+from utils.weights import homepass_weights
+
+logger = logging.getLogger(__name__)
+
+_area_kecamatan_info = None
+_area_lock = threading.Lock()
+
+
+def get_area_kecamatan_info(refresh: bool = False) -> dict:
     """
-    Iterasi melalui area dan kecamatan dalam area_kec_info,
-    baca GeoJSON, hitung Homepass, alokasi ODP, SAM, SOM, kategori.
-    Kembalikan dict {nama_kecamatan: DataFrame} untuk SEMUA kecamatan.
+    Area/kecamatan yang ditemukan otomatis dari folder data (utils.catalog), dengan total_odp
+    per kecamatan dari config/wilayah.json. Kecamatan/kabupaten baru cukup ditambahkan sebagai
+    folder. Katalog dipindai saat pertama kali dipanggil (bukan saat modul di-import), lalu
+    hasilnya dipakai ulang; refresh=True memindai ulang.
     """
-    all_results = {}
+    global _area_kecamatan_info
+    with _area_lock:
+        if _area_kecamatan_info is None or refresh:
+            _area_kecamatan_info = catalog_area_info(update_catalog())
+        return _area_kecamatan_info
+
 
-    # Iterasi melalui setiap area
+def __getattr__(name):
+    # Nama lama `area_kecamatan_info` / `area_info_for_app` tetap bisa di-import, tetapi katalog
+    # baru dipindai saat nama itu benar-benar diakses
+    if name in ("area_kecamatan_info", "area_info_for_app"):
+        return get_area_kecamatan_info()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def hitung_potensi_kecamatan(data: list, total_odp: int, odp_capacity: int = 16) -> pd.DataFrame:
+    """
+    Dari list {"kelurahan", "homepass"} satu kecamatan, hitung alokasi ODP
+    (largest remainder), SAM, SOM, ranking dan kategori potensi.
+    """
+    df = pd.DataFrame(data)
+    total_homepass = df["homepass"].sum()
+
+    with profile_stage("allocation"):
+        # === START: Handle ODP=0 or Homepass=0 ===
+        if total_odp > 0 and total_homepass > 0:
+            df["odp_float"] = df["homepass"] / total_homepass * total_odp
+            df["odp_floor"] = np.floor(df["odp_float"]).astype(int)
+            df["sisa"] = df["odp_float"] - df["odp_floor"]
+            sisa_odp = total_odp - df["odp_floor"].sum()
+
+            df = df.sort_values(["sisa", "homepass"], ascending=[False, False]).reset_index(drop=True)
+            if sisa_odp > 0:
+                num_rows = len(df)
+                odp_to_add_count = min(sisa_odp, num_rows)
+                df.loc[:odp_to_add_count-1, "odp_floor"] += 1
+
+            df["ODP"] = df["odp_floor"]
+            df["SAM"] = df["ODP"] * odp_capacity
+            df["SOM"] = (df["SAM"] * 0.3).round(0).astype(int)
+            df = df.drop(columns=["odp_float", "odp_floor", "sisa"])
+
+        else:
+             #st.info(f"Total ODP ({total_odp}) atau Total Homepass ({total_homepass}) adalah 0 untuk {kecamatan.title()}. ODP, SAM, SOM akan diset 0.")
+             df["ODP"] = 0
+             df["SAM"] = 0
+             df["SOM"] = 0
+        # === END: Handle ODP=0 or Homepass=0 ===
+
+    with profile_stage("ranking"):
+        # === START: Ranking dan Kategori Potensi (Remove Emojis) ===
+        df = df.sort_values("SOM", ascending=False).reset_index(drop=True)
+        if df["SOM"].sum() == 0:
+             df["ranking"] = np.arange(1, len(df) + 1)
+             # Menghapus emoji
+             df["kategori_potensi"] = "Tidak Ada Potensi"
+        else:
+            df["ranking"] = df["SOM"].rank(method='min', ascending=False).astype(int)
+            mean_som = df["SOM"][df["SOM"] > 0].mean() if (df["SOM"] > 0).any() else 0
+            df["kategori_potensi"] = df["SOM"].apply(
+                # Menghapus emoji
+                lambda x: "High Potential" if x > mean_som and mean_som > 0 else ("Low Potential" if x > 0 else "Tidak Ada Potensi")
+            )
+        # === END: Ranking dan Kategori Potensi ===
+
+    return df[["ranking", "kelurahan", "homepass", "ODP", "SAM", "SOM", "kategori_potensi"]]
+
+
+def iter_kelurahan_files(area_kec_info: dict):
+    """
+    Yield (area, kecamatan, kelurahan, file_path) untuk semua file GeoJSON yang ada,
+    dengan urutan deterministik yang sama seperti run_analysis. Folder yang hilang dilewati.
+    """
     for area_name, kecamatan_list in area_kec_info.items():
-        # Iterasi melalui setiap kecamatan di dalam area
         for kecamatan_name, info in kecamatan_list.items():
             folder_path = info["path"]
-            total_odp   = info["total_odp"]
+            if not os.path.isdir(folder_path):
+                continue
+            for f in sorted(os.listdir(folder_path)):
+                if f.lower().endswith(".geojson"):
+                    yield area_name, kecamatan_name, parse_kelurahan_name(f, kecamatan_name), os.path.join(folder_path, f)
+
+
+def load_buildings(area_kec_info: dict, cache_dir: str = DEFAULT_CACHE_DIR, workers: int = None) -> dict:
+    """
+    Gabungkan kolom per bangunan dari semua file menjadi satu tabel region (dict of array):
+    lon, lat, osm_id, osm_type, building_code (indeks ke "building_categories") dan kelurahan_id
+    (indeks baris ke DataFrame "kelurahan" berisi area, kecamatan, kelurahan, file, homepass).
+    File yang gagal dibaca dilewati dan dicatat di "diagnostics".
+    """
+    files = list(iter_kelurahan_files(area_kec_info))
+    results = ingest_files([f[3] for f in files], "stream", cache_dir, workers)
+
+    diagnostics = []
+    rows, parts = [], []
+    for (area_name, kecamatan_name, kel, file_path), result in zip(files, results):
+        if result["error"] is not None:
+            _diagnostic(diagnostics, "warning", f"Gagal membaca file GeoJSON: {file_path} ({kecamatan_name.title()}) - {result['error']}. Lewati file ini.", kecamatan_name, file_path)
+            continue
+        rows.append({"area": area_name, "kecamatan": kecamatan_name, "kelurahan": kel,
+                     "file": file_path, "homepass": result["count"]})
+        parts.append(result["columns"])
+
+    categories = np.unique(np.concatenate([p["building_categories"] for p in parts])) if parts else np.array([], dtype=str)
+    building_code = [
+        np.searchsorted(categories, p["building_categories"])[p["building_code"]].astype(np.int16)
+        if len(p["building_code"]) else np.zeros(0, dtype=np.int16)
+        for p in parts
+    ]
+
+    def _concat(name, dtype):
+        return np.concatenate([p[name] for p in parts]).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+    return {
+        "lon": _concat("lon", np.float64),
+        "lat": _concat("lat", np.float64),
+        "osm_id": _concat("osm_id", np.int64),
+        "osm_type": _concat("osm_type", np.int8),
+        "building_code": np.concatenate(building_code) if parts else np.zeros(0, dtype=np.int16),
+        "building_categories": categories,
+        "kelurahan_id": np.repeat(np.arange(len(rows), dtype=np.int32), [r["homepass"] for r in rows]),
+        "kelurahan": pd.DataFrame(rows, columns=["area", "kecamatan", "kelurahan", "file", "homepass"]),
+        "diagnostics": diagnostics,
+    }
+
+
+def _diagnostic(diagnostics: list, level: str, message: str, kecamatan: str = None, file: str = None):
+    """Catat satu diagnostik terstruktur (level "error"/"warning") tanpa bergantung pada UI."""
+    diagnostics.append({"level": level, "kecamatan": kecamatan, "file": file, "message": message})
 
-            # Optional Debug: st.write(f"Processing {kecamatan_name.title()} from {area_name} (Folder: {folder_path})...")
 
-            if not os.path.exists(folder_path):
-                st.error(f"Folder data tidak ditemukan untuk {kecamatan_name.title()} di: `{folder_path}`. Lewati pemrosesan kecamatan ini.")
+def data_fingerprint(area_kec_info: dict) -> str:
+    """
+    Sidik jari murah (hanya os.stat) dari semua file GeoJSON yang dikonfigurasi.
+    Dipakai untuk memastikan hasil yang sudah dihitung sebelumnya masih sesuai data.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for kecamatan_list in area_kec_info.values():
+        for kecamatan_name, info in sorted(kecamatan_list.items()):
+            folder_path = info["path"]
+            digest.update(f"{kecamatan_name}|{info['total_odp']}|{folder_path}\n".encode("utf-8"))
+            if not os.path.isdir(folder_path):
                 continue
+            for f in sorted(os.listdir(folder_path)):
+                if f.lower().endswith(".geojson"):
+                    stat = os.stat(os.path.join(folder_path, f))
+                    digest.update(f"{f}|{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def kecamatan_fingerprints(area_kec_info: dict) -> dict:
+    """data_fingerprint per kecamatan: {nama_kecamatan: fingerprint}."""
+    return {
+        kec: data_fingerprint({area: {kec: info}})
+        for area, kecamatan_list in area_kec_info.items()
+        for kec, info in kecamatan_list.items()
+    }
+
+
+def subset_area_info(area_kec_info: dict, area_name: str, kecamatan_names) -> dict:
+    """Potong area_kec_info menjadi satu area dengan kecamatan terpilih saja."""
+    kecamatan_list = area_kec_info.get(area_name, {})
+    return {area_name: {k: kecamatan_list[k] for k in kecamatan_names if k in kecamatan_list}}
+
+
+_prefetch_lock = threading.Lock()
+_prefetching = set()
+
 
-            # List semua file .geojson
-            try:
-                geojson_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".geojson")]
-                if not geojson_files:
-                    st.warning(f"Tidak ada file .geojson ditemukan di folder {folder_path} ({kecamatan_name.title()}). Lewati pemrosesan kecamatan ini.")
+def prefetch_in_background(area_kec_info: dict, cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    Hangatkan cache ingestion di disk untuk kecamatan dalam area_kec_info di thread latar
+    belakang, sehingga saat kecamatan tersebut dipilih cukup membaca artefak cache.
+    Kecamatan yang sedang di-prefetch tidak dijadwalkan dua kali.
+    """
+    with _prefetch_lock:
+        keys = {k for kecamatan_list in area_kec_info.values() for k in kecamatan_list} - _prefetching
+        if not keys:
+            return None
+        _prefetching.update(keys)
+    subset = {
+        area: {k: v for k, v in kecamatan_list.items() if k in keys}
+        for area, kecamatan_list in area_kec_info.items()
+    }
+
+    def _run():
+        try:
+            run_analysis(subset, cache_dir=cache_dir, workers=1)
+        except Exception:
+            logger.exception("Prefetch gagal untuk %s", sorted(keys))
+        finally:
+            with _prefetch_lock:
+                _prefetching.difference_update(keys)
+
+    thread = threading.Thread(target=_run, name="homepass-prefetch", daemon=True)
+    thread.start()
+    return thread
+
+
+def _store_keys(store, kelurahan_id):
+    sl = store.kelurahan_slice(kelurahan_id)
+    return building_keys(store["osm_id"][sl], store["osm_type"][sl])
+
+
+def _region_key_parts(area_kec_info: dict, skip: set, store, cache_dir, workers) -> dict:
+    """
+    Kunci bangunan per kelurahan untuk kecamatan region yang tidak ikut dianalisis
+    (hanya sebagai pembanding kepemilikan). Dari store jika masih sesuai, selain itu dari
+    cache ingestion / file GeoJSON. File yang gagal dibaca dilewati tanpa diagnostik.
+    """
+    store_fingerprints = store.meta.get("kecamatan_fingerprints", {}) if store is not None else {}
+    parts, pending = {}, []
+    for area_name, kecamatan_name, info in (
+        (a, k, i) for a, kecamatan_list in area_kec_info.items() for k, i in kecamatan_list.items() if k not in skip
+    ):
+        parts[kecamatan_name] = []
+        if store is not None and store_fingerprints.get(kecamatan_name) == data_fingerprint({area_name: {kecamatan_name: info}}):
+            rows = store.kecamatan_rows(kecamatan_name)
+            parts[kecamatan_name] = [{"kelurahan": kel, "keys": _store_keys(store, i)} for kel, i in zip(rows["kelurahan"], rows.index)]
+            continue
+        try:
+            files = sorted(f for f in os.listdir(info["path"]) if f.lower().endswith(".geojson"))
+        except OSError:
+            continue
+        pending.extend((kecamatan_name, f, os.path.join(info["path"], f)) for f in files)
+
+    results = ingest_files([path for _, _, path in pending], "stream", cache_dir, workers) if pending else []
+    for (kecamatan_name, file, _), result in zip(pending, results):
+        if result["error"] is None:
+            keys = building_keys(result["columns"]["osm_id"], result["columns"]["osm_type"])
+            parts[kecamatan_name].append({"kelurahan": parse_kelurahan_name(file, kecamatan_name), "keys": keys})
+    return parts
+
+
+def _deduplicate_parts(kelurahan_parts: dict, region: dict, store, cache_dir, workers, diagnostics) -> dict:
+    """
+    Ganti "homepass" setiap bagian di kelurahan_parts dengan jumlah bangunan unik miliknya
+    (in-place) dan kembalikan laporan overlap untuk kecamatan yang dianalisis.
+    """
+    region_order = [k for kecamatan_list in region.values() for k in kecamatan_list]
+    reference = _region_key_parts(region, set(kelurahan_parts), store, cache_dir, workers)
+    order = [k for k in region_order if k in kelurahan_parts or k in reference]
+    order += [k for k in kelurahan_parts if k not in order]
+
+    flat = [(kec, part) for kec in order for part in kelurahan_parts.get(kec, reference.get(kec, []))]
+    owned, owner_part = deduplicate([part["keys"] for _, part in flat])
+    for (kec, part), part_owned in zip(flat, owned):
+        if kec in kelurahan_parts:
+            part["owned"] = part_owned
+            part["homepass"] = int(part_owned.sum())
+
+    report = overlap_report([kec for kec, _ in flat], [part["kelurahan"] for _, part in flat], owned, owner_part)
+    report = {name: df[df["kecamatan"].isin(list(kelurahan_parts))].reset_index(drop=True) for name, df in report.items()}
+    for row in report["kecamatan"].itertuples():
+        if row.homepass_mentah and row.duplikat_lintas == row.homepass_mentah:
+            owners = report["pairs"].loc[report["pairs"]["kecamatan"] == row.kecamatan, "pemilik_kecamatan"].unique()
+            _diagnostic(diagnostics, "warning", f"Semua bangunan {row.kecamatan.title()} sudah dihitung di {', '.join(o.title() for o in owners)}. Periksa apakah folder datanya salinan (mis. `utils/data` vs `data`).", row.kecamatan)
+    return report
+
+
+def run_analysis(area_kec_info: dict, odp_capacity: int = 16, ingest_mode: str = "stream",
+                 cache_dir: str = DEFAULT_CACHE_DIR, workers: int = None, store_dir: str = None,
+                 dedup: bool = True, dedup_region: dict = None, weights: dict = None) -> dict:
+    """
+    Iterasi melalui area dan kecamatan dalam area_kec_info,
+    baca GeoJSON, hitung Homepass, alokasi ODP, SAM, SOM, kategori.
+    Kembalikan dict {"results": {nama_kecamatan: DataFrame}, "diagnostics": [dict, ...]}.
+    Tidak bergantung pada Streamlit, sehingga bisa dijalankan dari CLI/cron/worker.
+
+    ingest_mode "stream" hanya menghitung feature secara bertahap tanpa membangun
+    geometri; "geopandas" memakai gpd.read_file seperti sebelumnya.
+    Pada mode "stream", hasil per file disimpan di cache disk `cache_dir`
+    sehingga hanya file baru/berubah yang dibaca ulang (None = tanpa cache).
+    File yang perlu dibaca disebar ke `workers` proses (None = semua core, 1 = serial).
+    Jika `store_dir` berisi centroid store (utils.centroid_store) yang masih sesuai data
+    sebuah kecamatan, Homepass kecamatan itu dihitung langsung dari array store tanpa
+    membuka GeoJSON maupun cache ingestion.
+
+    Dengan `dedup` (khusus mode "stream"), bangunan yang muncul di beberapa file (mis. di
+    perbatasan kelurahan) hanya dihitung sekali berdasarkan osm_id/full_id; pemiliknya file
+    pertama dalam urutan kanonik `dedup_region` (default: area_kec_info itu sendiri). Berikan
+    region lengkap saat menganalisis sebagian kecamatan agar kepemilikan tetap sama seperti
+    run penuh. Ringkasan overlap dikembalikan di key "dedup" (lihat utils.dedup.overlap_report).
+
+    `weights` (model dari utils.weights.load_weights, khusus mode "stream") mengganti hitungan
+    satu feature = satu Homepass dengan jumlah unit rumah tangga berbobot (tag building,
+    building:levels, amenity), dibulatkan per kelurahan. Centroid store tidak menyimpan atribut
+    tersebut, sehingga mode berbobot selalu membaca cache ingestion.
+    """
+    all_results = {}
+    diagnostics = []
+
+    if weights is not None and ingest_mode != "stream":
+        _diagnostic(diagnostics, "warning", f"Bobot Homepass hanya tersedia pada mode ingest 'stream' (mode: {ingest_mode}); setiap bangunan dihitung 1.")
+        weights = None
+    store = open_store(store_dir) if store_dir and weights is None else None
+    if store is not None:
+        store_fingerprints = store.meta.get("kecamatan_fingerprints", {})
+        store_counts = np.bincount(store["kelurahan_id"], minlength=len(store.kelurahan))
+
+    # Tahap 1: kumpulkan daftar file semua kecamatan agar bisa dibaca paralel sekaligus
+    plan = []  # (kecamatan_name, total_odp, [(file, file_path), ...], [(kelurahan, id di store), ...] atau None)
+    for area_name, kecamatan_list in area_kec_info.items():
+        for kecamatan_name, info in kecamatan_list.items():
+            with profile_stage("listing", kecamatan=kecamatan_name):
+                folder_path = info["path"]
+                total_odp   = info["total_odp"]
+
+                if store is not None and store_fingerprints.get(kecamatan_name) == data_fingerprint({area_name: {kecamatan_name: info}}):
+                    rows = store.kecamatan_rows(kecamatan_name)
+                    plan.append((kecamatan_name, total_odp, [], list(zip(rows["kelurahan"], rows.index))))
                     continue
-            except Exception as e:
-                 st.error(f"Gagal membaca isi folder {folder_path} ({kecamatan_name.title()}): {e}. Lewati pemrosesan kecamatan ini.")
-                 continue
 
-            data = []
+                if not os.path.exists(folder_path):
+                    _diagnostic(diagnostics, "error", f"Folder data tidak ditemukan untuk {kecamatan_name.title()} di: `{folder_path}`. Lewati pemrosesan kecamatan ini.", kecamatan_name)
+                    continue
 
-            for file in geojson_files:
-                file_path = os.path.join(folder_path, file)
+                # List semua file .geojson (diurutkan agar hasil deterministik)
                 try:
-                    gdf = gpd.read_file(file_path)
+                    geojson_files = sorted(f for f in os.listdir(folder_path) if f.lower().endswith(".geojson"))
+                    if not geojson_files:
+                        _diagnostic(diagnostics, "warning", f"Tidak ada file .geojson ditemukan di folder {folder_path} ({kecamatan_name.title()}). Lewati pemrosesan kecamatan ini.", kecamatan_name)
+                        continue
                 except Exception as e:
-                    st.warning(f"Gagal membaca file GeoJSON: {file_path} ({kecamatan_name.title()}) - {e}. Lewati file ini.")
-                    continue
+                     _diagnostic(diagnostics, "error", f"Gagal membaca isi folder {folder_path} ({kecamatan_name.title()}): {e}. Lewati pemrosesan kecamatan ini.", kecamatan_name)
+                     continue
+
+                plan.append((kecamatan_name, total_odp, [(f, os.path.join(folder_path, f)) for f in geojson_files], None))
+
+    # Tahap 2: baca semua file (paralel untuk file yang belum ada di cache)
+    all_paths = [file_path for _, _, files, _ in plan for _, file_path in files]
+    with profile_stage("ingest") as span:
+        file_results = dict(zip(all_paths, ingest_files(all_paths, ingest_mode, cache_dir, workers))) if all_paths else {}
+        span["files"] = len(all_paths)
+
+    # Tahap 3: gabungkan kembali per kecamatan (beserta kunci osm_id jika perlu deduplikasi)
+    if dedup and ingest_mode != "stream":
+        _diagnostic(diagnostics, "warning", f"Deduplikasi bangunan hanya tersedia pada mode ingest 'stream' (mode: {ingest_mode}); Homepass dihitung per file.")
+    with_keys = dedup and ingest_mode == "stream"
+    kelurahan_parts = {}  # kecamatan_name -> [{"kelurahan", "homepass", "keys", "weights"}, ...]
+    for kecamatan_name, total_odp, files, store_rows in plan:
+        parts = kelurahan_parts.setdefault(kecamatan_name, [])
+        for kelurahan, kel_id in store_rows or []:
+            keys = _store_keys(store, kel_id) if with_keys else None
+            parts.append({"kelurahan": kelurahan, "homepass": int(store_counts[kel_id]), "keys": keys})
+        for file, file_path in files:
+            result = file_results[file_path]
+            if profiling_enabled():
+                # Waktu baca per file diukur di ingest_files (bisa di proses worker)
+                record_span("ingest_file", result.get("seconds", 0.0), kecamatan=kecamatan_name, file=file_path,
+                            features=result["count"] or 0, cached=result.get("cached", False),
+                            bytes=0 if result.get("cached") else os.path.getsize(file_path))
+            if result["error"] is not None:
+                _diagnostic(diagnostics, "warning", f"Gagal membaca file GeoJSON: {file_path} ({kecamatan_name.title()}) - {result['error']}. Lewati file ini.", kecamatan_name, file_path)
+                continue
+            keys = building_keys(result["columns"]["osm_id"], result["columns"]["osm_type"]) if with_keys else None
+            unit_weights = homepass_weights(result["columns"], weights) if weights is not None else None
+            with profile_stage("parse_name", kecamatan=kecamatan_name, file=file_path):
+                kelurahan = parse_kelurahan_name(file, kecamatan_name)
+            parts.append({"kelurahan": kelurahan, "homepass": result["count"], "keys": keys, "weights": unit_weights})
+
+    dedup_report = None
+    if with_keys:
+        with profile_stage("dedup") as span:
+            dedup_report = _deduplicate_parts(kelurahan_parts, dedup_region or area_kec_info, store, cache_dir, workers, diagnostics)
+            span["features"] = int(dedup_report["kecamatan"]["homepass_mentah"].sum())
+    if weights is not None:
+        for part in (p for parts in kelurahan_parts.values() for p in parts):
+            counted = part["weights"][part["owned"]] if "owned" in part else part["weights"]
+            part["homepass"] = int(round(float(counted.sum())))
 
-                # --- START: Improved kelurahan name parsing ---
-                base_name = os.path.splitext(file)[0]
-                kel = base_name.strip() # Default to base name
-
-                # Try to find "kelurahan X" pattern first (case-insensitive)
-                match = re.search(r'kelurahan\s+(.+)', base_name, re.IGNORECASE)
-                if match:
-                    kel = match.group(1).strip()
-                else:
-                     # Fallback: remove specific known prefixes based on observed patterns
-                     temp_name = kel.lower()
-                     kec_lower = kecamatan_name.lower()
-                     prefixes_to_remove = [
-                          f"homepass kecamatan {kec_lower} kelurahan ",
-                          f"homepass kecamatan {kec_lower} ",
-                          f"{kec_lower}_",
-                          f"kecamatan {kec_lower} ", # Possible prefix based on folder name?
-                          "kelurahan_",
-                          "homepass kelurahan ",
-                          "homepass ",
-                     ]
-                     for prefix in prefixes_to_remove:
-                          if temp_name.startswith(prefix):
-                               temp_name = temp_name[len(prefix):].strip()
-                               break
-
-                     if temp_name:
-                          kel = temp_name
-
-                kel = kel.title() # Apply title case
-                # --- END: Improved kelurahan name parsing ---
-
-                homepass_count = len(gdf)
-                data.append({"kelurahan": kel, "homepass": homepass_count})
-
-            # Bangun DataFrame dan hitung alokasi hanya jika ada data homepass yang berhasil dibaca
-            if not data:
-                 st.warning(f"Tidak ada data homepass yang valid ditemukan untuk {kecamatan_name.title()}. Lewati pemrosesan alokasi.")
-                 continue
-
-            df = pd.DataFrame(data)
-            total_homepass = df["homepass"].sum()
-
-            # === START: Handle ODP=0 or Homepass=0 ===
-            if total_odp > 0 and total_homepass > 0:
-                df["odp_float"] = df["homepass"] / total_homepass * total_odp
-                df["odp_floor"] = np.floor(df["odp_float"]).astype(int)
-                df["sisa"] = df["odp_float"] - df["odp_floor"]
-                sisa_odp = total_odp - df["odp_floor"].sum()
-
-                df = df.sort_values(["sisa", "homepass"], ascending=[False, False]).reset_index(drop=True)
-                if sisa_odp > 0:
-                    num_rows = len(df)
-                    odp_to_add_count = min(sisa_odp, num_rows)
-                    df.loc[:odp_to_add_count-1, "odp_floor"] += 1
-
-                df["ODP"] = df["odp_floor"]
-                df["SAM"] = df["ODP"] * odp_capacity
-                df["SOM"] = (df["SAM"] * 0.3).round(0).astype(int)
-                df = df.drop(columns=["odp_float", "odp_floor", "sisa"])
-
-            else:
-                 #st.info(f"Total ODP ({total_odp}) atau Total Homepass ({total_homepass}) adalah 0 untuk {kecamatan.title()}. ODP, SAM, SOM akan diset 0.")
-                 df["ODP"] = 0
-                 df["SAM"] = 0
-                 df["SOM"] = 0
-            # === END: Handle ODP=0 or Homepass=0 ===
-
-            # === START: Ranking dan Kategori Potensi (Remove Emojis) ===
-            df = df.sort_values("SOM", ascending=False).reset_index(drop=True)
-            if df["SOM"].sum() == 0:
-                 df["ranking"] = np.arange(1, len(df) + 1)
-                 # Menghapus emoji
-                 df["kategori_potensi"] = "Tidak Ada Potensi"
-            else:
-                df["ranking"] = df["SOM"].rank(method='min', ascending=False).astype(int)
-                mean_som = df["SOM"][df["SOM"] > 0].mean() if (df["SOM"] > 0).any() else 0
-                df["kategori_potensi"] = df["SOM"].apply(
-                    # Menghapus emoji
-                    lambda x: "High Potential" if x > mean_som and mean_som > 0 else ("Low Potential" if x > 0 else "Tidak Ada Potensi")
-                )
-            # === END: Ranking dan Kategori Potensi ===
-
-
-            all_results[kecamatan_name] = df[
-                ["ranking", "kelurahan", "homepass", "ODP", "SAM", "SOM", "kategori_potensi"]
-            ]
+    # Tahap 4: hitung alokasi per kecamatan
+    for kecamatan_name, total_odp, _, _ in plan:
+        data = [{"kelurahan": p["kelurahan"], "homepass": p["homepass"]} for p in kelurahan_parts[kecamatan_name]]
+
+        # Bangun DataFrame dan hitung alokasi hanya jika ada data homepass yang berhasil dibaca
+        if not data:
+             _diagnostic(diagnostics, "warning", f"Tidak ada data homepass yang valid ditemukan untuk {kecamatan_name.title()}. Lewati pemrosesan alokasi.", kecamatan_name)
+             continue
+
+        with profile_stage("potensi", kecamatan=kecamatan_name) as span:
+            all_results[kecamatan_name] = hitung_potensi_kecamatan(data, total_odp, odp_capacity)
+            span["features"] = sum(d["homepass"] for d in data)
 
     # Filter out kecamatans that failed to process
-    processed_kecamatans = {k: v for k, v in all_results.items() if k in area_kecamatan_info["Kota Malang"].keys() or k in area_kecamatan_info["Kabupaten Malang"].keys()}
-    processed_kecamatans = {k: v for k, v in processed_kecamatans.items() if not v.empty}
+    processed_kecamatans = {k: v for k, v in all_results.items() if not v.empty}
 
     if not processed_kecamatans:
-        st.error("❌ Gagal memproses data untuk semua kecamatan yang dikonfigurasi. Mohon cek folder data dan file GeoJSON.")
+        _diagnostic(diagnostics, "error", "❌ Gagal memproses data untuk semua kecamatan yang dikonfigurasi. Mohon cek folder data dan file GeoJSON.")
+
+    return {"results": processed_kecamatans, "diagnostics": diagnostics, "dedup": dedup_report}
 
-    return processed_kecamatans
 
-# Ekspor dictionary area_kecamatan_info agar bisa diakses di app.py
-area_info_for_app = area_kecamatan_info
\ No newline at end of file
+def process_all_data(area_kec_info: dict, odp_capacity: int = 16, **kwargs) -> dict:
+    """
+    Versi ringkas run_analysis: kembalikan dict {nama_kecamatan: DataFrame} saja,
+    diagnostik diteruskan ke logging.
+    """
+    analysis = run_analysis(area_kec_info, odp_capacity, **kwargs)
+    for diag in analysis["diagnostics"]:
+        logger.log(logging.ERROR if diag["level"] == "error" else logging.WARNING, diag["message"])
+    return analysis["results"]
@@ -0,0 +1,299 @@
+# api.py
+# API HTTP JSON ringan (stdlib) di atas hasil pra-hitung `python -m utils.cli run`.
+#
+#     python -m utils.cli serve --port 8765
+#     curl -H "Accept-Encoding: gzip" "http://127.0.0.1:8765/v1/kelurahan?area=Kabupaten%20Malang&page_size=20"
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils.export import kecamatan_summary
+from utils.region_query import METRICS, RegionQuery, build_region_table
+from utils.report import RenderCache
+from utils.results_store import DEFAULT_OUTPUT_DIR, read_results
+from utils.scenario import region_arrays, scenario_grid, scenario_kecamatan_table, scenario_summary, sweep_scenarios
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Grid skenario yang dihitung sekali per versi hasil (sama dengan pilihan di halaman Simulasi Skenario)
+API_SCENARIOS = {
+    "capacities": (8, 16, 24, 32, 48, 64),
+    "som_rates": tuple(np.round(np.arange(0.10, 0.501, 0.05), 2)),
+    "budget_factors": (0.5, 0.75, 1.0, 1.5, 2.0, 3.0),
+}
+
+# Respons lebih kecil dari ini tidak di-gzip (overhead header lebih besar dari hematnya)
+_GZIP_MIN_BYTES = 1024
+# Batas byte respons (body & gzip) yang disimpan di cache per proses
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Interval minimal (detik) antar pengecekan meta.json untuk hasil pra-hitung baru
+_RELOAD_CHECK_SECONDS = 2.0
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ResultsSnapshot:
+    """
+    Satu versi hasil pra-hitung yang tidak berubah: tabel region + RegionQuery, ringkasan
+    kecamatan dan sweep skenario. Dibangun sekali saat versi baru terdeteksi, lalu dipakai
+    bersama oleh semua thread request.
+    """
+
+    def __init__(self, precomputed: dict, area_kec_info: dict, version: str):
+        self.version = version
+        self.meta = precomputed["meta"]
+        self.results = precomputed["results"]
+        self.query = RegionQuery(build_region_table(self.results, area_kec_info))
+        self.kecamatan = kecamatan_summary(self.query.table)
+        self.areas = {area: [str(k) for k in group["kecamatan"]]
+                      for area, group in self.kecamatan.groupby("area", observed=True, sort=False)}
+        region = region_arrays(self.results, area_kec_info)
+        self.sweep = sweep_scenarios(region, scenario_grid(**API_SCENARIOS)) if region["kecamatan"] else None
+        self.scenarios = scenario_summary(self.sweep).rename_axis("id").reset_index() if self.sweep else pd.DataFrame()
+
+
+class HomepassApi:
+    """Sumber data API: memuat ResultsSnapshot dan menggantinya saat meta.json berubah."""
+
+    def __init__(self, output_dir: str = DEFAULT_OUTPUT_DIR, area_kec_info: dict = None):
+        if area_kec_info is None:
+            from utils.analysis import get_area_kecamatan_info
+            area_kec_info = get_area_kecamatan_info()
+        self.output_dir = output_dir
+        self.area_kec_info = area_kec_info
+        self.responses = RenderCache(RESPONSE_CACHE_MAX_BYTES)
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+
+    def _meta_version(self):
+        try:
+            stat = os.stat(os.path.join(self.output_dir, "meta.json"))
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns:x}{stat.st_size:x}"
+
+    def snapshot(self):
+        """ResultsSnapshot aktif; meta.json dicek paling sering setiap _RELOAD_CHECK_SECONDS."""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < _RELOAD_CHECK_SECONDS:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is None or now - self._checked_at >= _RELOAD_CHECK_SECONDS:
+                version = self._meta_version()
+                if version is not None and (self._snapshot is None or self._snapshot.version != version):
+                    precomputed = read_results(self.output_dir)
+                    if precomputed is not None:
+                        self._snapshot = ResultsSnapshot(precomputed, self.area_kec_info, version)
+                self._checked_at = now
+        if self._snapshot is None:
+            raise ApiError(503, f"Belum ada hasil pra-hitung di {self.output_dir}; jalankan `python -m utils.cli run`.")
+        return self._snapshot
+
+
+def _param(params, name, default=None):
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _int_param(params, name, default, low=None, high=None):
+    try:
+        value = int(_param(params, name, default))
+    except (TypeError, ValueError):
+        raise ApiError(400, f"Parameter {name} harus bilangan bulat")
+    if low is not None and value < low:
+        raise ApiError(400, f"Parameter {name} minimal {low}")
+    if high is not None and value > high:
+        raise ApiError(400, f"Parameter {name} maksimal {high}")
+    return value
+
+
+def _filters(params):
+    kecamatan = params.get("kecamatan")
+    return {"area": _param(params, "area"), "kecamatan": kecamatan[0].split(",") if kecamatan else None}
+
+
+def _records(df):
+    # to_json langsung dari DataFrame (tanpa dict per baris); Categorical jadi string
+    df = df.astype({c: str for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+    return df.to_json(orient="records", force_ascii=False)
+
+
+def _page(df, params):
+    """Potong DataFrame per halaman: page (mulai 1) dan page_size (maks MAX_PAGE_SIZE)."""
+    page = _int_param(params, "page", 1, low=1)
+    page_size = _int_param(params, "page_size", DEFAULT_PAGE_SIZE, low=1, high=MAX_PAGE_SIZE)
+    total = len(df)
+    items = df.iloc[(page - 1) * page_size:page * page_size]
+    return (f'{{"page": {page}, "page_size": {page_size}, "total": {total}, '
+            f'"pages": {(total + page_size - 1) // page_size}, "items": {_records(items)}}}')
+
+
+def _kelurahan(snap, params):
+    query = snap.query
+    filters = _filters(params)
+    sort = _param(params, "sort")
+    if sort is not None:
+        if sort not in METRICS:
+            raise ApiError(400, f"sort harus salah satu dari {', '.join(METRICS)}")
+        df = query.top(sort, None, ascending=_param(params, "order", "desc") == "asc", **filters)
+    else:
+        df = query.table[query.mask(**filters)]
+    for col in ("kategori_potensi", "kategori_region"):
+        if _param(params, col):
+            df = df[df[col].astype(str) == _param(params, col)]
+    return _page(df, params)
+
+
+def _ranking(snap, params, kind):
+    query = snap.query
+    n = _int_param(params, "n", 10, low=1, high=MAX_PAGE_SIZE)
+    if kind == "top":
+        metric = _param(params, "metric", "SOM")
+        if metric not in METRICS:
+            raise ApiError(400, f"metric harus salah satu dari {', '.join(METRICS)}")
+        df = query.top(metric, n, **_filters(params))
+    elif kind == "gap":
+        df = query.largest_gap(n, **_filters(params))
+    elif kind == "zero-odp":
+        try:
+            min_percentile = float(_param(params, "min_percentile", 0.75))
+        except ValueError:
+            raise ApiError(400, "Parameter min_percentile harus angka 0..1")
+        df = query.zero_odp_high_homepass(min_percentile, n, **_filters(params))
+    else:
+        raise ApiError(404, f"Ranking tidak dikenal: {kind}")
+    return f'{{"total": {len(df)}, "items": {_records(df)}}}'
+
+
+def _scenario(snap, params, scenario_id):
+    if snap.sweep is None:
+        raise ApiError(404, "Tidak ada skenario")
+    index = int(scenario_id) if scenario_id.isdigit() else -1
+    if not 0 <= index < len(snap.scenarios):
+        raise ApiError(404, f"Skenario tidak ditemukan: {scenario_id}")
+    row = _records(snap.scenarios.iloc[[index]])[1:-1]
+    kecamatan = _param(params, "kecamatan")
+    if kecamatan is None:
+        return f'{{"scenario": {row}}}'
+    if kecamatan not in snap.sweep["region"]["kecamatan"]:
+        raise ApiError(404, f"Kecamatan tidak ditemukan: {kecamatan}")
+    df = scenario_kecamatan_table(snap.sweep, index, kecamatan)
+    return (f'{{"scenario": {row}, "kecamatan": {json.dumps(kecamatan)}, '
+            f'"items": {_records(df)}}}')
+
+
+def route(snap: ResultsSnapshot, path: str, params: dict) -> str:
+    """Bangun body JSON untuk satu path GET (tanpa cache). ApiError untuk 4xx."""
+    parts = [p for p in path.split("/") if p]
+    if parts[:1] != ["v1"]:
+        raise ApiError(404, f"Path tidak dikenal: {path}")
+    parts = parts[1:]
+    if parts == ["meta"]:
+        return json.dumps({"version": snap.version, "meta": snap.meta, "kecamatan": len(snap.kecamatan),
+                           "kelurahan": len(snap.query)}, ensure_ascii=False, default=str)
+    if parts == ["areas"]:
+        return json.dumps(snap.areas, ensure_ascii=False)
+    if parts == ["kecamatan"]:
+        return _page(snap.kecamatan, params)
+    if parts == ["kelurahan"]:
+        return _kelurahan(snap, params)
+    if len(parts) == 2 and parts[0] == "ranking":
+        return _ranking(snap, params, parts[1])
+    if parts == ["scenarios"]:
+        return _page(snap.scenarios, params)
+    if len(parts) == 2 and parts[0] == "scenarios":
+        return _scenario(snap, params, parts[1])
+    raise ApiError(404, f"Path tidak dikenal: {path}")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 agar koneksi keep-alive dipakai ulang oleh klien (Content-Length selalu dikirim)
+    protocol_version = "HTTP/1.1"
+    # Header dan body ditulis terpisah; tanpa TCP_NODELAY, Nagle + delayed ACK menahan body ~40 ms
+    disable_nagle_algorithm = True
+    server_version = "HomepassAPI/1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, message):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, [("Content-Type", "application/json; charset=utf-8")])
+
+    def do_GET(self):
+        api = self.server.api
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            return self._send(200, b'{"status": "ok"}', [("Content-Type", "application/json")])
+        try:
+            snap = api.snapshot()
+        except ApiError as e:
+            return self._error(e.status, str(e))
+
+        # ETag = versi hasil + URL ternormalisasi (di-encode ulang agar "&"/"=" di dalam nilai
+        # tidak tertukar dengan pemisah). Urut per nama parameter saja: urutan nilai berulang
+        # tetap, karena _param memakai nilai pertama
+        params = parse_qs(url.query)
+        key = url.path + "?" + urlencode(sorted(((k, v) for k in params for v in params[k]), key=lambda kv: kv[0]))
+        etag = '"' + hashlib.blake2b(f"{snap.version}|{key}".encode("utf-8"), digest_size=12).hexdigest() + '"'
+        common = [("ETag", etag), ("Cache-Control", "no-cache"), ("Vary", "Accept-Encoding")]
+
+        # Body di cache berarti request ini valid (error tidak di-cache); selain itu route dulu,
+        # agar URL yang menghasilkan 4xx tidak pernah dijawab 304
+        body = api.responses.get(("body", etag))
+        if body is None:
+            try:
+                body = route(snap, url.path, params).encode("utf-8")
+            except ApiError as e:
+                return self._error(e.status, str(e))
+            api.responses.put(("body", etag), body)
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            return self._send(304, headers=common)
+
+        headers = common + [("Content-Type", "application/json; charset=utf-8")]
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(body) >= _GZIP_MIN_BYTES:
+            compressed = api.responses.get(("gzip", etag))
+            if compressed is None:
+                compressed = gzip.compress(body, compresslevel=6)
+                api.responses.put(("gzip", etag), compressed)
+            body = compressed
+            headers.append(("Content-Encoding", "gzip"))
+        self._send(200, body, headers)
+
+    do_HEAD = do_GET
+
+
+def make_server(api: HomepassApi, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, verbose: bool = False):
+    """ThreadingHTTPServer (satu thread per koneksi) yang melayani api."""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.api = api
+    server.verbose = verbose
+    return server
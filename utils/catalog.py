@@ -0,0 +1,239 @@
+# catalog.py
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+from utils.geojson_stream import count_features
+from utils.ingest_cache import _atomic_write
+
+# Folder data dan alokasi ODP per kecamatan (pengganti dictionary yang ditulis tangan di analysis.py)
+DEFAULT_WILAYAH_PATH = os.path.join("config", "wilayah.json")
+# Indeks katalog adalah data turunan (bisa dibangun ulang dari folder data), jadi di .cache/
+DEFAULT_CATALOG_PATH = os.path.join(".cache", "catalog.json")
+
+CATALOG_VERSION = 2
+
+_KECAMATAN_PREFIX = re.compile(r"^(kecamatan|kec\.?)\s+", re.IGNORECASE)
+
+
+def load_wilayah(path: str = DEFAULT_WILAYAH_PATH) -> dict:
+    """
+    Baca konfigurasi wilayah. Kunci yang dipakai:
+      data_root     folder data (default "data")
+      default_area  area untuk folder kecamatan yang tidak terdaftar di "areas"
+      areas         {area: {kecamatan: total_odp}}; urutannya menentukan urutan analisis
+                    (dan pemilik bangunan duplikat perbatasan)
+    File yang tidak ada dianggap konfigurasi kosong.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            wilayah = json.load(fh)
+    except FileNotFoundError:
+        wilayah = {}
+    wilayah.setdefault("data_root", "data")
+    wilayah.setdefault("default_area", "Lainnya")
+    wilayah.setdefault("areas", {})
+    return wilayah
+
+
+def _collapse(name: str) -> str:
+    return " ".join(name.split())
+
+
+def normalize_kecamatan(folder_name: str) -> str:
+    """Nama folder -> kunci kecamatan: 'Kecamatan  Sukun' -> 'sukun'."""
+    return _KECAMATAN_PREFIX.sub("", _collapse(folder_name)).lower()
+
+
+def parse_kelurahan_name(file_name: str, kecamatan_name: str) -> str:
+    """Ambil nama kelurahan/desa dari nama file GeoJSON Homepass."""
+    base_name = _collapse(os.path.splitext(file_name)[0])
+    kel = base_name  # Default to base name
+
+    # Try to find "kelurahan X" pattern first (case-insensitive)
+    match = re.search(r'kelurahan\s+(.+)', base_name, re.IGNORECASE)
+    if match:
+        kel = match.group(1).strip()
+    else:
+         # Fallback: remove specific known prefixes based on observed patterns
+         temp_name = kel.lower()
+         kec_lower = kecamatan_name.lower()
+         prefixes_to_remove = [
+              f"homepass kecamatan {kec_lower} kelurahan ",
+              f"homepass kecamatan {kec_lower} ",
+              f"{kec_lower}_",
+              f"kecamatan {kec_lower} ", # Possible prefix based on folder name?
+              "kelurahan_",
+              "homepass kelurahan ",
+              "homepass ",
+         ]
+         for prefix in prefixes_to_remove:
+              if temp_name.startswith(prefix):
+                   temp_name = temp_name[len(prefix):].strip()
+                   break
+
+         if temp_name:
+              kel = temp_name
+
+    return kel.title() # Apply title case
+
+
+def _geojson_files(folder):
+    try:
+        with os.scandir(folder) as entries:
+            return sorted(e.name for e in entries if e.is_file() and e.name.lower().endswith(".geojson"))
+    except OSError:
+        return []
+
+
+def _subfolders(folder):
+    try:
+        with os.scandir(folder) as entries:
+            return sorted(e.name for e in entries if e.is_dir() and not e.name.startswith((".", "_")))
+    except OSError:
+        return []
+
+
+def _discover_folders(data_root, wilayah):
+    """
+    Cari folder kecamatan di data_root. Dua tata letak didukung:
+      data/<Kecamatan>/*.geojson         area diambil dari "areas" di wilayah.json
+      data/<Area>/<Kecamatan>/*.geojson  folder area baru (mis. kabupaten tambahan)
+    Kembalikan list (area, kecamatan, path) dan daftar peringatan.
+    """
+    area_of = {kec: area for area, kecs in wilayah["areas"].items() for kec in kecs}
+    found, warnings, seen = [], [], {}
+    for name in _subfolders(data_root):
+        path = os.path.join(data_root, name)
+        if _geojson_files(path):
+            candidates = [(None, name, path)]
+        else:
+            candidates = [(_collapse(name), sub, os.path.join(path, sub))
+                          for sub in _subfolders(path) if _geojson_files(os.path.join(path, sub))]
+        for area, folder, kec_path in candidates:
+            kec = normalize_kecamatan(folder)
+            area = area or area_of.get(kec, wilayah["default_area"])
+            if kec in seen:
+                warnings.append(f"Folder {kec_path} dilewati: kecamatan '{kec}' sudah ada di {seen[kec]}.")
+                continue
+            seen[kec] = kec_path
+            found.append((area, kec, kec_path))
+    return found, warnings
+
+
+def load_catalog(catalog_path: str = DEFAULT_CATALOG_PATH):
+    """Baca indeks katalog, atau None jika belum ada / versinya lain."""
+    try:
+        with open(catalog_path, "r", encoding="utf-8") as fh:
+            catalog = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return catalog if catalog.get("version") == CATALOG_VERSION else None
+
+
+def update_catalog(wilayah: dict = None, catalog_path: str = DEFAULT_CATALOG_PATH,
+                   count: bool = False, rebuild: bool = False) -> dict:
+    """
+    Pindai data_root dan perbarui indeks katalog secara inkremental:
+    area -> kecamatan -> kelurahan -> file (size, mtime, jumlah feature).
+
+    Hanya os.scandir/os.stat; isi GeoJSON dibaca hanya untuk menghitung feature (count=True,
+    pembaca bertahap geojson_stream.count_features, jumlah sama dengan pipeline) pada file
+    baru atau yang berubah (size/mtime lain). File yang tidak berubah memakai nilai
+    dari indeks sebelumnya. Indeks ditulis ulang hanya jika ada perubahan.
+    """
+    wilayah = wilayah or load_wilayah()
+    data_root = wilayah["data_root"]
+    previous = None if rebuild else load_catalog(catalog_path)
+    previous_files = {f["file"]: f for f in previous["files"]} if previous and previous.get("data_root") == data_root else {}
+
+    folders, warnings = _discover_folders(data_root, wilayah)
+    files, n_counted = [], 0
+    for area, kec, kec_path in folders:
+        for name in _geojson_files(kec_path):
+            file_path = os.path.join(kec_path, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            old = previous_files.get(file_path)
+            features = old.get("features") if old and (old["size"], old["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns) else None
+            if features is None and count:
+                features = count_features(file_path)
+                n_counted += 1
+            files.append({"area": area, "kecamatan": kec, "kelurahan": parse_kelurahan_name(name, kec),
+                          "file": file_path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "features": features})
+
+    configured = {kec for kecs in wilayah["areas"].values() for kec in kecs}
+    for area, kec, kec_path in folders:
+        if kec not in configured:
+            warnings.append(f"Kecamatan '{kec}' ({kec_path}) belum punya total_odp di config/wilayah.json; dianggap 0 ODP.")
+    for kec in configured - {kec for _, kec, _ in folders}:
+        warnings.append(f"Kecamatan '{kec}' terdaftar di config/wilayah.json tetapi foldernya tidak ditemukan di {data_root}.")
+
+    catalog = {
+        "version": CATALOG_VERSION,
+        "data_root": data_root,
+        "scanned_at": time.time(),
+        "kecamatan": [{"area": a, "kecamatan": k, "path": p} for a, k, p in folders],
+        "files": files,
+        "warnings": warnings,
+    }
+    unchanged = previous is not None and all(previous.get(k) == catalog[k] for k in ("data_root", "kecamatan", "files", "warnings"))
+    if unchanged:
+        return previous
+    try:
+        os.makedirs(os.path.dirname(catalog_path) or ".", exist_ok=True)
+        data = json.dumps(catalog, indent=1, ensure_ascii=False).encode("utf-8")
+        _atomic_write(catalog_path, lambda fh: fh.write(data))
+    except OSError:
+        pass  # Folder read-only: katalog tetap dipakai di memori
+    catalog["counted"] = n_counted
+    return catalog
+
+
+def catalog_area_info(catalog: dict, wilayah: dict = None) -> dict:
+    """
+    Susun area_kecamatan_info {area: {kecamatan: {"path", "total_odp"}}} dari katalog.
+    Urutan mengikuti config/wilayah.json, lalu kecamatan/area baru secara alfabetis.
+    """
+    wilayah = wilayah or load_wilayah()
+    order = {}
+    for area, kecs in wilayah["areas"].items():
+        order.setdefault(area, list(kecs))
+    by_area = {}
+    for entry in catalog["kecamatan"]:
+        by_area.setdefault(entry["area"], {})[entry["kecamatan"]] = entry["path"]
+
+    info = {}
+    for area in list(order) + sorted(a for a in by_area if a not in order):
+        paths = by_area.get(area, {})
+        configured = order.get(area, [])
+        kecs = [k for k in configured if k in paths] + sorted(k for k in paths if k not in configured)
+        if kecs:
+            odp = wilayah["areas"].get(area, {})
+            info[area] = {k: {"path": paths[k], "total_odp": int(odp.get(k, 0))} for k in kecs}
+    return info
+
+
+def catalog_table(catalog: dict) -> pd.DataFrame:
+    """Satu baris per file: area, kecamatan, kelurahan, file, size, mtime_ns, features."""
+    return pd.DataFrame(catalog["files"], columns=["area", "kecamatan", "kelurahan", "file", "size", "mtime_ns", "features"])
+
+
+def catalog_index(catalog: dict, area_kec_info: dict = None) -> dict:
+    """
+    Indeks {area: {kecamatan: jumlah file}} untuk selector dashboard, langsung dari katalog.
+    Dengan area_kec_info, urutan dan isi mengikuti dictionary tersebut.
+    """
+    counts = catalog_table(catalog).groupby(["area", "kecamatan"], sort=False).size()
+    if area_kec_info is None:
+        index = {}
+        for (area, kec), n in counts.items():
+            index.setdefault(area, {})[kec] = int(n)
+        return index
+    return {area: {k: int(counts[(area, k)]) for k in kecs if (area, k) in counts}
+            for area, kecs in area_kec_info.items()}
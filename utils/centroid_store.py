@@ -0,0 +1,148 @@
+# centroid_store.py
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest_cache import _atomic_write
+
+STORE_VERSION = 1
+
+# Lokasi default store di root project (relatif, sama seperti cache ingestion)
+DEFAULT_STORE_DIR = os.path.join(".cache", "centroid_store")
+
+_POINTER = "current.json"
+
+
+def _smallest_uint(max_value):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def write_store(buildings: dict, store_dir: str = DEFAULT_STORE_DIR, meta: dict = None) -> str:
+    """
+    Tulis tabel bangunan (hasil analysis.load_buildings) sebagai array biner bersebelahan (.npy):
+    lon/lat float32, osm_id int64, osm_type int8, building_code, kelurahan_id dan kecamatan_id
+    dengan tipe unsigned sekecil mungkin. Tabel kelurahan & kategori building disimpan di meta.json.
+
+    Setiap build ditulis ke folder generasi baru lalu pointer current.json diganti secara atomik,
+    sehingga proses lain yang sedang memetakan generasi lama tidak terganggu.
+    Kembalikan path folder generasi yang ditulis.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    generation = f"gen-{time.time_ns()}"
+    gen_dir = os.path.join(store_dir, generation)
+    os.makedirs(gen_dir)
+
+    kelurahan = buildings["kelurahan"].reset_index(drop=True)
+    kecamatan_names = list(dict.fromkeys(kelurahan["kecamatan"]))
+    kecamatan_of_kel = np.array([kecamatan_names.index(k) for k in kelurahan["kecamatan"]], dtype=np.int64)
+    kel_id = buildings["kelurahan_id"].astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(kelurahan["homepass"].to_numpy(dtype=np.int64))])
+
+    arrays = {
+        "lon": buildings["lon"].astype(np.float32),
+        "lat": buildings["lat"].astype(np.float32),
+        "osm_id": buildings["osm_id"].astype(np.int64),
+        "osm_type": buildings["osm_type"].astype(np.int8),
+        "building_code": buildings["building_code"].astype(_smallest_uint(max(len(buildings["building_categories"]) - 1, 0))),
+        "kelurahan_id": kel_id.astype(_smallest_uint(max(len(kelurahan) - 1, 0))),
+        "kecamatan_id": kecamatan_of_kel[kel_id].astype(_smallest_uint(max(len(kecamatan_names) - 1, 0))),
+    }
+    for name, arr in arrays.items():
+        np.save(os.path.join(gen_dir, f"{name}.npy"), np.ascontiguousarray(arr))
+
+    full_meta = {
+        "version": STORE_VERSION,
+        "created_at": time.time(),
+        "n_buildings": int(len(kel_id)),
+        "building_categories": [str(c) for c in buildings["building_categories"]],
+        "kecamatan": kecamatan_names,
+        "kelurahan": kelurahan.assign(offset=offsets[:-1]).to_dict(orient="records"),
+        **(meta or {}),
+    }
+    with open(os.path.join(gen_dir, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(full_meta, fh, indent=1, ensure_ascii=False, default=int)
+
+    pointer = json.dumps({"generation": generation}).encode("utf-8")
+    _atomic_write(os.path.join(store_dir, _POINTER), lambda fh: fh.write(pointer))
+
+    # Hapus generasi lama (pemetaan yang masih terbuka tetap valid di Linux/macOS)
+    for name in os.listdir(store_dir):
+        if name.startswith("gen-") and name != generation:
+            shutil.rmtree(os.path.join(store_dir, name), ignore_errors=True)
+    return gen_dir
+
+
+class CentroidStore:
+    """
+    Store centroid bangunan yang dipetakan ke memori (np.load mmap_mode="r").
+    Semua array adalah view read-only tanpa salinan, sehingga beberapa worker Streamlit
+    berbagi satu salinan di page cache OS.
+    """
+
+    def __init__(self, gen_dir):
+        self.path = gen_dir
+        with open(os.path.join(gen_dir, "meta.json"), "r", encoding="utf-8") as fh:
+            self.meta = json.load(fh)
+        self.arrays = {
+            name[:-len(".npy")]: np.load(os.path.join(gen_dir, name), mmap_mode="r")
+            for name in os.listdir(gen_dir) if name.endswith(".npy")
+        }
+        self.kelurahan = pd.DataFrame(self.meta["kelurahan"])
+        self.building_categories = np.array(self.meta["building_categories"], dtype=str)
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def __len__(self):
+        return self.meta["n_buildings"]
+
+    def kelurahan_slice(self, kelurahan_id):
+        """slice bangunan satu kelurahan (bangunan disimpan bersebelahan per kelurahan)."""
+        row = self.kelurahan.iloc[kelurahan_id]
+        return slice(int(row["offset"]), int(row["offset"] + row["homepass"]))
+
+    def kecamatan_rows(self, kecamatan):
+        """Baris tabel kelurahan milik satu kecamatan, urutan sama seperti file dibaca."""
+        return self.kelurahan[self.kelurahan["kecamatan"] == kecamatan]
+
+    def buildings(self):
+        """Tabel bangunan dengan format yang sama seperti analysis.load_buildings (array berupa view)."""
+        return {
+            "lon": self["lon"],
+            "lat": self["lat"],
+            "osm_id": self["osm_id"],
+            "osm_type": self["osm_type"],
+            "building_code": self["building_code"],
+            "building_categories": self.building_categories,
+            "kelurahan_id": self["kelurahan_id"],
+            "kelurahan": self.kelurahan[["area", "kecamatan", "kelurahan", "file", "homepass"]],
+            "diagnostics": [],
+        }
+
+
+# Store yang sudah dibuka per (store_dir, generasi), dipakai bersama dalam satu proses
+_open_stores = {}
+
+
+def open_store(store_dir: str = DEFAULT_STORE_DIR):
+    """Buka generasi store terbaru, atau None jika belum pernah dibangun / versinya lain."""
+    try:
+        with open(os.path.join(store_dir, _POINTER), "r", encoding="utf-8") as fh:
+            generation = json.load(fh)["generation"]
+        key = (os.path.abspath(store_dir), generation)
+        if key not in _open_stores:
+            _open_stores.clear()
+            _open_stores[key] = CentroidStore(os.path.join(store_dir, generation))
+        store = _open_stores[key]
+    except (OSError, ValueError, KeyError):
+        return None
+    if store.meta.get("version") != STORE_VERSION:
+        return None
+    return store
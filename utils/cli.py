@@ -0,0 +1,467 @@
+# cli.py
+# Entry point command-line untuk menjalankan analisis tanpa Streamlit (mis. dari cron).
+#
+#     python -m utils.cli run --output output --formats parquet csv json
+import argparse
+import os
+import sys
+import tempfile
+
+from utils.analysis import data_fingerprint, get_area_kecamatan_info, kecamatan_fingerprints, load_buildings, run_analysis
+from utils.api import DEFAULT_HOST, DEFAULT_PORT, ApiError, HomepassApi, make_server
+from utils.catalog import DEFAULT_CATALOG_PATH, catalog_area_info, catalog_table, update_catalog
+from utils.centroid_store import DEFAULT_STORE_DIR, open_store, write_store
+from utils.coverage import DEFAULT_DROP_RADIUS_M, compute_coverage, load_odp_points
+from utils.export import DEFAULT_EXPORT_NAME, EXPORT_FORMATS, _stem, export_region
+from utils.ingest_cache import DEFAULT_CACHE_DIR
+from utils.profiling import CAPTURE_MODES, Profiler
+from utils.placement import kecamatan_buildings, propose_odp_locations
+from utils.report import pdf_report_bytes, pie_chart_png, render_all_reports, som_bar_png
+from utils.region_query import METRICS, RegionQuery, build_region_table
+from utils.results_store import DEFAULT_OUTPUT_DIR, SUPPORTED_FORMATS, read_results, write_results
+from utils.snapshots import DEFAULT_SNAPSHOT_DIR, diff_snapshots, list_snapshots, load_snapshot, take_snapshot
+from utils.tiles import build_tiles, write_tiles
+from utils.weights import DEFAULT_WEIGHTS_PATH, load_weights
+
+
+def cmd_run(args):
+    area_info = get_area_kecamatan_info()
+    weights = load_weights(args.weights) if args.weights else None
+    analysis = run_analysis(
+        area_info,
+        odp_capacity=args.odp_capacity,
+        ingest_mode=args.ingest_mode,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        workers=args.workers,
+        store_dir=args.store_dir,
+        dedup=not args.no_dedup,
+        weights=weights,
+    )
+    meta = {
+        "odp_capacity": args.odp_capacity,
+        "dedup": analysis["dedup"] is not None,
+        "weights": weights,
+        "data_fingerprint": data_fingerprint(area_info),
+        "kecamatan_fingerprints": kecamatan_fingerprints(area_info),
+    }
+    written = write_results(analysis, area_info, args.output, args.formats, meta)
+    if not args.no_snapshot:
+        # Kunci osm_id per kelurahan dari store / cache ingestion yang baru saja dipakai run_analysis
+        store = _fresh_store(args.store_dir)
+        buildings = store.buildings() if store is not None else load_buildings(
+            area_info, cache_dir=None if args.no_cache else args.cache_dir, workers=args.workers)
+        try:
+            snapshot = take_snapshot(buildings, args.snapshot_dir, {"data_fingerprint": meta["data_fingerprint"]})
+        except ValueError as e:
+            snapshot = None
+            print(f"[WARNING] Snapshot dilewati: {e}", file=sys.stderr)
+        if snapshot:
+            written["snapshot"] = snapshot
+
+    for diag in analysis["diagnostics"]:
+        print(f"[{diag['level'].upper()}] {diag['message']}", file=sys.stderr)
+    total_kel = sum(len(df) for df in analysis["results"].values())
+    print(f"{len(analysis['results'])} kecamatan, {total_kel} kelurahan diproses.")
+    if analysis["dedup"] is not None:
+        overlap = analysis["dedup"]["kecamatan"]
+        print(f"Deduplikasi: {int(overlap['homepass_mentah'].sum() - overlap['homepass_unik'].sum())} bangunan duplikat tidak dihitung ulang.")
+    for fmt, path in written.items():
+        print(f"  {fmt:<15} {path}")
+    return 1 if not analysis["results"] else 0
+
+
+def cmd_reports(args):
+    area_info = get_area_kecamatan_info()
+    analysis = run_analysis(area_info, odp_capacity=args.odp_capacity, workers=args.workers)
+    bundles = render_all_reports(analysis["results"], area_info, workers=args.workers)
+
+    report_dir = os.path.join(args.output, "reports")
+    os.makedirs(report_dir, exist_ok=True)
+    area_of = {kec: area for area, kec_list in area_info.items() for kec in kec_list}
+    for kec, bundle in bundles.items():
+        stem = _stem(area_of[kec], kec)
+        for name, data in bundle.items():
+            ext = "pdf" if name == "pdf" else "png"
+            suffix = "" if name == "pdf" else "_" + name[:-len("_png")]
+            with open(os.path.join(report_dir, f"{stem}{suffix}.{ext}"), "wb") as fh:
+                fh.write(data)
+    print(f"{len(bundles)} laporan kecamatan ditulis ke {report_dir}")
+    return 0 if bundles else 1
+
+
+def _fresh_store(store_dir):
+    # Store hanya dipakai jika semua kecamatan yang dikonfigurasi masih sesuai data di disk
+    area_info = get_area_kecamatan_info()
+    store = open_store(store_dir) if store_dir else None
+    if store is not None and store.meta.get("kecamatan_fingerprints") == kecamatan_fingerprints(area_info):
+        return store
+    return None
+
+
+def cmd_store(args):
+    area_info = get_area_kecamatan_info()
+    buildings = load_buildings(area_info, workers=args.workers)
+    meta = {"kecamatan_fingerprints": kecamatan_fingerprints(area_info)}
+    gen_dir = write_store(buildings, args.store_dir, meta)
+    for diag in buildings["diagnostics"]:
+        print(f"[{diag['level'].upper()}] {diag['message']}", file=sys.stderr)
+    size = sum(os.path.getsize(os.path.join(gen_dir, f)) for f in os.listdir(gen_dir))
+    print(f"{len(buildings['lon'])} bangunan, {len(buildings['kelurahan'])} kelurahan -> {gen_dir} ({size / 1024:.0f} KB)")
+    return 0
+
+
+def _region_results(args):
+    # Hasil pra-hitung dipakai jika masih sesuai data, selain itu dihitung langsung
+    area_info = get_area_kecamatan_info()
+    precomputed = read_results(args.output)
+    if (precomputed is not None and precomputed["meta"].get("data_fingerprint") == data_fingerprint(area_info)
+            and precomputed["meta"].get("odp_capacity") == args.odp_capacity and precomputed["meta"].get("dedup", False)
+            and precomputed["meta"].get("weights") is None):
+        return precomputed["results"]
+    return run_analysis(area_info, odp_capacity=args.odp_capacity, workers=args.workers,
+                        store_dir=args.store_dir)["results"]
+
+
+def cmd_query(args):
+    area_info = get_area_kecamatan_info()
+    query = RegionQuery(build_region_table(_region_results(args), area_info))
+
+    if args.zero_odp is not None:
+        table = query.zero_odp_high_homepass(args.zero_odp, args.n, args.area, args.kecamatan)
+    elif args.gap:
+        table = query.largest_gap(args.n, args.area, args.kecamatan)
+    else:
+        table = query.top(args.top, args.n, args.area, args.kecamatan)
+    if table.empty:
+        print("Tidak ada kelurahan yang memenuhi kriteria.")
+        return 0
+    print(table[["area", "kecamatan", "kelurahan", "homepass", "ODP", "SAM", "SOM", "gap", "ranking_region",
+                 "kategori_region"]].to_string(index=False))
+    return 0
+
+
+def cmd_export(args):
+    area_info = get_area_kecamatan_info()
+    results = _region_results(args)
+    if args.area:
+        results = {kec: df for kec, df in results.items() if kec in area_info.get(args.area, {})}
+    if not results:
+        print("Tidak ada hasil kecamatan untuk diekspor.", file=sys.stderr)
+        return 1
+    zip_path = os.path.join(args.output, args.zip_name)
+    manifest = export_region(results, area_info, zip_path, args.formats, args.workers,
+                             title=args.area or "Seluruh Region")
+    for fmt, reason in manifest["skipped"].items():
+        print(f"[WARNING] Format {fmt} dilewati: {reason}", file=sys.stderr)
+    size = os.path.getsize(zip_path)
+    print(f"{manifest['kecamatan']} kecamatan, {manifest['kelurahan']} kelurahan, {len(manifest['files'])} file "
+          f"dalam {manifest['seconds']:.1f} s -> {zip_path} ({size / 1e6:.1f} MB)")
+    return 0
+
+
+def cmd_catalog(args):
+    catalog = update_catalog(catalog_path=args.catalog_path, count=True, rebuild=args.rebuild)
+    table = catalog_table(catalog)
+    for warning in catalog["warnings"]:
+        print(f"[WARNING] {warning}", file=sys.stderr)
+    for area, kecamatan_list in catalog_area_info(catalog).items():
+        print(area)
+        for kec, info in kecamatan_list.items():
+            rows = table[table["kecamatan"] == kec]
+            print(f"  {kec:<16} {len(rows):>3} kelurahan  {int(rows['features'].sum()):>9} feature  "
+                  f"{rows['size'].sum() / 1e6:>7.1f} MB  ODP {info['total_odp']}")
+    print(f"{len(table)} file, {catalog.get('counted', 0)} baru/berubah dipindai -> {args.catalog_path}")
+    return 0
+
+
+def cmd_snapshot(args):
+    area_info = get_area_kecamatan_info()
+    store = _fresh_store(args.store_dir)
+    buildings = store.buildings() if store is not None else load_buildings(area_info, workers=args.workers)
+    meta = {"data_fingerprint": data_fingerprint(area_info), "label": args.label}
+    path = take_snapshot(buildings, args.snapshot_dir, meta, force=args.force)
+    if path is None:
+        print("Data tidak berubah sejak snapshot terakhir; tidak ada snapshot baru (pakai --force untuk tetap menulis).")
+        return 0
+    print(f"{len(buildings['lon'])} bangunan, {len(buildings['kelurahan'])} kelurahan -> {path} "
+          f"({os.path.getsize(path) / 1024:.0f} KB)")
+    return 0
+
+
+def cmd_diff(args):
+    snapshots = list_snapshots(args.snapshot_dir)
+    if args.list:
+        for row in snapshots.itertuples():
+            print(f"  {row.id}  {row.n_buildings:>9} bangunan  {row.label}")
+        return 0
+    if len(snapshots) < 2 and not (args.old and args.new):
+        print(f"Butuh minimal dua snapshot di {args.snapshot_dir}.", file=sys.stderr)
+        return 1
+    by_id = snapshots.set_index("id")["path"]
+    old_id = args.old or snapshots["id"].iloc[-2]
+    new_id = args.new or snapshots["id"].iloc[-1]
+    missing = [i for i in (old_id, new_id) if i not in by_id.index]
+    if missing:
+        print(f"Snapshot tidak ditemukan: {', '.join(missing)}", file=sys.stderr)
+        return 1
+    diff = diff_snapshots(load_snapshot(by_id[old_id]), load_snapshot(by_id[new_id]))
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"growth_{old_id}_{new_id}.csv")
+    diff.to_csv(path, index=False)
+    per_kec = diff.groupby("kecamatan")[["sebelum", "sesudah", "ditambah", "dihapus", "selisih"]].sum()
+    print(f"{old_id} -> {new_id}: +{int(diff['ditambah'].sum())} / -{int(diff['dihapus'].sum())} bangunan")
+    for kec, row in per_kec[(per_kec["ditambah"] > 0) | (per_kec["dihapus"] > 0)].iterrows():
+        print(f"  {kec:<20} {row['sebelum']:>7} -> {row['sesudah']:>7}  (+{row['ditambah']} / -{row['dihapus']})")
+    print(f"  kelurahan {path}")
+    return 0
+
+
+def cmd_coverage(args):
+    area_info = get_area_kecamatan_info()
+    store = _fresh_store(args.store_dir)
+    buildings = store.buildings() if store is not None else load_buildings(area_info, workers=args.workers)
+    odp = load_odp_points(args.odp)
+    coverage = compute_coverage(buildings, odp, args.radius, args.odp_capacity, args.som_rate)
+
+    os.makedirs(args.output, exist_ok=True)
+    kel_path = os.path.join(args.output, "coverage_kelurahan.csv")
+    odp_path = os.path.join(args.output, "coverage_odp.csv")
+    coverage["kelurahan"].to_csv(kel_path, index=False)
+    coverage["odp"].to_csv(odp_path, index=False)
+
+    for diag in buildings["diagnostics"]:
+        print(f"[{diag['level'].upper()}] {diag['message']}", file=sys.stderr)
+    print(f"{len(odp)} ODP, {len(buildings['lon'])} bangunan, radius {args.radius:g} m: "
+          f"SAM {int(coverage['served'].sum())}, SOM {int(coverage['kelurahan']['SOM'].sum())}")
+    print(f"  kelurahan {kel_path}")
+    print(f"  odp       {odp_path}")
+    return 0
+
+
+def cmd_place(args):
+    area_info = get_area_kecamatan_info()
+    store = _fresh_store(args.store_dir)
+    buildings = store.buildings() if store is not None else load_buildings(area_info, workers=args.workers)
+    kec = kecamatan_buildings(buildings, args.kecamatan.lower())
+    if not len(kec["lon"]):
+        print(f"Tidak ada bangunan untuk kecamatan {args.kecamatan}.", file=sys.stderr)
+        return 1
+    placement = propose_odp_locations(kec["lon"], kec["lat"], args.odp_capacity, args.radius,
+                                      args.odp_count, args.som_rate)
+    odp = placement["odp"]
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"placement_{args.kecamatan.lower()}.csv")
+    odp.to_csv(path, index=False)
+    served = int(odp["SAM_kumulatif"].iloc[-1]) if len(odp) else 0
+    print(f"{len(odp)} ODP usulan untuk {args.kecamatan.title()}: {served} dari {len(kec['lon'])} Homepass terlayani, "
+          f"SOM {int(odp['SOM_kumulatif'].iloc[-1]) if len(odp) else 0}")
+    print(f"  odp {path}")
+    return 0
+
+
+def cmd_tiles(args):
+    area_info = get_area_kecamatan_info()
+    store = _fresh_store(args.store_dir)
+    buildings = store.buildings() if store is not None else load_buildings(area_info, workers=args.workers)
+    meta = {"data_fingerprint": data_fingerprint(area_info), "overlay": "alokasi", "odp_capacity": args.odp_capacity}
+    if args.odp:
+        coverage = compute_coverage(buildings, load_odp_points(args.odp), args.radius, args.odp_capacity, args.som_rate)
+        tiles = build_tiles(buildings, served=coverage["served"], som_rate=args.som_rate)
+        meta.update(overlay="odp", odp_file=args.odp, radius_m=args.radius)
+    else:
+        analysis = run_analysis(area_info, odp_capacity=args.odp_capacity, workers=args.workers, store_dir=args.store_dir)
+        tiles = build_tiles(buildings, analysis["results"])
+    path = write_tiles(tiles, args.output, meta)
+
+    per_level = tiles["cells"].groupby("cell_size_m", sort=False).size()
+    print(f"{len(tiles['cells'])} sel, {len(per_level)} level -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    for size, n in per_level.items():
+        print(f"  {size:>7g} m  {n} sel")
+    return 0
+
+
+def cmd_profile(args):
+    area_info = get_area_kecamatan_info()
+    capture = None if args.capture == "none" else args.capture
+    with tempfile.TemporaryDirectory() as cold_cache:
+        with Profiler(capture=capture) as prof:
+            analysis = run_analysis(
+                area_info,
+                odp_capacity=args.odp_capacity,
+                cache_dir=cold_cache if args.cold else args.cache_dir,
+                workers=args.workers,
+                store_dir=None if args.cold else args.store_dir,
+            )
+            if args.reports:
+                area_of = {kec: area for area, kec_list in area_info.items() for kec in kec_list}
+                for kec, df in analysis["results"].items():
+                    pdf_report_bytes(area_of[kec], kec, df)
+                    pie_chart_png(df)
+                    if df["SOM"].sum() > 0:
+                        som_bar_png(df)
+
+    os.makedirs(args.output, exist_ok=True)
+    path = prof.write_json(os.path.join(args.output, "profile.json"))
+    report = prof.report()
+    print(f"Total {report['total_seconds']:.3f} s ({len(report['spans'])} span, capture: {args.capture})")
+    for row in report["stages"][:15]:
+        print(f"  {row['stage']:<14} {row['seconds']:>8.3f} s  x{row['count']:<5} {row['features']:>9} feature  {row['bytes'] / 1e6:>8.1f} MB")
+    print(f"  laporan {path}")
+    return 0
+
+
+def cmd_serve(args):
+    area_info = get_area_kecamatan_info()
+    api = HomepassApi(args.output, area_info)
+    try:
+        snap = api.snapshot()
+        print(f"{len(snap.kecamatan)} kecamatan, {len(snap.query)} kelurahan, {len(snap.scenarios)} skenario dimuat dari {args.output}.")
+    except ApiError as e:
+        print(f"[WARNING] {e}", file=sys.stderr)
+    server = make_server(api, args.host, args.port, verbose=args.verbose)
+    print(f"API berjalan di http://{args.host}:{server.server_address[1]}/v1/ (Ctrl+C untuk berhenti)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.cli", description="Analisis Homepass Kapten Naratel (headless)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Proses semua area/kecamatan yang dikonfigurasi dan tulis hasilnya")
+    run.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    run.add_argument("--formats", nargs="+", default=list(SUPPORTED_FORMATS), choices=SUPPORTED_FORMATS)
+    run.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas Homepass per ODP (default: 16)")
+    run.add_argument("--ingest-mode", default="stream", choices=["stream", "geopandas"])
+    run.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    run.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    run.add_argument("--no-cache", action="store_true", help="Jangan pakai cache ingestion di disk")
+    run.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    run.add_argument("--weights", nargs="?", const=DEFAULT_WEIGHTS_PATH, default=None,
+                     help=f"Hitung Homepass berbobot unit rumah tangga (model JSON, default: {DEFAULT_WEIGHTS_PATH})")
+    run.add_argument("--no-dedup", action="store_true", help="Hitung Homepass per file tanpa deduplikasi osm_id antar file")
+    run.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR, help=f"Folder riwayat snapshot osm_id (default: {DEFAULT_SNAPSHOT_DIR})")
+    run.add_argument("--no-snapshot", action="store_true", help="Jangan catat snapshot osm_id untuk run ini")
+    run.set_defaults(func=cmd_run)
+
+    reports = sub.add_parser("reports", help="Render laporan PDF dan grafik semua kecamatan secara paralel")
+    reports.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    reports.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas Homepass per ODP (default: 16)")
+    reports.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    reports.set_defaults(func=cmd_reports)
+
+    query = sub.add_parser("query", help="Ranking kelurahan lintas kecamatan (top N, gap Homepass-SAM, ODP 0)")
+    query.add_argument("--top", default="SOM", choices=METRICS, help="Metrik untuk top N (default: SOM)")
+    query.add_argument("--gap", action="store_true", help="Urutkan berdasarkan Homepass yang belum tertampung SAM")
+    query.add_argument("--zero-odp", type=float, default=None, metavar="PERSENTIL",
+                       help="Kelurahan tanpa ODP dengan Homepass >= persentil region (mis. 0.75)")
+    query.add_argument("-n", type=int, default=10, help="Jumlah kelurahan (default: 10)")
+    query.add_argument("--area", default=None)
+    query.add_argument("--kecamatan", nargs="+", default=None)
+    query.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas Homepass per ODP (default: 16)")
+    query.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil pra-hitung (default: {DEFAULT_OUTPUT_DIR})")
+    query.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    query.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    query.set_defaults(func=cmd_query)
+
+    export = sub.add_parser("export", help="Paket laporan lengkap (PDF per kecamatan & region, Excel/CSV/Parquet) dalam satu zip")
+    export.add_argument("--formats", nargs="+", default=list(EXPORT_FORMATS), choices=EXPORT_FORMATS)
+    export.add_argument("--area", default=None, help="Batasi ke satu area (default: semua area)")
+    export.add_argument("--zip-name", default=DEFAULT_EXPORT_NAME, help=f"Nama file zip (default: {DEFAULT_EXPORT_NAME})")
+    export.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas Homepass per ODP (default: 16)")
+    export.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    export.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    export.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    export.set_defaults(func=cmd_export)
+
+    catalog = sub.add_parser("catalog", help="Pindai folder data dan perbarui indeks katalog (area, kecamatan, kelurahan)")
+    catalog.add_argument("--rebuild", action="store_true", help="Abaikan indeks lama dan pindai ulang semua file")
+    catalog.add_argument("--catalog-path", default=DEFAULT_CATALOG_PATH)
+    catalog.set_defaults(func=cmd_catalog)
+
+    snapshot = sub.add_parser("snapshot", help="Catat snapshot osm_id per kelurahan dari data saat ini")
+    snapshot.add_argument("--label", default=None, help="Keterangan snapshot (mis. nama ekspor OSM)")
+    snapshot.add_argument("--force", action="store_true", help="Tulis snapshot meski data tidak berubah")
+    snapshot.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    snapshot.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    snapshot.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    snapshot.set_defaults(func=cmd_snapshot)
+
+    diff = sub.add_parser("diff", help="Bangunan ditambah/dihapus per kelurahan antara dua snapshot")
+    diff.add_argument("old", nargs="?", default=None, help="Id snapshot lama (default: kedua terakhir)")
+    diff.add_argument("new", nargs="?", default=None, help="Id snapshot baru (default: terakhir)")
+    diff.add_argument("--list", action="store_true", help="Tampilkan daftar snapshot saja")
+    diff.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    diff.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    diff.set_defaults(func=cmd_diff)
+
+    coverage = sub.add_parser("coverage", help="Hitung SAM berbasis jarak dari lokasi ODP (GeoJSON/CSV)")
+    coverage.add_argument("--odp", required=True, help="File lokasi ODP (.geojson Point atau .csv dengan kolom lon/lat)")
+    coverage.add_argument("--radius", type=float, default=DEFAULT_DROP_RADIUS_M, help=f"Jangkauan drop cable dalam meter (default: {DEFAULT_DROP_RADIUS_M:g})")
+    coverage.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas port per ODP (default: 16)")
+    coverage.add_argument("--som-rate", type=float, default=0.3, help="Rasio SOM terhadap SAM (default: 0.3)")
+    coverage.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    coverage.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    coverage.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    coverage.set_defaults(func=cmd_coverage)
+
+    place = sub.add_parser("place", help="Usulkan lokasi ODP baru untuk satu kecamatan (greedy berdasarkan cakupan)")
+    place.add_argument("--kecamatan", required=True)
+    place.add_argument("--odp-count", type=int, default=None, help="Jumlah ODP baru (default: sampai semua Homepass terjangkau)")
+    place.add_argument("--radius", type=float, default=DEFAULT_DROP_RADIUS_M, help=f"Jangkauan drop cable dalam meter (default: {DEFAULT_DROP_RADIUS_M:g})")
+    place.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas port per ODP (default: 16)")
+    place.add_argument("--som-rate", type=float, default=0.3, help="Rasio SOM terhadap SAM (default: 0.3)")
+    place.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    place.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    place.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    place.set_defaults(func=cmd_place)
+
+    tiles = sub.add_parser("tiles", help="Bangun piramida grid kepadatan bangunan (dengan overlay SAM/SOM) untuk peta")
+    tiles.add_argument("--odp", default=None, help="Lokasi ODP untuk overlay SAM/SOM berbasis jarak (default: overlay dari alokasi)")
+    tiles.add_argument("--radius", type=float, default=DEFAULT_DROP_RADIUS_M, help=f"Jangkauan drop cable dalam meter (default: {DEFAULT_DROP_RADIUS_M:g})")
+    tiles.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas port per ODP (default: 16)")
+    tiles.add_argument("--som-rate", type=float, default=0.3, help="Rasio SOM terhadap SAM (default: 0.3)")
+    tiles.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    tiles.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    tiles.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    tiles.set_defaults(func=cmd_tiles)
+
+    profile = sub.add_parser("profile", help="Ukur waktu, byte, jumlah feature dan memori per tahap pipeline")
+    profile.add_argument("--capture", default="none", choices=["none"] + [m for m in CAPTURE_MODES if m])
+    profile.add_argument("--cold", action="store_true", help="Pakai cache ingestion kosong (ukur pembacaan GeoJSON penuh)")
+    profile.add_argument("--reports", action="store_true", help="Ikut ukur render grafik & PDF per kecamatan")
+    profile.add_argument("--odp-capacity", type=int, default=16, help="Kapasitas Homepass per ODP (default: 16)")
+    profile.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil (default: {DEFAULT_OUTPUT_DIR})")
+    profile.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    profile.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    profile.add_argument("--store-dir", default=DEFAULT_STORE_DIR, help="Centroid store yang dipakai jika masih sesuai data")
+    profile.set_defaults(func=cmd_profile)
+
+    serve = sub.add_parser("serve", help="API HTTP JSON (ETag, gzip, paginasi) di atas hasil pra-hitung `run`")
+    serve.add_argument("--host", default=DEFAULT_HOST, help=f"Alamat bind (default: {DEFAULT_HOST})")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    serve.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help=f"Folder hasil pra-hitung (default: {DEFAULT_OUTPUT_DIR})")
+    serve.add_argument("--verbose", action="store_true", help="Tulis log setiap request ke stderr")
+    serve.set_defaults(func=cmd_serve)
+
+    store = sub.add_parser("store", help="Bangun centroid store biner (memory-mapped) dari semua file GeoJSON")
+    store.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    store.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: semua core)")
+    store.set_defaults(func=cmd_store)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# coverage.py
+import csv
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils.spatial import GridIndex, to_local_xy
+
+# Jangkauan drop cable default dari ODP ke bangunan (meter)
+DEFAULT_DROP_RADIUS_M = 150.0
+
+_LON_COLUMNS = ("lon", "lng", "long", "longitude", "x")
+_LAT_COLUMNS = ("lat", "latitude", "y")
+_ID_COLUMNS = ("odp_id", "id", "name", "nama")
+
+
+def load_odp_points(path: str) -> pd.DataFrame:
+    """
+    Baca lokasi ODP dari GeoJSON (feature Point) atau CSV (kolom lon/lat atau longitude/latitude).
+    Kembalikan DataFrame dengan kolom odp_id, lon, lat.
+    """
+    rows = []
+    if path.lower().endswith((".geojson", ".json")):
+        with open(path, "r", encoding="utf-8") as fh:
+            collection = json.load(fh)
+        for i, feature in enumerate(collection.get("features", [])):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                continue
+            props = feature.get("properties") or {}
+            odp_id = next((props[c] for c in _ID_COLUMNS if props.get(c) not in (None, "")), f"ODP-{i + 1}")
+            rows.append({"odp_id": str(odp_id), "lon": float(geometry["coordinates"][0]), "lat": float(geometry["coordinates"][1])})
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as fh:
+            reader = csv.DictReader(fh)
+            fields = {name.lower().strip(): name for name in reader.fieldnames or []}
+            lon_col = next((fields[c] for c in _LON_COLUMNS if c in fields), None)
+            lat_col = next((fields[c] for c in _LAT_COLUMNS if c in fields), None)
+            id_col = next((fields[c] for c in _ID_COLUMNS if c in fields), None)
+            if lon_col is None or lat_col is None:
+                raise ValueError(f"CSV ODP harus punya kolom lon/lat (ditemukan: {reader.fieldnames})")
+            for i, row in enumerate(reader):
+                if not row[lon_col] or not row[lat_col]:
+                    continue
+                odp_id = row[id_col] if id_col and row[id_col] else f"ODP-{i + 1}"
+                rows.append({"odp_id": odp_id, "lon": float(row[lon_col]), "lat": float(row[lat_col])})
+    return pd.DataFrame(rows, columns=["odp_id", "lon", "lat"])
+
+
+def assign_served(building, odp, dist, n_buildings, capacity):
+    """
+    Alokasi bangunan ke ODP berkapasitas dari pasangan (bangunan, ODP, jarak) dalam radius.
+
+    Hasilnya sama dengan greedy berurutan: semua pasangan diurutkan menurut jarak, lalu
+    pasangan diambil jika bangunannya belum terlayani dan ODP-nya masih punya port. Bangunan
+    yang ODP terdekatnya penuh tetap bisa dilayani ODP lain dalam jangkauan. Dikerjakan per
+    putaran secara vektor: pasangan diterima jika ODP itu adalah pilihan terdekat bangunan
+    yang masih tersedia dan bangunan itu termasuk sisa-kapasitas terdekat ODP tersebut
+    (keduanya pasti juga diambil oleh greedy berurutan).
+    Kembalikan indeks ODP pelayan per bangunan (-1 = tidak terlayani).
+    """
+    assignment = np.full(n_buildings, -1, dtype=np.int64)
+    if not building.size or capacity <= 0:
+        return assignment
+    # Urutan jarak (jarak sama: urutan input) sekali di awal; urutan per ODP dari satu sort stabil,
+    # lalu hanya disaring di setiap putaran (tanpa sort ulang)
+    order = np.argsort(dist, kind="stable")
+    building, odp = building[order], odp[order]
+    by_odp = np.argsort(odp, kind="stable")
+    remaining = np.full(int(odp.max()) + 1, capacity, dtype=np.int64)
+
+    while building.size:
+        position = np.arange(building.size)
+        # Pilihan terdekat setiap bangunan: kemunculan pertama dalam urutan jarak
+        first_pos = np.full(n_buildings, building.size, dtype=np.int64)
+        np.minimum.at(first_pos, building, position)
+        first = first_pos[building] == position
+        # Peringkat pasangan di antara pasangan ODP yang sama (urutan jarak)
+        group = odp[by_odp]
+        counts = np.bincount(group, minlength=remaining.size)
+        rank = np.empty(building.size, dtype=np.int64)
+        rank[by_odp] = position - (np.cumsum(counts) - counts)[group]
+        accept = first & (rank < remaining[odp])
+
+        assignment[building[accept]] = odp[accept]
+        remaining -= np.bincount(odp[accept], minlength=remaining.size)
+        keep = (assignment[building] < 0) & (remaining[odp] > 0)
+        by_odp = (np.cumsum(keep) - 1)[by_odp[keep[by_odp]]]
+        building, odp = building[keep], odp[keep]
+    return assignment
+
+
+def compute_coverage(buildings: dict, odp: pd.DataFrame, radius_m: float = DEFAULT_DROP_RADIUS_M,
+                     odp_capacity: int = 16, som_rate: float = 0.3) -> dict:
+    """
+    Hitung SAM berbasis jarak dari lokasi ODP nyata.
+
+    Pasangan bangunan (centroid dari load_buildings) dan ODP dalam radius_m dicari lewat
+    GridIndex, lalu dialokasikan dengan assign_served: pasangan terdekat lebih dulu, paling
+    banyak odp_capacity bangunan per ODP.
+    Kembalikan dict:
+      "odp": per ODP (odp_id, lon, lat, dalam_jangkauan = bangunan dalam radius, terlayani)
+      "kelurahan": per kelurahan (area, kecamatan, kelurahan, homepass, dalam_jangkauan, SAM, SOM)
+      "served": mask per bangunan, "odp_index": ODP pelayan per bangunan (-1 jika tidak ada)
+    """
+    lon, lat = buildings["lon"], buildings["lat"]
+    lat0 = float(np.nanmean(lat)) if lat.size else 0.0
+    lon0 = float(np.nanmean(lon)) if lon.size else 0.0
+    bx, by = to_local_xy(lon, lat, lat0, lon0)
+    ox, oy = to_local_xy(odp["lon"].to_numpy(), odp["lat"].to_numpy(), lat0, lon0)
+
+    index = GridIndex(ox, oy, cell_size=max(radius_m, 1.0))
+    valid = np.flatnonzero(np.isfinite(bx) & np.isfinite(by))
+    query_idx, odp_idx, dist = index.query_radius(bx[valid], by[valid], radius_m)
+    building_idx = valid[query_idx]
+
+    owner = assign_served(building_idx, odp_idx, dist, lon.size, odp_capacity)
+    served = owner >= 0
+    in_range = np.zeros(lon.size, dtype=bool)
+    in_range[building_idx] = True
+
+    odp_table = odp.copy()
+    odp_table["dalam_jangkauan"] = np.bincount(odp_idx, minlength=len(odp))
+    odp_table["terlayani"] = np.bincount(owner[served], minlength=len(odp))
+
+    kel = buildings["kelurahan"][["area", "kecamatan", "kelurahan", "homepass"]].copy()
+    n_kel = len(kel)
+    kel["dalam_jangkauan"] = np.bincount(buildings["kelurahan_id"][in_range], minlength=n_kel)
+    kel["SAM"] = np.bincount(buildings["kelurahan_id"][served], minlength=n_kel)
+    kel["SOM"] = np.round(kel["SAM"].to_numpy() * som_rate).astype(int)
+
+    return {"odp": odp_table, "kelurahan": kel, "served": served, "odp_index": owner}
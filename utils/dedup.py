@@ -0,0 +1,83 @@
+# dedup.py
+import numpy as np
+import pandas as pd
+
+
+def building_keys(osm_id, osm_type):
+    """
+    Kunci int64 unik per objek OSM: osm_id * 4 + (osm_type + 1), setara dengan full_id
+    ("w123" dan "n123" adalah objek berbeda). Bangunan tanpa osm_id mendapat kunci -1.
+    """
+    osm_id = np.asarray(osm_id, dtype=np.int64)
+    osm_type = np.asarray(osm_type, dtype=np.int64)
+    return np.where(osm_id >= 0, osm_id * 4 + (osm_type + 1), -1)
+
+
+def deduplicate(key_parts):
+    """
+    Tentukan pemilik setiap bangunan di seluruh bagian (file/kelurahan) dalam satu run.
+
+    key_parts: list array kunci (building_keys) per bagian, dalam urutan kanonik run
+    (urutan area/kecamatan di konfigurasi, lalu nama file). Aturan kepemilikan: bangunan
+    yang muncul di beberapa bagian dimiliki bagian PERTAMA dalam urutan tersebut; bangunan
+    tanpa osm_id selalu dihitung. Memakai indeks array terurut (argsort stabil), sehingga
+    O(N log N) dan hanya beberapa array int64 untuk jutaan id.
+
+    Kembalikan (owned, owner_part): list mask bool per bagian dan list indeks bagian pemilik
+    untuk setiap bangunan (sama dengan bagian sendiri jika dimiliki sendiri).
+    """
+    sizes = np.array([len(k) for k in key_parts], dtype=np.int64)
+    if not sizes.sum():
+        return ([np.zeros(0, dtype=bool) for _ in key_parts],
+                [np.zeros(0, dtype=np.int64) for _ in key_parts])
+    keys = np.concatenate([np.asarray(k, dtype=np.int64) for k in key_parts])
+    part_id = np.repeat(np.arange(len(key_parts)), sizes)
+    owner_part = part_id.copy()
+
+    rows = np.flatnonzero(keys >= 0)
+    order = rows[np.argsort(keys[rows], kind="stable")]
+    sorted_keys = keys[order]
+    first = np.ones(order.size, dtype=bool)
+    first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(order.size), 0))
+    owner_part[order] = part_id[order[group_start]]
+
+    owned = owner_part == part_id
+    owned[order[~first]] = False  # duplikat di dalam bagian yang sama juga tidak dihitung ulang
+    bounds = np.cumsum(sizes)[:-1]
+    return np.split(owned, bounds), np.split(owner_part, bounds)
+
+
+def overlap_report(part_kecamatan, part_kelurahan, owned, owner_part):
+    """
+    Ringkas hasil deduplicate per kecamatan.
+    Kembalikan dict:
+      "kecamatan": kecamatan, homepass_mentah, homepass_unik, duplikat_internal, duplikat_lintas
+      "pairs": kecamatan, kelurahan, pemilik_kecamatan, pemilik_kelurahan, bangunan
+    """
+    part_kecamatan = np.asarray(part_kecamatan, dtype=object)
+    part_kelurahan = np.asarray(part_kelurahan, dtype=object)
+    n_parts = len(owned)
+    raw = np.array([len(o) for o in owned], dtype=np.int64)
+    unique = np.array([int(o.sum()) for o in owned], dtype=np.int64)
+
+    dup_part = np.concatenate([np.full(int((~o).sum()), i) for i, o in enumerate(owned)]) if n_parts else np.zeros(0, int)
+    dup_owner = np.concatenate([op[~o] for o, op in zip(owned, owner_part)]) if n_parts else np.zeros(0, int)
+    pairs = pd.DataFrame({
+        "kecamatan": part_kecamatan[dup_part.astype(int)] if dup_part.size else [],
+        "kelurahan": part_kelurahan[dup_part.astype(int)] if dup_part.size else [],
+        "pemilik_kecamatan": part_kecamatan[dup_owner.astype(int)] if dup_owner.size else [],
+        "pemilik_kelurahan": part_kelurahan[dup_owner.astype(int)] if dup_owner.size else [],
+    })
+    pairs = (pairs.groupby(list(pairs.columns), sort=False).size().rename("bangunan").reset_index()
+             if len(pairs) else pairs.assign(bangunan=pd.Series(dtype=np.int64)))
+
+    per_part = pd.DataFrame({"kecamatan": part_kecamatan, "homepass_mentah": raw, "homepass_unik": unique})
+    summary = per_part.groupby("kecamatan", sort=False)[["homepass_mentah", "homepass_unik"]].sum().reset_index()
+    cross = pairs[pairs["kecamatan"] != pairs["pemilik_kecamatan"]].groupby("kecamatan")["bangunan"].sum()
+    summary["duplikat_lintas"] = summary["kecamatan"].map(cross).fillna(0).astype(np.int64)
+    summary["duplikat_internal"] = summary["homepass_mentah"] - summary["homepass_unik"] - summary["duplikat_lintas"]
+    return {
+        "kecamatan": summary[["kecamatan", "homepass_mentah", "homepass_unik", "duplikat_internal", "duplikat_lintas"]],
+        "pairs": pairs,
+    }
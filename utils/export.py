@@ -0,0 +1,204 @@
+# export.py
+import io
+import json
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from matplotlib.figure import Figure
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table
+
+from utils.ingest_cache import _atomic_write
+from utils.region_query import RegionQuery, build_region_table
+from utils.report import (
+    PDF_DPI, create_pdf_report_kecamatan, figure_png, kelurahan_table, pdf_styles, scaled_col_widths, table_style,
+)
+
+EXPORT_FORMATS = ("pdf", "xlsx", "csv", "parquet")
+DEFAULT_EXPORT_NAME = "homepass_export.zip"
+
+# Jumlah render PDF yang boleh menunggu ditulis ke zip per worker, agar memori tetap terbatas
+_IN_FLIGHT_PER_WORKER = 2
+
+# Ringkasan per kecamatan di tabel export (kolom -> agregasi dari tabel region)
+_KECAMATAN_SUMMARY = {"kelurahan": "size", "homepass": "sum", "ODP": "sum", "SAM": "sum", "SOM": "sum", "gap": "sum"}
+
+
+def _stem(area, kecamatan):
+    return f"laporan_{area.lower().replace(' ', '_')}_{kecamatan.lower()}"
+
+
+def render_kecamatan_pdf(area, kecamatan, df):
+    """Render satu PDF kecamatan di worker (tanpa render cache proses utama)."""
+    return area, kecamatan, create_pdf_report_kecamatan(area, kecamatan, df).getvalue()
+
+
+def _bounded_map(func, jobs, workers):
+    """
+    Seperti pool.map, tetapi hanya workers * _IN_FLIGHT_PER_WORKER job yang dikirim sekaligus,
+    sehingga hasil yang sudah selesai tidak menumpuk di memori sebelum ditulis.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield func(*job)
+        return
+    window = (workers or os.cpu_count() or 1) * _IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(func, *job) for job in jobs[:window])
+        next_job = len(pending)
+        while pending:
+            result = pending.popleft().result()
+            if next_job < len(jobs):
+                pending.append(pool.submit(func, *jobs[next_job]))
+                next_job += 1
+            yield result
+
+
+def kecamatan_summary(table: pd.DataFrame) -> pd.DataFrame:
+    """Total per kecamatan dari tabel region: kelurahan, homepass, ODP, SAM, SOM, gap."""
+    summary = table.groupby(["area", "kecamatan"], observed=True, sort=False).agg(
+        **{col: ("kelurahan" if agg == "size" else col, agg) for col, agg in _KECAMATAN_SUMMARY.items()})
+    return summary.reset_index()
+
+
+def _som_per_kecamatan_fig(summary):
+    fig = Figure(figsize=(7, 4))
+    ax = fig.subplots()
+    top = summary.sort_values("SOM", ascending=False).head(30)
+    ax.bar(top["kecamatan"].astype(str).str.title(), top["SOM"], color="#FFD700")
+    ax.set_title("SOM per Kecamatan")
+    ax.set_ylabel("Jumlah SOM")
+    ax.tick_params(axis='x', labelsize=7, labelrotation=60)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    fig.tight_layout()
+    return fig
+
+
+def create_region_pdf(table: pd.DataFrame, results: dict, title: str = "Seluruh Region", top_n: int = 25) -> bytes:
+    """
+    PDF gabungan region: ringkasan per kecamatan, grafik SOM per kecamatan, top N kelurahan
+    lintas kecamatan (ranking & kategori region), lalu tabel kelurahan setiap kecamatan.
+    """
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter, leftMargin=40, rightMargin=40, topMargin=60, bottomMargin=40)
+    styles = pdf_styles()
+    summary = kecamatan_summary(table)
+
+    elems = [
+        Paragraph("Kapten Naratel – Laporan Pasar Homepass", styles['Title']),
+        Paragraph(f"Ringkasan {title}", styles['Heading2']),
+        Spacer(1, 12),
+        Paragraph(f"{len(summary)} kecamatan, {len(table)} kelurahan, {int(table['homepass'].sum())} Homepass, "
+                  f"SOM total <b>{int(table['SOM'].sum())}</b>.", styles['BodyText']),
+        Spacer(1, 12),
+    ]
+
+    header = ["Area", "Kecamatan", "Kelurahan", "Homepass", "ODP", "SAM", "SOM", "Gap HP-SAM"]
+    rows = [[r.area, str(r.kecamatan).title(), r.kelurahan, r.homepass, r.ODP, r.SAM, r.SOM, r.gap]
+            for r in summary.itertuples()]
+    tbl = Table([header] + rows, colWidths=scaled_col_widths([1.3, 1.3, 0.7, 0.8, 0.6, 0.7, 0.7, 0.8]), repeatRows=1)
+    tbl.setStyle(table_style())
+    elems += [tbl, Spacer(1, 12)]
+
+    if summary["SOM"].sum() > 0:
+        png = figure_png(lambda: _som_per_kecamatan_fig(summary), PDF_DPI)
+        elems += [Image(io.BytesIO(png), width=6.3*inch, height=3.6*inch), Spacer(1, 12)]
+
+    top = RegionQuery(table).top("SOM", top_n)
+    elems.append(Paragraph(f"Top {len(top)} Kelurahan (SOM, seluruh region)", styles['Heading4']))
+    header = ["Rank", "Kelurahan", "Kecamatan", "Homepass", "ODP", "SAM", "SOM", "Kategori Region"]
+    rows = [[r.ranking_region, r.kelurahan, str(r.kecamatan).title(), r.homepass, r.ODP, r.SAM, r.SOM, r.kategori_region]
+            for r in top.itertuples()]
+    tbl = Table([header] + rows, colWidths=scaled_col_widths([0.5, 1.5, 1.1, 0.8, 0.6, 0.7, 0.7, 1.1]), repeatRows=1)
+    tbl.setStyle(table_style())
+    elems.append(tbl)
+
+    for r in summary.itertuples():
+        df = results.get(r.kecamatan)
+        if df is None or df.empty:
+            continue
+        elems += [PageBreak(), Paragraph(f"Area {r.area} - Kecamatan {str(r.kecamatan).title()}", styles['Heading2']),
+                  Spacer(1, 12), kelurahan_table(df)]
+
+    doc.build(elems)
+    return buf.getvalue()
+
+
+def _excel_bytes(sheets: dict):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return buf.getvalue()
+
+
+def export_region(results: dict, area_kec_info: dict, zip_path: str, formats=EXPORT_FORMATS,
+                  workers: int = None, title: str = "Seluruh Region") -> dict:
+    """
+    Tulis seluruh paket laporan dalam satu kali jalan ke satu file zip:
+      pdf/laporan_<area>_<kecamatan>.pdf   per kecamatan, dirender paralel di process pool
+      pdf/laporan_region.pdf               PDF gabungan region
+      homepass_region.xlsx                 sheet Region, Kecamatan, Kategori
+      csv/*.csv, homepass_region.parquet   tabel yang sama
+      manifest.json
+    Setiap PDF langsung ditulis ke zip begitu selesai, sehingga memori tidak bergantung pada
+    jumlah kecamatan. Format yang tidak tersedia (mis. openpyxl/pyarrow tidak terpasang)
+    dilewati dan dicatat di "skipped". Kembalikan manifest.
+    """
+    start = time.perf_counter()
+    table = build_region_table(results, area_kec_info)
+    summary = kecamatan_summary(table)
+    categories = RegionQuery(table).category_summary()
+    plain = table.astype({col: str for col in ("area", "kecamatan", "kelurahan", "kategori_region")})
+
+    manifest = {"generated_at": time.time(), "title": title, "kecamatan": len(summary), "kelurahan": len(table),
+                "files": [], "skipped": {}}
+    os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+
+    # Zip ditulis ke file sementara unik (mkstemp) lalu os.replace, agar export bersamaan
+    # tidak saling menimpa dan pembaca tidak melihat zip setengah jadi
+    def _fill(fh):
+        with zipfile.ZipFile(fh, "w") as zf:
+            def _write(name, data, compress):
+                # PDF/parquet/xlsx sudah terkompresi: disimpan apa adanya agar tidak buang waktu
+                zf.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+                manifest["files"].append({"name": name, "bytes": len(data)})
+
+            if "pdf" in formats:
+                jobs = [(r.area, r.kecamatan, results[r.kecamatan]) for r in summary.itertuples()]
+                for area, kec, pdf in _bounded_map(render_kecamatan_pdf, jobs, workers):
+                    _write(f"pdf/{_stem(area, kec)}.pdf", pdf, False)
+                _write("pdf/laporan_region.pdf", create_region_pdf(table, results, title), False)
+
+            if "xlsx" in formats:
+                try:
+                    _write("homepass_region.xlsx", _excel_bytes({"Region": plain, "Kecamatan": summary.astype({"area": str, "kecamatan": str}),
+                                                                  "Kategori": categories.astype({"kategori_region": str})}), False)
+                except ImportError as e:
+                    manifest["skipped"]["xlsx"] = str(e)
+
+            if "csv" in formats:
+                _write("csv/homepass_region.csv", plain.to_csv(index=False).encode("utf-8"), True)
+                _write("csv/homepass_kecamatan.csv", summary.to_csv(index=False).encode("utf-8"), True)
+                _write("csv/kategori_region.csv", categories.to_csv(index=False).encode("utf-8"), True)
+
+            if "parquet" in formats:
+                try:
+                    buf = io.BytesIO()
+                    plain.to_parquet(buf, index=False)
+                    _write("homepass_region.parquet", buf.getvalue(), False)
+                except (ImportError, ValueError) as e:
+                    manifest["skipped"]["parquet"] = str(e)
+
+            manifest["seconds"] = round(time.perf_counter() - start, 3)
+            zf.writestr("manifest.json", json.dumps(manifest, indent=1, ensure_ascii=False))
+
+    _atomic_write(zip_path, _fill)
+    manifest["path"] = zip_path
+    return manifest
@@ -0,0 +1,287 @@
+# geojson_stream.py
+import json
+import re
+
+import numpy as np
+
+# Ukuran potongan teks yang dibaca per langkah. Memori pembaca dibatasi kira-kira
+# oleh ukuran ini ditambah satu feature terbesar, berapapun besar file-nya.
+CHUNK_SIZE = 1 << 20
+# Jumlah vertex yang dikumpulkan sebelum centroid satu batch feature dihitung, agar
+# memori koordinat tidak tumbuh sebanding jumlah vertex seluruh file
+CENTROID_BATCH_VERTICES = 1 << 16
+
+# Kode ringkas untuk properti osm_type (-1 jika kosong/tidak dikenal)
+OSM_TYPE_CODES = {"node": 0, "way": 1, "relation": 2}
+# Prefix full_id ("w149878755") ke osm_type, dipakai jika osm_id/osm_type kosong
+_FULL_ID_TYPES = {"n": "node", "w": "way", "r": "relation"}
+
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _ChunkReader:
+    """
+    Pembaca teks JSON bertahap di atas file handle.
+    Hanya menyimpan sisa buffer yang belum dikonsumsi ditambah satu potongan baru.
+    """
+
+    def __init__(self, fh, chunk_size=CHUNK_SIZE):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Lewati whitespace dan kembalikan karakter berikutnya ('' jika EOF)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"GeoJSON tidak valid: diharapkan '{char}', ditemukan '{found or 'EOF'}'")
+        self.pos += 1
+
+    def decode(self):
+        """Decode satu nilai JSON utuh mulai dari posisi sekarang."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Nilai terpotong di ujung buffer: baca potongan berikutnya lalu ulangi
+                if not self._fill():
+                    raise
+                continue
+            # Angka di ujung buffer bisa saja terpotong ("12" dari "123")
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_raw_features(fh, chunk_size=CHUNK_SIZE):
+    """
+    Telusuri objek FeatureCollection level atas dan yield setiap feature
+    dari array "features" satu per satu. Anggota lain (name, crs, ...) dilewati.
+    """
+    reader = _ChunkReader(fh, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.decode()
+        reader.expect(":")
+        if key == "features":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.decode()
+                    sep = reader.peek()
+                    reader.pos += 1
+                    if sep == "]":
+                        break
+                    if sep != ",":
+                        raise ValueError(f"GeoJSON tidak valid: pemisah '{sep or 'EOF'}' di array features")
+        else:
+            reader.decode()
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"GeoJSON tidak valid: pemisah '{sep or 'EOF'}' di objek FeatureCollection")
+
+
+def iter_features(file_path, properties=None, chunk_size=CHUNK_SIZE):
+    """
+    Baca FeatureCollection secara bertahap tanpa membangun geometri.
+    Yield dict berisi properti terpilih saja untuk setiap feature
+    (semua properti jika `properties` None). Properti yang tidak ada bernilai None.
+    """
+    with open(file_path, "r", encoding="utf-8") as fh:
+        for feature in _iter_raw_features(fh, chunk_size):
+            props = feature.get("properties") or {}
+            if properties is None:
+                yield props
+            else:
+                yield {name: props.get(name) for name in properties}
+
+
+def count_features(file_path, chunk_size=CHUNK_SIZE):
+    """Hitung jumlah feature (Homepass) dalam file GeoJSON dengan memori konstan."""
+    with open(file_path, "r", encoding="utf-8") as fh:
+        return sum(1 for _ in _iter_raw_features(fh, chunk_size))
+
+
+def read_feature_properties(file_path, properties=("osm_id", "building"), chunk_size=CHUNK_SIZE):
+    """
+    Hitung feature sekaligus kumpulkan beberapa properti terpilih.
+    Kembalikan dict {"count": n, <properti>: [nilai per feature], ...}.
+    """
+    columns = {name: [] for name in properties}
+    count = 0
+    for props in iter_features(file_path, properties, chunk_size):
+        count += 1
+        for name in properties:
+            columns[name].append(props[name])
+    return {"count": count, **columns}
+
+
+def _to_int(value, default=-1):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _exterior_rings(geometry):
+    """Ring luar (list koordinat) dari geometri Polygon/MultiPolygon; Point dianggap ring 1 titik."""
+    if not geometry:
+        return []
+    geom_type = geometry.get("type")
+    coords = geometry.get("coordinates") or []
+    if geom_type == "Polygon":
+        return coords[:1]
+    if geom_type == "MultiPolygon":
+        return [polygon[0] for polygon in coords if polygon]
+    if geom_type == "Point":
+        return [[coords]] if coords else []
+    return []
+
+
+def polygon_centroids(x, y, ring_offsets, feature_of_ring, n_features):
+    """
+    Centroid berbobot luas (rumus shoelace) per feature, dihitung vektor untuk semua ring sekaligus.
+    x, y: koordinat semua vertex ring yang digabung; ring_offsets: indeks awal tiap ring (+ akhir);
+    feature_of_ring: indeks feature pemilik tiap ring. Feature tanpa luas (titik/garis) memakai
+    rata-rata vertex; feature tanpa geometri bernilai NaN.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+    feature_of_ring = np.asarray(feature_of_ring, dtype=np.int64)
+    lon = np.full(n_features, np.nan)
+    lat = np.full(n_features, np.nan)
+    if x.size == 0:
+        return lon, lat
+
+    ring_len = np.diff(ring_offsets)
+    vertex_feature = np.repeat(feature_of_ring, ring_len)
+    # Geser ke vertex pertama tiap feature agar perkalian silang tidak kehilangan presisi
+    first_vertex = np.full(n_features, -1, dtype=np.int64)
+    first_vertex[feature_of_ring[::-1]] = ring_offsets[:-1][::-1]
+    x0 = x[first_vertex[vertex_feature]]
+    y0 = y[first_vertex[vertex_feature]]
+    dx, dy = x - x0, y - y0
+
+    # Pasangan vertex berurutan di dalam ring yang sama
+    same_ring = np.ones(len(x), dtype=bool)
+    same_ring[ring_offsets[1:] - 1] = False
+    i = np.flatnonzero(same_ring[:-1])
+    cross = dx[i] * dy[i + 1] - dx[i + 1] * dy[i]
+    pair_feature = vertex_feature[i]
+    area2 = np.bincount(pair_feature, cross, n_features)
+    cx = np.bincount(pair_feature, (dx[i] + dx[i + 1]) * cross, n_features)
+    cy = np.bincount(pair_feature, (dy[i] + dy[i + 1]) * cross, n_features)
+
+    n_vertex = np.bincount(vertex_feature, minlength=n_features)
+    mean_x = np.bincount(vertex_feature, dx, n_features) / np.maximum(n_vertex, 1)
+    mean_y = np.bincount(vertex_feature, dy, n_features) / np.maximum(n_vertex, 1)
+    has_area = np.abs(area2) > 1e-18
+    safe_area = np.where(has_area, area2, 1.0)
+    ox = np.where(first_vertex >= 0, x[np.maximum(first_vertex, 0)], np.nan)
+    oy = np.where(first_vertex >= 0, y[np.maximum(first_vertex, 0)], np.nan)
+    lon = ox + np.where(has_area, cx / (3 * safe_area), mean_x)
+    lat = oy + np.where(has_area, cy / (3 * safe_area), mean_y)
+    return lon, lat
+
+
+def _to_levels(value):
+    # "building:levels" kadang berisi "2.5", "2;3" atau teks bebas; ambil angka pertama
+    if value in (None, ""):
+        return np.nan
+    try:
+        return float(str(value).replace(",", ".").split(";")[0])
+    except ValueError:
+        return np.nan
+
+
+def read_feature_columns(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Baca properti inti per feature sebagai array NumPy kolumnar:
+    osm_id (int64, -1 jika kosong), osm_type (int8, lihat OSM_TYPE_CODES),
+    building_code (int16) beserta building_categories (daftar nilai tag building),
+    amenity_code (int16) beserta amenity_categories, levels (float32 dari building:levels,
+    NaN jika kosong), serta centroid bangunan lon/lat (float64, dari ring luar geometri).
+    Hanya properti tersebut yang disimpan; properti lain (~90 kolom OSM) dibuang per feature.
+    Jika osm_id kosong, id dan tipe diambil dari full_id (mis. "w149878755").
+    Centroid dihitung per batch ~CENTROID_BATCH_VERTICES vertex; ring kosong dilewati.
+    Jumlah Homepass = len(osm_id).
+    """
+    osm_id, osm_type, building, amenity, levels = [], [], [], [], []
+    lon_parts, lat_parts = [], []
+    x, y, ring_offsets, feature_of_ring = [], [], [0], []
+    batch_start = 0
+
+    def flush(n_features):
+        # Centroid untuk feature batch_start..n_features-1, lalu kosongkan buffer vertex
+        lon, lat = polygon_centroids(x, y, ring_offsets, np.asarray(feature_of_ring) - batch_start,
+                                     n_features - batch_start)
+        lon_parts.append(lon)
+        lat_parts.append(lat)
+        del x[:], y[:], ring_offsets[1:], feature_of_ring[:]
+
+    with open(file_path, "r", encoding="utf-8") as fh:
+        for n, feature in enumerate(_iter_raw_features(fh, chunk_size)):
+            props = feature.get("properties") or {}
+            feature_id, feature_type = props.get("osm_id"), props.get("osm_type")
+            full_id = props.get("full_id") or ""
+            if feature_id in (None, "") and full_id[:1] in _FULL_ID_TYPES:
+                feature_id, feature_type = full_id[1:], _FULL_ID_TYPES[full_id[:1]]
+            osm_id.append(_to_int(feature_id))
+            osm_type.append(OSM_TYPE_CODES.get(feature_type, -1))
+            building.append(props.get("building") or "")
+            amenity.append(props.get("amenity") or "")
+            levels.append(_to_levels(props.get("building:levels")))
+            for ring in _exterior_rings(feature.get("geometry")):
+                if not ring:
+                    continue
+                x.extend(pt[0] for pt in ring)
+                y.extend(pt[1] for pt in ring)
+                ring_offsets.append(len(x))
+                feature_of_ring.append(n)
+            if len(x) >= CENTROID_BATCH_VERTICES:
+                flush(n + 1)
+                batch_start = n + 1
+    flush(len(osm_id))
+    building_categories, building_code = np.unique(np.array(building, dtype=str), return_inverse=True)
+    amenity_categories, amenity_code = np.unique(np.array(amenity, dtype=str), return_inverse=True)
+    return {
+        "osm_id": np.array(osm_id, dtype=np.int64),
+        "osm_type": np.array(osm_type, dtype=np.int8),
+        "building_code": building_code.astype(np.int16),
+        "building_categories": building_categories,
+        "amenity_code": amenity_code.astype(np.int16),
+        "amenity_categories": amenity_categories,
+        "levels": np.array(levels, dtype=np.float32),
+        "lon": np.concatenate(lon_parts),
+        "lat": np.concatenate(lat_parts),
+    }
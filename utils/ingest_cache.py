@@ -0,0 +1,181 @@
+# ingest_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from utils.geojson_stream import read_feature_columns
+
+# Naikkan versi ini setiap kali isi artefak (kolom hasil read_feature_columns) berubah,
+# sehingga artefak lama otomatis tidak terpakai lagi.
+CACHE_VERSION = 4
+
+# Lokasi default cache di root project (relatif, sama seperti path folder data)
+DEFAULT_CACHE_DIR = os.path.join(".cache", "homepass")
+
+_HASH_BLOCK = 1 << 20
+
+# umask proses, dibaca sekali (os.umask hanya bisa dibaca dengan menyetelnya)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_content_hash(file_path):
+    """Hash isi file (blake2b, 20 byte hex) dibaca per blok."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write_func, suffix=""):
+    """Tulis file lewat file sementara lalu os.replace agar pembaca tidak melihat file setengah jadi."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=suffix + ".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            # mkstemp membuat file 0600; samakan dengan open() biasa (0666 dikurangi umask)
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+            write_func(fh)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class IngestCache:
+    """
+    Cache ingestion per file GeoJSON yang disimpan di disk.
+
+    Setiap file diringkas menjadi artefak kolumnar .npz (hasil read_feature_columns)
+    yang dialamatkan oleh hash isi file. Manifest memetakan path -> (size, mtime, hash),
+    sehingga file yang tidak berubah cukup dicek lewat os.stat tanpa dibaca ulang,
+    dan file yang hanya di-touch/dipindah tetap memakai artefak yang sama.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.entries = self._load_manifest()
+        self._dirty = False
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != CACHE_VERSION:
+            return {}
+        return manifest.get("entries", {})
+
+    def save(self):
+        """Simpan manifest ke disk jika ada perubahan."""
+        if not self._dirty:
+            return
+        payload = json.dumps({"version": CACHE_VERSION, "entries": self.entries}, indent=1).encode("utf-8")
+        _atomic_write(self.manifest_path, lambda fh: fh.write(payload))
+        self._dirty = False
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.objects_dir, f"{content_hash}-v{CACHE_VERSION}.npz")
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.abspath(file_path)
+
+    def lookup(self, file_path):
+        """
+        Cari artefak untuk file tanpa melakukan ingestion.
+        Kembalikan (kolom atau None, entry manifest terbaru untuk file tersebut).
+        """
+        stat = os.stat(file_path)
+        entry = self.entries.get(self._key(file_path))
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            content_hash = entry["hash"]
+        else:
+            content_hash = file_content_hash(file_path)
+        new_entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": content_hash,
+            "used": time.time(),
+        }
+        object_path = self._object_path(content_hash)
+        if not os.path.exists(object_path):
+            return None, new_entry
+        with np.load(object_path) as npz:
+            return {name: npz[name] for name in npz.files}, new_entry
+
+    def store(self, content_hash, columns):
+        """Simpan kolom hasil ingestion sebagai artefak .npz beralamat hash isi."""
+        _atomic_write(self._object_path(content_hash), lambda fh: np.savez(fh, **columns), suffix=".npz")
+
+    def record(self, file_path, entry):
+        """Catat entry manifest untuk file (dipakai juga untuk hasil dari proses worker)."""
+        self.entries[self._key(file_path)] = entry
+        self._dirty = True
+
+    def get(self, file_path):
+        """
+        Kembalikan kolom ingestion untuk file, membaca GeoJSON hanya jika file
+        baru atau isinya berubah sejak terakhir di-cache.
+        """
+        columns, entry = self.lookup(file_path)
+        if columns is None:
+            columns = read_feature_columns(file_path)
+            self.store(entry["hash"], columns)
+        self.record(file_path, entry)
+        return columns
+
+    def invalidate(self, file_path=None):
+        """
+        Hapus entry manifest untuk satu file (atau semua file jika None) beserta artefaknya,
+        sehingga pembacaan berikutnya memaksa ingestion ulang.
+        """
+        if file_path is None:
+            keys = list(self.entries)
+        else:
+            keys = [self._key(file_path)] if self._key(file_path) in self.entries else []
+        for key in keys:
+            entry = self.entries.pop(key)
+            object_path = self._object_path(entry["hash"])
+            still_used = any(e["hash"] == entry["hash"] for e in self.entries.values())
+            if not still_used and os.path.exists(object_path):
+                os.remove(object_path)
+        if keys:
+            self._dirty = True
+        return len(keys)
+
+    def evict_stale(self, max_age_days=None):
+        """
+        Buang entry untuk file yang sudah tidak ada atau berubah, entry yang tidak dipakai
+        lebih dari max_age_days, lalu hapus artefak yang tidak lagi dirujuk manifest.
+        Kembalikan jumlah artefak yang dihapus.
+        """
+        now = time.time()
+        for key, entry in list(self.entries.items()):
+            try:
+                stat = os.stat(key)
+                changed = stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]
+            except OSError:
+                changed = True
+            expired = max_age_days is not None and now - entry.get("used", 0) > max_age_days * 86400
+            if changed or expired:
+                del self.entries[key]
+                self._dirty = True
+
+        live = {os.path.basename(self._object_path(e["hash"])) for e in self.entries.values()}
+        removed = 0
+        for name in os.listdir(self.objects_dir):
+            if name.endswith(".npz") and name not in live:
+                os.remove(os.path.join(self.objects_dir, name))
+                removed += 1
+        self.save()
+        return removed
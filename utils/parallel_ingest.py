@@ -0,0 +1,109 @@
+# parallel_ingest.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import geopandas as gpd
+
+from utils.geojson_stream import read_feature_columns
+from utils.ingest_cache import DEFAULT_CACHE_DIR, IngestCache
+
+# Cache per proses worker agar manifest tidak dimuat ulang untuk setiap file
+_worker_caches = {}
+
+
+def _worker_cache(cache_dir):
+    if cache_dir not in _worker_caches:
+        _worker_caches[cache_dir] = IngestCache(cache_dir)
+    return _worker_caches[cache_dir]
+
+
+def _ingest_one(file_path, ingest_mode, cache_dir, content_hash):
+    """
+    Baca satu file GeoJSON (dijalankan di proses worker maupun proses utama).
+    Error tidak dilempar ke luar, tetapi dikembalikan sebagai teks di key "error".
+    """
+    start = time.perf_counter()
+    try:
+        if ingest_mode == "stream":
+            columns = read_feature_columns(file_path)
+            if cache_dir and content_hash:
+                _worker_cache(cache_dir).store(content_hash, columns)
+            result = {"count": len(columns["osm_id"]), "columns": columns, "error": None}
+        else:
+            result = {"count": len(gpd.read_file(file_path)), "columns": None, "error": None}
+    except Exception as e:
+        result = {"count": None, "columns": None, "error": f"{type(e).__name__}: {e}"}
+    return {**result, "seconds": time.perf_counter() - start, "cached": False}
+
+
+def default_workers():
+    """Jumlah worker default: semua core yang tersedia untuk proses ini."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def ingest_files(file_paths, ingest_mode="stream", cache_dir=DEFAULT_CACHE_DIR, workers=None):
+    """
+    Ingest banyak file GeoJSON, paralel di process pool untuk file yang belum ada di cache.
+
+    Kembalikan list hasil dengan urutan SAMA seperti file_paths, tiap elemen berupa dict
+    {"count": int | None, "columns": dict | None, "error": str | None} ditambah "seconds"
+    (waktu baca file / artefak cache) dan "cached".
+    Kegagalan per file dikumpulkan di "error", tidak dilempar dari proses worker.
+    workers None = semua core, 1 = tanpa process pool.
+    """
+    results = [None] * len(file_paths)
+    pending = []  # (index, content_hash)
+
+    cache = IngestCache(cache_dir) if ingest_mode == "stream" and cache_dir else None
+    entries = {}
+    for i, path in enumerate(file_paths):
+        if cache is None:
+            pending.append((i, None))
+            continue
+        start = time.perf_counter()
+        try:
+            columns, entry = cache.lookup(path)
+        except Exception as e:
+            results[i] = {"count": None, "columns": None, "error": f"{type(e).__name__}: {e}",
+                          "seconds": time.perf_counter() - start, "cached": False}
+            continue
+        entries[i] = entry
+        if columns is not None:
+            results[i] = {"count": len(columns["osm_id"]), "columns": columns, "error": None,
+                          "seconds": time.perf_counter() - start, "cached": True}
+        else:
+            pending.append((i, entry["hash"]))
+
+    workers = default_workers() if workers is None else max(1, int(workers))
+    workers = min(workers, len(pending))
+    cache_arg = cache.cache_dir if cache is not None else None
+    if workers <= 1:
+        for i, content_hash in pending:
+            results[i] = _ingest_one(file_paths[i], ingest_mode, cache_arg, content_hash)
+    elif pending:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    i: pool.submit(_ingest_one, file_paths[i], ingest_mode, cache_arg, content_hash)
+                    for i, content_hash in pending
+                }
+                for i, future in futures.items():
+                    results[i] = future.result()
+        except BrokenProcessPool as e:
+            for i, _ in pending:
+                if results[i] is None:
+                    results[i] = {"count": None, "columns": None, "error": f"Process pool gagal: {e}",
+                                  "seconds": 0.0, "cached": False}
+
+    if cache is not None:
+        for i, entry in entries.items():
+            if results[i]["error"] is None:
+                cache.record(file_paths[i], entry)
+        # Buang artefak versi lama / file yang berubah agar cache tidak terus membesar
+        cache.evict_stale()
+    return results
@@ -0,0 +1,119 @@
+# placement.py
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from utils.coverage import DEFAULT_DROP_RADIUS_M
+from utils.dedup import building_keys, deduplicate
+from utils.spatial import GridIndex, from_local_xy, to_local_xy
+
+
+def kecamatan_buildings(buildings: dict, kecamatan: str, unique: bool = True) -> dict:
+    """
+    Potong tabel bangunan (load_buildings / CentroidStore.buildings) ke satu kecamatan.
+    Dengan unique=True bangunan duplikat antar file (osm_id sama) hanya diambil sekali.
+    Kembalikan dict lon, lat, kelurahan (nama per bangunan).
+    """
+    kel = buildings["kelurahan"]
+    kel_ids = np.flatnonzero(kel["kecamatan"].to_numpy() == kecamatan)
+    rows = np.flatnonzero(np.isin(buildings["kelurahan_id"], kel_ids))
+    if unique and rows.size:
+        owned = deduplicate([building_keys(buildings["osm_id"][rows], buildings["osm_type"][rows])])[0][0]
+        rows = rows[owned]
+    lon = np.asarray(buildings["lon"][rows], dtype=np.float64)
+    lat = np.asarray(buildings["lat"][rows], dtype=np.float64)
+    valid = np.isfinite(lon) & np.isfinite(lat)
+    return {
+        "lon": lon[valid],
+        "lat": lat[valid],
+        "kelurahan": kel["kelurahan"].to_numpy()[np.asarray(buildings["kelurahan_id"][rows[valid]], dtype=np.int64)],
+    }
+
+
+def _candidate_sites(x, y, spacing):
+    """Kandidat lokasi ODP: centroid bangunan per sel grid berukuran `spacing` meter."""
+    cx = np.floor((x - x.min()) / spacing).astype(np.int64)
+    cy = np.floor((y - y.min()) / spacing).astype(np.int64)
+    _, cell = np.unique(cx * (int(cy.max()) + 1) + cy, return_inverse=True)
+    counts = np.bincount(cell)
+    return np.bincount(cell, weights=x) / counts, np.bincount(cell, weights=y) / counts
+
+
+def propose_odp_locations(lon, lat, odp_capacity: int = 16, radius_m: float = DEFAULT_DROP_RADIUS_M,
+                          max_odp: int = None, som_rate: float = 0.3, covered=None,
+                          candidate_spacing_m: float = None) -> dict:
+    """
+    Usulkan lokasi ODP baru dengan greedy facility location (maximum coverage berkapasitas).
+
+    Kandidat lokasi adalah centroid bangunan per sel grid (default radius_m / 3). Setiap
+    langkah memilih kandidat yang menambah Homepass terlayani paling banyak: bangunan belum
+    terlayani dalam radius_m, paling banyak odp_capacity bangunan terdekat. Pasangan
+    kandidat-bangunan dicari sekali lewat GridIndex; gain hanya bisa turun, sehingga
+    dipakai lazy greedy (heap) tanpa menghitung ulang semua kandidat per langkah.
+    `covered` opsional: mask bangunan yang sudah dilayani ODP existing.
+
+    Kembalikan dict:
+      "odp": per ODP usulan (urutan, lon, lat, homepass_baru, SAM_kumulatif, SOM_tambahan,
+             SOM_kumulatif, cakupan_persen) dalam urutan dipilih
+      "assignment": indeks ODP usulan per bangunan (-1 jika tidak dilayani ODP baru)
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    n = lon.size
+    assignment = np.full(n, -1, dtype=np.int64)
+    covered = np.zeros(n, dtype=bool) if covered is None else np.asarray(covered, dtype=bool).copy()
+    columns = ["urutan", "lon", "lat", "homepass_baru", "SAM_kumulatif", "SOM_tambahan", "SOM_kumulatif", "cakupan_persen"]
+    if not n or odp_capacity <= 0 or (max_odp is not None and max_odp <= 0):
+        return {"odp": pd.DataFrame(columns=columns), "assignment": assignment}
+
+    lat0, lon0 = float(lat.mean()), float(lon.mean())
+    x, y = to_local_xy(lon, lat, lat0, lon0)
+    sx, sy = _candidate_sites(x, y, candidate_spacing_m or max(radius_m / 3, 1.0))
+
+    # Pasangan (kandidat, bangunan) dalam radius, dikelompokkan per kandidat & urut jarak
+    cand, bld, dist = GridIndex(x, y, cell_size=max(radius_m, 1.0)).query_radius(sx, sy, radius_m)
+    order = np.lexsort((bld, dist, cand))
+    cand, bld = cand[order], bld[order]
+    start = np.searchsorted(cand, np.arange(sx.size + 1))
+
+    def _gain(c):
+        free = bld[start[c]:start[c + 1]]
+        return free[~covered[free]][:odp_capacity]
+
+    initial = np.minimum(np.diff(start), odp_capacity)
+    heap = [(-int(g), int(c)) for c, g in enumerate(initial) if g > 0]
+    heapq.heapify(heap)
+
+    rows, served_total = [], 0
+    limit = max_odp if max_odp is not None else n
+    while heap and len(rows) < limit:
+        _, c = heapq.heappop(heap)
+        chosen = _gain(c)
+        if not chosen.size:
+            continue
+        if heap and chosen.size < -heap[0][0]:
+            heapq.heappush(heap, (-int(chosen.size), c))  # gain basi, evaluasi ulang nanti
+            continue
+        covered[chosen] = True
+        assignment[chosen] = len(rows)
+        served_total += int(chosen.size)
+        rows.append((sx[c], sy[c], int(chosen.size), served_total))
+
+    if not rows:
+        return {"odp": pd.DataFrame(columns=columns), "assignment": assignment}
+    px, py, new_hp, sam_cum = (np.array(col) for col in zip(*rows))
+    plon, plat = from_local_xy(px, py, lat0, lon0)
+    # SOM tambahan dari selisih SOM kumulatif yang sudah dibulatkan, agar jumlahnya tepat sama
+    som_cum = np.round(sam_cum * som_rate).astype(int)
+    odp = pd.DataFrame({
+        "urutan": np.arange(1, len(rows) + 1),
+        "lon": plon,
+        "lat": plat,
+        "homepass_baru": new_hp,
+        "SAM_kumulatif": sam_cum,
+        "SOM_tambahan": np.diff(som_cum, prepend=0),
+        "SOM_kumulatif": som_cum,
+        "cakupan_persen": np.round(sam_cum / n * 100, 2),
+    })
+    return {"odp": odp, "assignment": assignment}
@@ -0,0 +1,198 @@
+# profiling.py
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CAPTURE_MODES = (None, "tracemalloc", "cprofile")
+
+# Profiler aktif untuk konteks (thread / sesi Streamlit) saat ini; None = instrumentasi mati
+_active = contextvars.ContextVar("homepass_profiler", default=None)
+
+
+class _NullStage:
+    """Context manager kosong saat profiler tidak aktif (overhead satu lookup ContextVar)."""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, labels):
+        self.profiler = profiler
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        # Tahap bersarang mewarisi label tahap induknya (mis. kecamatan)
+        stack = self.profiler._label_stack
+        labels = {**(stack[-1] if stack else {}), **self.labels}
+        self.span = {"stage": self.name, **labels, "depth": len(stack)}
+        stack.append(labels)
+        if self.profiler.capture == "tracemalloc":
+            current, peak = tracemalloc.get_traced_memory()
+            self._mem_start = current
+            # Puncak sejauh ini milik tahap induk: simpan dulu sebelum puncak global di-reset
+            peaks = self.profiler._peak_stack
+            peaks[-1] = max(peaks[-1], peak)
+            peaks.append(current)
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span["seconds"] = time.perf_counter() - self._start
+        if self.profiler.capture == "tracemalloc":
+            # Puncak tahap ini = maksimum dari puncak sebelum & sesudah tahap anak; diteruskan ke induk
+            peaks = self.profiler._peak_stack
+            peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+            peaks[-1] = max(peaks[-1], peak)
+            self.span["peak_bytes"] = max(peak - self._mem_start, 0)
+        if exc_type is not None:
+            self.span["error"] = f"{exc_type.__name__}: {exc}"
+        self.profiler._label_stack.pop()
+        self.profiler.spans.append(self.span)
+        return False
+
+
+def profile_stage(name: str, **labels):
+    """
+    Ukur satu tahap pipeline jika ada Profiler aktif:
+
+        with profile_stage("allocation", kecamatan=kec) as span:
+            ...
+            span["features"] = n
+
+    Span berisi label (kecamatan, file, ...), "seconds", "depth" (kedalaman sarang), serta
+    angka tambahan yang diisi pemanggil (bytes, features, cached). Tanpa profiler aktif hanya
+    mengembalikan context kosong.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name, labels)
+
+
+def record_span(name: str, seconds: float, **values):
+    """Catat span yang diukur di tempat lain (mis. di proses worker) ke profiler aktif."""
+    profiler = _active.get()
+    if profiler is not None:
+        stack = profiler._label_stack
+        profiler.spans.append({"stage": name, **(stack[-1] if stack else {}), **values,
+                               "seconds": seconds, "depth": len(stack)})
+
+
+def profiling_enabled() -> bool:
+    return _active.get() is not None
+
+
+class Profiler:
+    """
+    Kumpulkan span per tahap / file / kecamatan selama blok `with` berjalan.
+
+        with Profiler(capture="tracemalloc") as prof:
+            run_analysis(get_area_kecamatan_info())
+        prof.report()
+
+    capture: None (waktu & hitungan saja), "tracemalloc" (puncak memori Python per tahap)
+    atau "cprofile" (daftar fungsi paling mahal untuk seluruh blok).
+    """
+
+    def __init__(self, capture: str = None, top_functions: int = 30):
+        if capture not in CAPTURE_MODES:
+            raise ValueError(f"Mode capture tidak dikenal: {capture} (pilihan: {CAPTURE_MODES})")
+        self.capture = capture
+        self.top_functions = top_functions
+        self.spans = []
+        self._label_stack = []
+        # Puncak memori berjalan per tahap terbuka (elemen pertama: seluruh blok Profiler)
+        self._peak_stack = [0]
+        self._cprofile = None
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        self._token = _active.set(self)
+        if self.capture == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.capture == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.total_seconds = time.perf_counter() - self._start
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.capture == "tracemalloc":
+            self.peak_bytes = max(self._peak_stack[0], tracemalloc.get_traced_memory()[1])
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        _active.reset(self._token)
+        return False
+
+    def _top_functions(self):
+        stream = io.StringIO()
+        stats = pstats.Stats(self._cprofile, stream=stream)
+        rows = []
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({"function": f"{func} ({filename}:{line})", "calls": ncalls,
+                         "tottime": tottime, "cumtime": cumtime})
+        rows.sort(key=lambda r: r["cumtime"], reverse=True)
+        return rows[:self.top_functions]
+
+    def report(self) -> dict:
+        """
+        Laporan terstruktur (siap JSON):
+          "stages": ringkasan per tahap (count, seconds, bytes, features, peak_bytes maks)
+          "kecamatan": ringkasan per kecamatan, "spans": semua span mentah
+          "cprofile": fungsi paling mahal (mode "cprofile")
+        """
+        def _summarise(key, top_level_only=False):
+            summary = {}
+            for span in self.spans:
+                name = span.get(key)
+                if name is None or (top_level_only and span.get("depth", 0) > 0):
+                    continue
+                row = summary.setdefault(name, {key: name, "count": 0, "seconds": 0.0, "bytes": 0, "features": 0})
+                row["count"] += 1
+                row["seconds"] += span.get("seconds", 0.0)
+                row["bytes"] += span.get("bytes", 0)
+                row["features"] += span.get("features", 0)
+                if "peak_bytes" in span:
+                    row["peak_bytes"] = max(row.get("peak_bytes", 0), span["peak_bytes"])
+            return sorted(summary.values(), key=lambda r: r["seconds"], reverse=True)
+
+        # ru_maxrss dalam KB di Linux (puncak RSS proses sejak mulai, bukan per tahap)
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+        return {
+            "capture": self.capture,
+            "total_seconds": getattr(self, "total_seconds", None),
+            "peak_bytes": getattr(self, "peak_bytes", None),
+            "max_rss_bytes": max_rss,
+            "stages": _summarise("stage"),
+            # Per kecamatan hanya span level atas agar waktu tahap bersarang tidak terhitung dua kali
+            "kecamatan": _summarise("kecamatan", top_level_only=True),
+            "spans": self.spans,
+            "cprofile": self._top_functions() if self._cprofile is not None else None,
+        }
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, indent=1, ensure_ascii=False, default=str)
+        return path
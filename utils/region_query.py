@@ -0,0 +1,109 @@
+# region_query.py
+import numpy as np
+import pandas as pd
+
+# Kategori potensi tingkat region dari persentil SOM (batas bawah persentil, label)
+PERSENTIL_KATEGORI = ((0.9, "Top 10%"), (0.75, "Top 25%"), (0.5, "Top 50%"), (0.0, "Bawah 50%"))
+TANPA_POTENSI = "Tidak Ada Potensi"
+
+# Metrik yang bisa diurutkan lewat RegionQuery.top
+METRICS = ("homepass", "ODP", "SAM", "SOM", "gap", "persentil_SOM")
+
+REGION_COLUMNS = ["area", "kecamatan", "kelurahan", "homepass", "ODP", "SAM", "SOM", "gap",
+                  "ranking", "kategori_potensi", "ranking_region", "persentil_SOM", "kategori_region"]
+
+
+def build_region_table(results: dict, area_kec_info: dict) -> pd.DataFrame:
+    """
+    Satukan hasil per kecamatan (run_analysis) menjadi satu tabel region dengan area,
+    kecamatan dan kelurahan sebagai Categorical. Kolom tambahan:
+      gap             Homepass yang belum tertampung SAM (homepass - SAM, minimal 0)
+      ranking_region  ranking SOM lintas semua kecamatan (method='min')
+      persentil_SOM   persentil SOM di region (0..1)
+      kategori_region label PERSENTIL_KATEGORI; SOM 0 selalu "Tidak Ada Potensi"
+    """
+    area_of = {kec: area for area, kec_list in area_kec_info.items() for kec in kec_list}
+    order = [kec for kec_list in area_kec_info.values() for kec in kec_list if kec in results]
+    order += [kec for kec in results if kec not in area_of]
+    frames = [results[kec].assign(area=area_of.get(kec, ""), kecamatan=kec) for kec in order if len(results[kec])]
+    if not frames:
+        return pd.DataFrame(columns=REGION_COLUMNS)
+    table = pd.concat(frames, ignore_index=True)
+
+    table["gap"] = (table["homepass"] - table["SAM"]).clip(lower=0)
+    table["ranking_region"] = table["SOM"].rank(method="min", ascending=False).astype(int)
+    table["persentil_SOM"] = table["SOM"].rank(method="max", pct=True).round(4)
+    labels = np.select([table["persentil_SOM"] >= low for low, _ in PERSENTIL_KATEGORI],
+                       [label for _, label in PERSENTIL_KATEGORI], TANPA_POTENSI)
+    table["kategori_region"] = np.where(table["SOM"] > 0, labels, TANPA_POTENSI)
+
+    for col, categories in (("area", list(dict.fromkeys(area_of.get(k, "") for k in order))),
+                            ("kecamatan", order), ("kelurahan", None),
+                            ("kategori_region", [TANPA_POTENSI] + [label for _, label in reversed(PERSENTIL_KATEGORI)])):
+        table[col] = pd.Categorical(table[col], categories=categories)
+    return table[REGION_COLUMNS]
+
+
+class RegionQuery:
+    """
+    Query lintas kecamatan di atas tabel region yang disusun sekali saja.
+
+        query = RegionQuery(build_region_table(results, get_area_kecamatan_info()))
+        query.top("SOM", n=10, area="Kabupaten Malang")
+        query.largest_gap(n=10)
+        query.zero_odp_high_homepass(min_percentile=0.75)
+
+    Urutan setiap metrik (argsort) dan kode kategori area/kecamatan dihitung di konstruktor,
+    sehingga setiap query hanya menyaring mask boolean di atas urutan yang sudah ada,
+    tanpa concat maupun sort ulang.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table.reset_index(drop=True)
+        # Urutan menurun per metrik; seri diputus dengan urutan baris (stabil)
+        self._order = {m: np.argsort(-self.table[m].to_numpy(dtype=np.float64), kind="stable") for m in METRICS}
+        self._codes = {col: self.table[col].cat.codes.to_numpy() for col in ("area", "kecamatan")}
+        self._homepass_pct = self.table["homepass"].rank(method="max", pct=True).to_numpy()
+
+    def __len__(self):
+        return len(self.table)
+
+    def mask(self, area=None, kecamatan=None) -> np.ndarray:
+        """Mask baris untuk area dan/atau kecamatan (nama tunggal atau list)."""
+        keep = np.ones(len(self.table), dtype=bool)
+        for col, value in (("area", area), ("kecamatan", kecamatan)):
+            if value is None:
+                continue
+            names = [value] if isinstance(value, str) else list(value)
+            codes = [self.table[col].cat.categories.get_loc(v) for v in names if v in self.table[col].cat.categories]
+            keep &= np.isin(self._codes[col], codes)
+        return keep
+
+    def _take(self, metric, keep, n, ascending=False):
+        order = self._order[metric]
+        if ascending:
+            order = order[::-1]
+        rows = order[keep[order]]
+        return self.table.iloc[rows[:n] if n is not None else rows].reset_index(drop=True)
+
+    def top(self, metric: str = "SOM", n: int = 10, area=None, kecamatan=None, ascending: bool = False) -> pd.DataFrame:
+        """N kelurahan dengan metrik terbesar (atau terkecil jika ascending) di wilayah terpilih."""
+        if metric not in METRICS:
+            raise ValueError(f"Metrik tidak dikenal: {metric} (pilihan: {METRICS})")
+        return self._take(metric, self.mask(area, kecamatan), n, ascending)
+
+    def largest_gap(self, n: int = 10, area=None, kecamatan=None) -> pd.DataFrame:
+        """Kelurahan dengan Homepass terbanyak yang belum tertampung SAM."""
+        return self.top("gap", n, area, kecamatan)
+
+    def zero_odp_high_homepass(self, min_percentile: float = 0.75, n: int = None, area=None, kecamatan=None) -> pd.DataFrame:
+        """Kelurahan tanpa ODP dengan Homepass di atas persentil region min_percentile."""
+        keep = self.mask(area, kecamatan) & (self.table["ODP"].to_numpy() == 0) & (self._homepass_pct >= min_percentile)
+        return self._take("homepass", keep, n)
+
+    def category_summary(self, area=None, kecamatan=None) -> pd.DataFrame:
+        """Jumlah kelurahan, Homepass dan SOM per kategori_region."""
+        subset = self.table[self.mask(area, kecamatan)]
+        return (subset.groupby("kategori_region", observed=False)
+                .agg(kelurahan=("kelurahan", "size"), homepass=("homepass", "sum"), SOM=("SOM", "sum"))
+                .reset_index())
@@ -0,0 +1,409 @@
+# report.py
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer,
+    Table, TableStyle, Image
+)
+from reportlab.lib.units import inch
+
+from utils.ingest_cache import _atomic_write
+from utils.profiling import profile_stage
+
+# DPI gambar: UI mengikuti default st.pyplot, PDF mengikuti default savefig
+UI_DPI = 200
+PDF_DPI = 100
+
+# Batas total ukuran byte PNG/PDF yang disimpan di cache render (per proses)
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Salinan hasil render di disk, dipakai bersama CLI `reports`, worker dan semua proses dashboard
+DEFAULT_RENDER_CACHE_DIR = os.path.join(".cache", "renders")
+# Naikkan jika tampilan grafik/PDF berubah; file render versi lama di disk dihapus saat pemangkasan
+RENDER_CACHE_VERSION = 1
+
+
+def get_rekomendasi(row):
+    kategori = row["kategori_potensi"]
+    som = row["SOM"]
+    sam = row["SAM"]
+
+    # === Mempersingkat teks rekomendasi lebih jauh ===
+    if som > 0:
+        if "High Potential" in kategori:
+            return ("Promosi/Perluas Cover" # Sangat singkat
+                    if som < sam * 0.6 else "Performa Baik") # Sangat singkat
+        elif "Low Potential" in kategori:
+             return "Strategi Lokal/Beda" # Sangat singkat
+    else:
+        return "Tidak Prioritas" # Sangat singkat
+    # === Akhir Persingkatan ===
+
+
+def plot_market_pie_agg(df):
+    total_hp = df["homepass"].sum()
+    total_sam = df["SAM"].sum()
+    total_som = df["SOM"].sum()
+
+    labels = ["Homepass","SAM","SOM"]
+    values = [total_hp, total_sam, total_som]
+    colors_pie = ["#6EC1E4","#FFD700","#FF5733"]
+
+    if sum(values) == 0:
+        fig = Figure(figsize=(6,6)) # Ukuran sama
+        ax = fig.subplots()
+        ax.text(0.5, 0.5, "Tidak Ada Data > 0", horizontalalignment='center', verticalalignment='center', transform=ax.transAxes, color="white")
+        ax.axis('off')
+        return fig
+
+    # === Ukuran Figure untuk Streamlit UI - Pie Chart ===
+    fig = Figure(figsize=(6,6)) # Square figure for pie chart
+    ax = fig.subplots()
+
+    pie_values = [v for v in values if v > 0]
+    pie_labels_for_slices = [labels[i] for i, v in enumerate(values) if v > 0]
+    pie_colors = [colors_pie[i] for i, v in enumerate(values) if v > 0]
+
+    if pie_values:
+        total_sum_all = sum(values)
+        percentages_all = [v / total_sum_all * 100 for v in values]
+
+        wedges, texts = ax.pie(pie_values,
+                               startangle=140,
+                               colors=pie_colors) # Tidak pakai autopct di sini
+
+        ax.axis("equal")
+
+        full_legend_labels = [f"{l}: {v} ({percentages_all[i]:.1f}%)" for i, (l, v) in enumerate(zip(labels, values))]
+
+        # Add legend outside (seperti screenshot)
+        ax.legend(wedges, full_legend_labels, loc="center left", bbox_to_anchor=(1,0.5), fontsize=8)
+
+    else:
+        fig = Figure(figsize=(6,6)) # Ukuran sama
+        ax = fig.subplots()
+        ax.text(0.5, 0.5, "Data Nol", horizontalalignment='center', verticalalignment='center', transform=ax.transAxes, color="white")
+        ax.axis('off')
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_som_bar(df):
+    # === Ukuran Figure Bar Chart - sama untuk UI dan PDF ===
+    fig_bar = Figure(figsize=(6,4)) # Figure size (lebar, tinggi)
+    ax = fig_bar.subplots()
+    colors_bar = df["kategori_potensi"].apply(
+        lambda x: "#FFD700" if "High Potential" in x else ("#808080" if "Low Potential" in x else "#dc3545")
+    )
+    ax.bar(df["kelurahan"], df["SOM"], color=colors_bar)
+    ax.set_title("SOM per Kelurahan")
+    ax.set_ylabel("Jumlah SOM")
+    ax.tick_params(axis='x', labelsize=8)
+    ax.tick_params(axis='x', labelrotation=60) # Rotasi 60 derajat untuk nama panjang
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    fig_bar.tight_layout()
+    return fig_bar
+
+
+def pdf_styles():
+    styles = getSampleStyleSheet()
+    styles['Title'].fontName = 'Helvetica-Bold'
+    styles['Heading2'].fontName = 'Helvetica-Bold'
+    styles['Heading4'].fontName = 'Helvetica-Bold'
+    styles['BodyText'].fontName = 'Helvetica'
+    return styles
+
+
+def scaled_col_widths(col_widths, total_width_target=7.5 * inch):
+    # Sesuaikan proporsi total lebar agar pas di halaman letter
+    total_current_width = sum(col_widths)
+    if total_current_width > 0:
+         return [w * (total_width_target / total_current_width) for w in col_widths]
+    return [total_width_target / len(col_widths)] * len(col_widths)
+
+
+def table_style(extra=()):
+    return TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#FFD700")),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.black),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('ALIGN', (1,1), (1,-1), 'LEFT'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,-1), 7),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS',(0,1),(-1,-1),[colors.whitesmoke, colors.lightgrey]),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        *extra,
+    ])
+
+
+def kelurahan_table(df):
+    """Tabel reportlab kelurahan satu kecamatan (ranking, Homepass, ODP, SAM, SOM, kategori, rekomendasi)."""
+    table_data = [["Ranking", "Kelurahan", "Homepass", "ODP", "SAM", "SOM", "Kategori", "Rekomendasi"]]
+    for _, row in df.iterrows():
+        table_data.append([
+            row["ranking"],
+            row["kelurahan"],
+            row["homepass"],
+            row["ODP"],
+            row["SAM"],
+            row["SOM"],
+            row["kategori_potensi"],
+            get_rekomendasi(row) # Menggunakan rekomendasi yang sudah dipersingkat
+        ])
+
+    # === Sesuaikan lebar kolom untuk rekomendasi yang SANGAT singkat ===
+    col_widths = [0.4*inch, 1.4*inch, 0.7*inch, 0.6*inch, 0.7*inch, 0.7*inch, 1*inch, 1.3*inch] # Rekomendasi lebih pendek
+    tbl = Table(table_data, colWidths=scaled_col_widths(col_widths))
+    tbl.setStyle(table_style([
+        ('ALIGN', (6,1), (-1,-1), 'LEFT'), # Align Kategori ke kiri
+        ('ALIGN', (-1,1), (-1,-1), 'LEFT'), # Align Rekomendasi ke kiri
+        ('WORDWRAP', (-1, 1), (-1, -1), True), # Pastikan word wrap aktif
+    ]))
+    return tbl
+
+
+def create_pdf_report_kecamatan(area, kecamatan, df):
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter,
+                            leftMargin=40, rightMargin=40,
+                            topMargin=60, bottomMargin=40)
+    styles = pdf_styles()
+
+    elems = []
+
+    elems.append(Paragraph("Kapten Naratel – Laporan Pasar Homepass", styles['Title']))
+    elems.append(Paragraph(f"Area {area} - Kecamatan {kecamatan.title()}", styles['Heading2']))
+    elems.append(Spacer(1, 12))
+
+    intro = (
+        f"Ringkasan potensi pasar Homepass untuk semua kelurahan "
+        f"di Kecamatan <b>{kecamatan.title()}</b> (Area <b>{area}</b>)."
+    )
+    elems.append(Paragraph(intro, styles['BodyText']))
+    elems.append(Spacer(1, 12))
+
+    elems.append(kelurahan_table(df))
+    elems.append(Spacer(1, 12))
+
+    if not df.empty and "SOM" in df.columns and df["SOM"].sum() > 0:
+        buf_bar = io.BytesIO(som_bar_png(df, dpi=PDF_DPI))
+        elems.append(Paragraph("Grafik SOM per Kelurahan:", styles['Heading4']))
+        # === Ukuran Gambar di PDF agar sesuai Figure size ===
+        elems.append(Image(buf_bar, width=6*inch, height=4*inch)) # Ukuran gambar 6x4 inch
+        elems.append(Spacer(1, 12))
+    else:
+        elems.append(Paragraph("Tidak ada data SOM > 0 untuk grafik.", styles['BodyText']))
+        elems.append(Spacer(1, 12))
+
+    doc.build(elems)
+    buf.seek(0)
+    return buf
+
+
+# --------------------------------------------------
+# RENDER CACHE
+# --------------------------------------------------
+def hash_dataframe(df):
+    """Hash isi DataFrame (nilai, index dan nama kolom) untuk kunci cache render."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("|".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Cache LRU thread-safe untuk hasil render (PNG/PDF dalam bytes), dibatasi total ukuran byte.
+    Dipakai bersama oleh semua sesi Streamlit dalam satu proses server.
+
+    Dengan disk_dir, setiap hasil juga disimpan sebagai file (nama = hash kunci + versi), sehingga
+    render dari proses lain (mis. `python -m utils.cli reports`) cukup dibaca dari disk. Folder
+    disk dibatasi max_bytes yang sama: setelah menulis file baru, file versi lain dihapus dan
+    file dengan mtime terlama dibuang sampai totalnya muat (hit disk memperbarui mtime).
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_MAX_BYTES, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        digest = hashlib.blake2b(repr((RENDER_CACHE_VERSION, key)).encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}-v{RENDER_CACHE_VERSION}.bin")
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as fh:
+                    value = fh.read()
+                os.utime(path)
+            except OSError:
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if not os.path.exists(path):
+                try:
+                    os.makedirs(self.disk_dir, exist_ok=True)
+                    _atomic_write(path, lambda fh: fh.write(value))
+                    self._prune_disk()
+                except OSError:
+                    pass  # Folder read-only: cukup cache di memori
+
+    def _prune_disk(self):
+        """Hapus file render versi lain, lalu file terlama (mtime) sampai total <= max_bytes."""
+        suffix = f"-v{RENDER_CACHE_VERSION}.bin"
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if not entry.name.endswith(".bin"):
+                continue
+            try:
+                if not entry.name.endswith(suffix):
+                    os.remove(entry.path)
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue  # Sudah dihapus proses lain
+            files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def _remember(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {"items": len(self._items), "bytes": self._size, "hits": self.hits, "disk_hits": self.disk_hits,
+                    "misses": self.misses}
+
+
+render_cache = RenderCache(disk_dir=DEFAULT_RENDER_CACHE_DIR)
+
+def figure_png(make_fig, dpi):
+    # Figure berorientasi objek (tanpa state global pyplot): aman dirender paralel antar thread/proses
+    fig = make_fig()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="PNG", bbox_inches="tight", dpi=dpi)
+    return buf.getvalue()
+
+
+def _cached(key, render):
+    with profile_stage(f"render_{key[0]}") as span:
+        value = render_cache.get(key)
+        span["cached"] = value is not None
+        if value is None:
+            value = render()
+            render_cache.put(key, value)
+        span["output_bytes"] = len(value)
+    return value
+
+
+def pie_chart_png(df, dpi=UI_DPI):
+    """PNG pie chart Homepass/SAM/SOM kecamatan, di-cache berdasarkan isi df."""
+    return _cached(("pie", hash_dataframe(df), dpi), lambda: figure_png(lambda: plot_market_pie_agg(df), dpi))
+
+
+def som_bar_png(df, dpi=UI_DPI):
+    """PNG bar chart SOM per kelurahan, di-cache berdasarkan isi df."""
+    return _cached(("bar", hash_dataframe(df), dpi), lambda: figure_png(lambda: plot_som_bar(df), dpi))
+
+
+def pdf_report_bytes(area, kecamatan, df):
+    """Bytes laporan PDF kecamatan, di-cache berdasarkan isi df dan parameter laporan."""
+    key = ("pdf", hash_dataframe(df), area, kecamatan)
+    return _cached(key, lambda: create_pdf_report_kecamatan(area, kecamatan, df).getvalue())
+
+
+# --------------------------------------------------
+# BATCH RENDER
+# --------------------------------------------------
+def render_kecamatan_bundle(area, kecamatan, df):
+    """Render semua artefak satu kecamatan: {"pdf", "pie_png", "bar_png"} (bar hanya jika SOM > 0)."""
+    bundle = {
+        "pdf": pdf_report_bytes(area, kecamatan, df),
+        "pie_png": pie_chart_png(df),
+    }
+    if df["SOM"].sum() > 0:
+        bundle["bar_png"] = som_bar_png(df)
+    return bundle
+
+
+def render_all_reports(results, area_kec_info, workers=None):
+    """
+    Render laporan semua kecamatan sekaligus di process pool. Worker menyimpan hasilnya ke
+    cache render di disk (DEFAULT_RENDER_CACHE_DIR), sehingga dashboard dan proses lain
+    tinggal membacanya; render_cache proses ini juga diisi. Kembalikan {kecamatan: bundle}
+    dengan urutan sama seperti results.
+    """
+    area_of = {kec: area for area, kec_list in area_kec_info.items() for kec in kec_list}
+    jobs = [(area_of.get(kec, ""), kec, df) for kec, df in results.items()]
+    if workers == 1 or len(jobs) <= 1:
+        bundles = [render_kecamatan_bundle(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            bundles = list(pool.map(render_kecamatan_bundle, *zip(*jobs)))
+
+    for (area, kec, df), bundle in zip(jobs, bundles):
+        df_hash = hash_dataframe(df)
+        render_cache.put(("pdf", df_hash, area, kec), bundle["pdf"])
+        render_cache.put(("pie", df_hash, UI_DPI), bundle["pie_png"])
+        if "bar_png" in bundle:
+            render_cache.put(("bar", df_hash, UI_DPI), bundle["bar_png"])
+    return {kec: bundle for (_, kec, _), bundle in zip(jobs, bundles)}
@@ -0,0 +1,116 @@
+# results_store.py
+import json
+import os
+import time
+
+import pandas as pd
+
+from utils.ingest_cache import _atomic_write
+
+# Folder default hasil pra-hitung (relatif ke root project)
+DEFAULT_OUTPUT_DIR = "output"
+
+RESULT_COLUMNS = ["area", "kecamatan", "ranking", "kelurahan", "homepass", "ODP", "SAM", "SOM", "kategori_potensi"]
+SUPPORTED_FORMATS = ("parquet", "csv", "json")
+
+
+def results_to_table(results: dict, area_kec_info: dict) -> pd.DataFrame:
+    """Gabungkan dict {kecamatan: DataFrame} menjadi satu tabel panjang dengan kolom area & kecamatan."""
+    area_of = {kec: area for area, kec_list in area_kec_info.items() for kec in kec_list}
+    frames = [df.assign(area=area_of.get(kec), kecamatan=kec) for kec, df in results.items()]
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)[RESULT_COLUMNS]
+
+
+def table_to_results(table: pd.DataFrame) -> dict:
+    """Kebalikan results_to_table: pecah tabel panjang kembali menjadi {kecamatan: DataFrame}."""
+    return {
+        kec: group.drop(columns=["area", "kecamatan"]).reset_index(drop=True)
+        for kec, group in table.groupby("kecamatan", sort=False)
+    }
+
+
+def write_results(analysis: dict, area_kec_info: dict, output_dir: str = DEFAULT_OUTPUT_DIR,
+                  formats=SUPPORTED_FORMATS, meta: dict = None) -> dict:
+    """
+    Tulis hasil run_analysis ke output_dir dalam satu kali jalan:
+    homepass_results.{parquet,csv,json}, diagnostics.json, laporan overlap deduplikasi
+    (dedup_kecamatan.csv, dedup_pairs.csv) jika ada, dan meta.json.
+    Setiap file ditulis lewat file sementara + os.replace (meta.json terakhir), sehingga
+    dashboard/API tidak pernah membaca file setengah jadi.
+    Kembalikan dict {format: path} untuk file yang berhasil ditulis; format yang gagal
+    (mis. pyarrow tidak terpasang untuk parquet) dicatat sebagai diagnostik.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    table = results_to_table(analysis["results"], area_kec_info)
+    diagnostics = list(analysis["diagnostics"])
+    written = {}
+
+    for fmt in formats:
+        path = os.path.join(output_dir, f"homepass_results.{fmt}")
+        try:
+            if fmt == "parquet":
+                _atomic_write(path, lambda fh: table.to_parquet(fh, index=False))
+            elif fmt == "csv":
+                _atomic_write(path, lambda fh: table.to_csv(fh, index=False))
+            elif fmt == "json":
+                _atomic_write(path, lambda fh: table.to_json(fh, orient="records", indent=1, force_ascii=False))
+            else:
+                raise ValueError(f"Format tidak dikenal: {fmt}")
+            written[fmt] = path
+        except (ImportError, ValueError) as e:
+            diagnostics.append({"level": "warning", "kecamatan": None, "file": path,
+                                "message": f"Gagal menulis {fmt}: {e}"})
+
+    diag_data = json.dumps(diagnostics, indent=1, ensure_ascii=False).encode("utf-8")
+    _atomic_write(os.path.join(output_dir, "diagnostics.json"), lambda fh: fh.write(diag_data))
+
+    for name, df in (analysis.get("dedup") or {}).items():
+        path = os.path.join(output_dir, f"dedup_{name}.csv")
+        _atomic_write(path, lambda fh: df.to_csv(fh, index=False))
+        written[f"dedup_{name}"] = path
+
+    full_meta = {"generated_at": time.time(), "formats": sorted(written), **(meta or {})}
+    # meta.json ditulis terakhir sebagai penanda bahwa satu set hasil sudah lengkap
+    data = json.dumps(full_meta, indent=1, ensure_ascii=False).encode("utf-8")
+    _atomic_write(os.path.join(output_dir, "meta.json"), lambda fh: fh.write(data))
+    written["meta"] = os.path.join(output_dir, "meta.json")
+    return written
+
+
+def read_results(output_dir: str = DEFAULT_OUTPUT_DIR):
+    """
+    Baca hasil pra-hitung dari output_dir.
+    Kembalikan {"results", "diagnostics", "meta"} atau None jika belum ada hasil lengkap.
+    """
+    meta_path = os.path.join(output_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as fh:
+        meta = json.load(fh)
+
+    table = None
+    for fmt in ("parquet", "csv", "json"):
+        path = os.path.join(output_dir, f"homepass_results.{fmt}")
+        if fmt not in meta.get("formats", []) or not os.path.exists(path):
+            continue
+        try:
+            if fmt == "parquet":
+                table = pd.read_parquet(path)
+            elif fmt == "csv":
+                table = pd.read_csv(path)
+            else:
+                table = pd.read_json(path, orient="records")
+            break
+        except (ImportError, ValueError):
+            continue
+    if table is None:
+        return None
+
+    diagnostics = []
+    diag_path = os.path.join(output_dir, "diagnostics.json")
+    if os.path.exists(diag_path):
+        with open(diag_path, "r", encoding="utf-8") as fh:
+            diagnostics = json.load(fh)
+    return {"results": table_to_results(table), "diagnostics": diagnostics, "meta": meta}
@@ -0,0 +1,159 @@
+# scenario.py
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Kode kategori potensi hasil sweep (indeks ke KATEGORI_LABELS)
+KATEGORI_LABELS = np.array(["Tidak Ada Potensi", "Low Potential", "High Potential"])
+
+# Batas kira-kira jumlah sel (skenario x kecamatan x kelurahan) per potongan perhitungan,
+# agar memori tetap terbatas untuk grid skenario yang sangat besar
+_MAX_CELLS_PER_CHUNK = 4_000_000
+
+
+def region_arrays(results: dict, area_kec_info: dict) -> dict:
+    """
+    Susun Homepass semua kecamatan menjadi matriks padat (K kecamatan x L kelurahan maks)
+    beserta mask, nama, dan total_odp aktual per kecamatan dari area_kec_info.
+    Kelurahan diurutkan per nama (sama dengan urutan file yang dibaca pipeline).
+    """
+    area_of = {kec: (area, info) for area, kec_list in area_kec_info.items() for kec, info in kec_list.items()}
+    kecamatan = [kec for kec in results if kec in area_of]
+    frames = [results[kec].sort_values("kelurahan", kind="stable") for kec in kecamatan]
+    n_max = max((len(df) for df in frames), default=0)
+
+    homepass = np.zeros((len(kecamatan), n_max), dtype=np.int64)
+    mask = np.zeros((len(kecamatan), n_max), dtype=bool)
+    for k, df in enumerate(frames):
+        homepass[k, :len(df)] = df["homepass"].to_numpy()
+        mask[k, :len(df)] = True
+
+    return {
+        "area": [area_of[kec][0] for kec in kecamatan],
+        "kecamatan": kecamatan,
+        "kelurahan": [df["kelurahan"].tolist() for df in frames],
+        "homepass": homepass,
+        "mask": mask,
+        "total_odp": np.array([area_of[kec][1]["total_odp"] for kec in kecamatan], dtype=np.int64),
+    }
+
+
+def scenario_grid(capacities=(16,), som_rates=(0.3,), budget_factors=(1.0,)) -> pd.DataFrame:
+    """Semua kombinasi (produk kartesius) parameter skenario sebagai DataFrame."""
+    rows = list(itertools.product(capacities, som_rates, budget_factors))
+    return pd.DataFrame(rows, columns=["odp_capacity", "som_rate", "budget_factor"])
+
+
+def _sweep_chunk(homepass, mask, total_odp, capacity, som_rate):
+    """Hitung satu potongan skenario. total_odp (S,K); capacity & som_rate (S,)."""
+    n_kel = homepass.shape[-1]
+    shape = (total_odp.shape[0],) + homepass.shape
+    hp = np.broadcast_to(homepass.astype(np.float64), shape)
+    total_hp = homepass.sum(axis=-1).astype(np.float64)  # (K,)
+    active = (total_odp > 0) & (total_hp > 0)  # (S,K)
+
+    # === Alokasi ODP largest remainder (sama dengan hitung_potensi_kecamatan) ===
+    safe_total_hp = np.where(total_hp > 0, total_hp, 1.0)
+    odp_float = hp / safe_total_hp[None, :, None] * total_odp[:, :, None].astype(np.float64)
+    odp_floor = np.floor(odp_float)
+    sisa = np.where(mask, odp_float - odp_floor, -1.0)  # baris padding selalu paling akhir
+    sisa_odp = total_odp - odp_floor.sum(axis=-1, where=mask).astype(np.int64)  # (S,K)
+
+    # Urutan: sisa terbesar, lalu Homepass terbesar, lalu urutan asli
+    position = np.broadcast_to(np.arange(n_kel), shape)
+    order = np.lexsort((position, -hp, -sisa), axis=-1)
+    rank_sisa = np.empty_like(order)
+    np.put_along_axis(rank_sisa, order, position, axis=-1)
+    bonus = (rank_sisa < sisa_odp[:, :, None]) & mask
+
+    odp = np.where(active[:, :, None] & mask, odp_floor.astype(np.int64) + bonus, 0)
+    sam = odp * np.asarray(capacity, dtype=np.int64)[:, None, None]
+    som = np.round(sam * np.asarray(som_rate, dtype=np.float64)[:, None, None]).astype(np.int64)
+
+    # === Ranking (method='min', SOM terbesar = 1) ===
+    som_key = np.where(mask, som, -1)
+    order = np.argsort(-som_key, axis=-1, kind="stable")
+    sorted_som = np.take_along_axis(som_key, order, axis=-1)
+    new_group = np.ones(shape, dtype=bool)
+    new_group[..., 1:] = sorted_som[..., 1:] != sorted_som[..., :-1]
+    rank_sorted = np.maximum.accumulate(np.where(new_group, position, 0), axis=-1) + 1
+    ranking = np.empty_like(order)
+    np.put_along_axis(ranking, order, rank_sorted, axis=-1)
+    # Jika semua SOM 0, ranking hanya nomor urut
+    position_rank = np.empty_like(order)
+    np.put_along_axis(position_rank, order, position + 1, axis=-1)
+    som_total = som.sum(axis=-1)
+    ranking = np.where(som_total[:, :, None] == 0, position_rank, ranking)
+    ranking = np.where(mask, ranking, 0)
+
+    # === Kategori potensi terhadap rata-rata SOM > 0 per kecamatan ===
+    positive = som > 0
+    n_positive = positive.sum(axis=-1)
+    mean_som = np.where(n_positive > 0, np.where(positive, som, 0).sum(axis=-1) / np.maximum(n_positive, 1), 0.0)
+    high = (som > mean_som[:, :, None]) & (mean_som[:, :, None] > 0)
+    kategori = np.where(high, 2, np.where(positive, 1, 0)).astype(np.int8)
+
+    return {"odp": odp, "sam": sam, "som": som, "ranking": ranking, "kategori": kategori}
+
+
+def sweep_scenarios(region: dict, scenarios: pd.DataFrame, total_odp=None) -> dict:
+    """
+    Hitung ODP/SAM/SOM/ranking/kategori untuk setiap kelurahan x skenario sekaligus (vektor NumPy).
+
+    region: hasil region_arrays. scenarios: DataFrame dengan kolom odp_capacity, som_rate
+    dan budget_factor (pengali total_odp aktual). total_odp opsional (S,K) untuk anggaran
+    ODP eksplisit per skenario dan kecamatan (menggantikan budget_factor).
+    Kembalikan dict berisi array (S,K,L) "odp", "sam", "som", "ranking", "kategori" (kode
+    KATEGORI_LABELS) serta "scenarios" dan "region".
+    """
+    capacity = scenarios["odp_capacity"].to_numpy(dtype=np.int64)
+    som_rate = scenarios["som_rate"].to_numpy(dtype=np.float64)
+    if total_odp is None:
+        factor = scenarios["budget_factor"].to_numpy(dtype=np.float64)
+        total_odp = np.rint(factor[:, None] * region["total_odp"][None, :]).astype(np.int64)
+    total_odp = np.asarray(total_odp, dtype=np.int64)
+
+    homepass, mask = region["homepass"], region["mask"]
+    n_scen = len(scenarios)
+    step = max(1, _MAX_CELLS_PER_CHUNK // max(1, homepass.size))
+    parts = [
+        _sweep_chunk(homepass, mask, total_odp[i:i + step], capacity[i:i + step], som_rate[i:i + step])
+        for i in range(0, n_scen, step)
+    ]
+    out = {
+        name: np.concatenate([p[name] for p in parts]) if parts else np.zeros((0,) + homepass.shape, dtype=np.int64)
+        for name in ("odp", "sam", "som", "ranking", "kategori")
+    }
+    out["total_odp"] = total_odp
+    out["scenarios"] = scenarios.reset_index(drop=True)
+    out["region"] = region
+    return out
+
+
+def scenario_summary(sweep: dict) -> pd.DataFrame:
+    """Ringkasan per skenario: total ODP, SAM, SOM dan jumlah kelurahan High Potential se-region."""
+    summary = sweep["scenarios"].copy()
+    summary["total_odp"] = sweep["total_odp"].sum(axis=1)
+    summary["ODP"] = sweep["odp"].sum(axis=(1, 2))
+    summary["SAM"] = sweep["sam"].sum(axis=(1, 2))
+    summary["SOM"] = sweep["som"].sum(axis=(1, 2))
+    summary["high_potential"] = (sweep["kategori"] == 2).sum(axis=(1, 2))
+    return summary
+
+
+def scenario_kecamatan_table(sweep: dict, scenario_index: int, kecamatan: str) -> pd.DataFrame:
+    """Tabel per kelurahan (format sama dengan hasil process_all_data) untuk satu skenario & kecamatan."""
+    region = sweep["region"]
+    k = region["kecamatan"].index(kecamatan)
+    n = len(region["kelurahan"][k])
+    df = pd.DataFrame({
+        "ranking": sweep["ranking"][scenario_index, k, :n],
+        "kelurahan": region["kelurahan"][k],
+        "homepass": region["homepass"][k, :n],
+        "ODP": sweep["odp"][scenario_index, k, :n],
+        "SAM": sweep["sam"][scenario_index, k, :n],
+        "SOM": sweep["som"][scenario_index, k, :n],
+        "kategori_potensi": KATEGORI_LABELS[sweep["kategori"][scenario_index, k, :n]],
+    })
+    return df.sort_values(["ranking", "kelurahan"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,190 @@
+# snapshots.py
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from utils.dedup import building_keys
+from utils.ingest_cache import _atomic_write
+
+# Riwayat snapshot bukan cache (tidak bisa dibangun ulang dari ekspor lama), jadi di luar .cache/
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+
+SNAPSHOT_VERSION = 1
+
+# Indeks kelurahan digeser ke bit atas agar (kelurahan, kunci bangunan) jadi satu int64
+_KEY_BITS = 40
+
+
+def _encode_keys(keys, offsets):
+    # Kunci terurut per kelurahan -> selisih antar kunci (kecil) -> byte-shuffle -> zlib.
+    # Byte-shuffle mengelompokkan byte atas yang hampir selalu nol, sehingga hasilnya beberapa KB
+    starts = offsets[:-1][np.diff(offsets) > 0]
+    deltas = np.diff(keys, prepend=0)
+    deltas[starts] = keys[starts]
+    shuffled = deltas.astype("<i8").view(np.uint8).reshape(-1, 8).T
+    return zlib.compress(np.ascontiguousarray(shuffled).tobytes(), 6)
+
+
+def _decode_keys(blob, offsets):
+    raw = np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
+    deltas = np.ascontiguousarray(raw.reshape(8, -1).T).view("<i8").ravel().astype(np.int64)
+    if not deltas.size:
+        return deltas
+    # Cumsum per kelurahan: cumsum global dikurangi total sebelum awal kelurahan
+    kel_of_row = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    total = np.cumsum(deltas)
+    start_total = np.concatenate([[0], total])[offsets[:-1]]
+    return total - start_total[kel_of_row]
+
+
+def build_snapshot(buildings: dict) -> dict:
+    """
+    Ringkas tabel bangunan (analysis.load_buildings) menjadi array kunci osm_id terurut dan
+    unik per kelurahan (utils.dedup.building_keys) beserta offset-nya. Bangunan tanpa osm_id
+    tidak bisa dilacak antar ekspor, sehingga hanya dihitung di kolom "tanpa_id".
+    """
+    kel = buildings["kelurahan"][["area", "kecamatan", "kelurahan"]].reset_index(drop=True)
+    keys = building_keys(buildings["osm_id"], buildings["osm_type"])
+    kel_id = np.asarray(buildings["kelurahan_id"], dtype=np.int64)
+    valid = keys >= 0
+    # Kunci >= 2**_KEY_BITS (osm_id >= 2**38) akan menimpa bit indeks kelurahan dan diam-diam
+    # menggabungkan bangunan berbeda, jadi ditolak
+    if valid.any() and keys[valid].max() >= 1 << _KEY_BITS:
+        raise ValueError(f"osm_id terlalu besar untuk snapshot (kunci bangunan harus < 2**{_KEY_BITS}, "
+                         f"osm_id < 2**{_KEY_BITS - 2}); naikkan _KEY_BITS dan SNAPSHOT_VERSION")
+    if len(kel) and len(kel) - 1 >= 1 << (63 - _KEY_BITS):
+        raise ValueError(f"Terlalu banyak kelurahan untuk snapshot ({len(kel)})")
+    combined = np.unique((kel_id[valid] << _KEY_BITS) | keys[valid])
+    counts = np.bincount(combined >> _KEY_BITS, minlength=len(kel))
+    kel = kel.assign(tanpa_id=np.bincount(kel_id[~valid], minlength=len(kel)))
+    return {
+        "kelurahan": kel,
+        "keys": combined & ((1 << _KEY_BITS) - 1),
+        "offsets": np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+    }
+
+
+def write_snapshot(snapshot: dict, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, meta: dict = None) -> str:
+    """Simpan snapshot sebagai satu file .npz (kunci terkompresi) dan kembalikan path-nya."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    created_at = time.time()
+    snapshot_id = time.strftime("%Y%m%dT%H%M%S", time.localtime(created_at)) + f".{int(created_at * 1000) % 1000:03d}"
+    full_meta = {
+        "version": SNAPSHOT_VERSION,
+        "id": snapshot_id,
+        "created_at": created_at,
+        "n_buildings": int(len(snapshot["keys"]) + snapshot["kelurahan"]["tanpa_id"].sum()),
+        "kelurahan": snapshot["kelurahan"].to_dict(orient="records"),
+        **(meta or {}),
+    }
+    path = os.path.join(snapshot_dir, f"snapshot-{snapshot_id}.npz")
+    _atomic_write(path, lambda fh: np.savez(
+        fh,
+        keys=np.frombuffer(_encode_keys(snapshot["keys"], snapshot["offsets"]), dtype=np.uint8),
+        offsets=snapshot["offsets"],
+        meta=np.frombuffer(json.dumps(full_meta, ensure_ascii=False, default=int).encode("utf-8"), dtype=np.uint8),
+    ), suffix=".npz")
+    return path
+
+
+def take_snapshot(buildings: dict, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, meta: dict = None,
+                  force: bool = False):
+    """
+    Catat snapshot hasil ingestion. Dilewati (kembalikan None) jika data_fingerprint di meta
+    sama dengan snapshot terakhir, kecuali force=True.
+    """
+    fingerprint = (meta or {}).get("data_fingerprint")
+    existing = list_snapshots(snapshot_dir)
+    if not force and fingerprint and len(existing) and existing["data_fingerprint"].iloc[-1] == fingerprint:
+        return None
+    return write_snapshot(build_snapshot(buildings), snapshot_dir, meta)
+
+
+def load_snapshot(path: str) -> dict:
+    """Baca snapshot: {"meta", "kelurahan", "keys", "offsets"}."""
+    with np.load(path) as npz:
+        meta = json.loads(npz["meta"].tobytes().decode("utf-8"))
+        offsets = npz["offsets"]
+        keys = _decode_keys(npz["keys"].tobytes(), offsets)
+    return {"meta": meta, "kelurahan": pd.DataFrame(meta["kelurahan"]), "keys": keys, "offsets": offsets}
+
+
+def list_snapshots(snapshot_dir: str = DEFAULT_SNAPSHOT_DIR) -> pd.DataFrame:
+    """Daftar snapshot (lama ke baru): id, created_at, label, n_buildings, data_fingerprint, path."""
+    rows = []
+    if os.path.isdir(snapshot_dir):
+        for name in sorted(os.listdir(snapshot_dir)):
+            if not (name.startswith("snapshot-") and name.endswith(".npz")):
+                continue
+            path = os.path.join(snapshot_dir, name)
+            try:
+                with np.load(path) as npz:
+                    meta = json.loads(npz["meta"].tobytes().decode("utf-8"))
+            except (OSError, ValueError, KeyError):
+                continue
+            rows.append({"id": meta["id"], "created_at": meta["created_at"], "label": meta.get("label") or "",
+                         "n_buildings": meta["n_buildings"], "data_fingerprint": meta.get("data_fingerprint"),
+                         "path": path})
+    return pd.DataFrame(rows, columns=["id", "created_at", "label", "n_buildings", "data_fingerprint", "path"])
+
+
+def _combined(snapshot, kel_index):
+    # (indeks kelurahan gabungan << _KEY_BITS) | kunci; sudah terurut jika urutan kelurahan sama
+    names = pd.MultiIndex.from_frame(snapshot["kelurahan"][["kecamatan", "kelurahan"]])
+    position = kel_index.get_indexer(names).astype(np.int64)
+    combined = (np.repeat(position, np.diff(snapshot["offsets"])) << _KEY_BITS) | snapshot["keys"]
+    return combined if (np.diff(position) > 0).all() else np.sort(combined)
+
+
+def _difference(a, b):
+    # Elemen a yang tidak ada di b; keduanya terurut & unik, jadi cukup searchsorted (tanpa sort ulang)
+    if not b.size:
+        return a
+    idx = np.minimum(np.searchsorted(b, a), b.size - 1)
+    return a[b[idx] != a]
+
+
+def diff_snapshots(old: dict, new: dict) -> pd.DataFrame:
+    """
+    Bangunan ditambah/dihapus per kelurahan antara dua snapshot, dengan operasi himpunan
+    vektor (searchsorted di atas array int64 terurut) tanpa membaca GeoJSON lama.
+    Bangunan yang pindah kelurahan terhitung dihapus di kelurahan lama dan ditambah di yang baru.
+    Kolom: area, kecamatan, kelurahan, sebelum, sesudah, ditambah, dihapus, selisih.
+    """
+    kel = pd.concat([old["kelurahan"], new["kelurahan"]])[["area", "kecamatan", "kelurahan"]]
+    kel = kel.drop_duplicates(["kecamatan", "kelurahan"]).reset_index(drop=True)
+    kel_index = pd.MultiIndex.from_frame(kel[["kecamatan", "kelurahan"]])
+    old_keys, new_keys = _combined(old, kel_index), _combined(new, kel_index)
+
+    added = _difference(new_keys, old_keys) >> _KEY_BITS
+    removed = _difference(old_keys, new_keys) >> _KEY_BITS
+    n = len(kel)
+    out = kel.assign(
+        sebelum=np.bincount(old_keys >> _KEY_BITS, minlength=n),
+        sesudah=np.bincount(new_keys >> _KEY_BITS, minlength=n),
+        ditambah=np.bincount(added, minlength=n),
+        dihapus=np.bincount(removed, minlength=n),
+    )
+    out["selisih"] = out["sesudah"] - out["sebelum"]
+    return out
+
+
+def growth_table(snapshot_dir: str = DEFAULT_SNAPSHOT_DIR) -> pd.DataFrame:
+    """
+    Jumlah bangunan ber-osm_id per kelurahan untuk setiap snapshot (format panjang):
+    id, created_at, area, kecamatan, kelurahan, homepass. Hanya membaca offset & meta.
+    """
+    frames = []
+    for row in list_snapshots(snapshot_dir).itertuples():
+        with np.load(row.path) as npz:
+            meta = json.loads(npz["meta"].tobytes().decode("utf-8"))
+            counts = np.diff(npz["offsets"])
+        kel = pd.DataFrame(meta["kelurahan"])[["area", "kecamatan", "kelurahan"]]
+        frames.append(kel.assign(id=row.id, created_at=row.created_at, homepass=counts))
+    if not frames:
+        return pd.DataFrame(columns=["id", "created_at", "area", "kecamatan", "kelurahan", "homepass"])
+    return pd.concat(frames, ignore_index=True)[["id", "created_at", "area", "kecamatan", "kelurahan", "homepass"]]
@@ -0,0 +1,129 @@
+# spatial.py
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# Jumlah titik query per potongan agar array pasangan kandidat tetap kecil
+_QUERY_CHUNK = 50_000
+
+
+def to_local_xy(lon, lat, lat0=None, lon0=None):
+    """
+    Proyeksi equirectangular lon/lat (derajat) ke meter di sekitar (lon0, lat0).
+    Cukup akurat untuk jarak pendek (drop cable) di skala satu kabupaten.
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    if lat0 is None:
+        lat0 = float(np.nanmean(lat)) if lat.size else 0.0
+    if lon0 is None:
+        lon0 = float(np.nanmean(lon)) if lon.size else 0.0
+    scale = np.pi / 180 * EARTH_RADIUS_M
+    x = (lon - lon0) * scale * np.cos(np.radians(lat0))
+    y = (lat - lat0) * scale
+    return x, y
+
+
+def from_local_xy(x, y, lat0, lon0):
+    """Kebalikan to_local_xy."""
+    scale = np.pi / 180 * EARTH_RADIUS_M
+    lon = np.asarray(x, dtype=np.float64) / (scale * np.cos(np.radians(lat0))) + lon0
+    lat = np.asarray(y, dtype=np.float64) / scale + lat0
+    return lon, lat
+
+
+class GridIndex:
+    """
+    Indeks spasial grid seragam untuk titik 2D (meter), pengganti STRtree untuk titik.
+
+    Titik diurutkan berdasarkan kunci sel sehingga isi satu sel adalah potongan array
+    yang bersebelahan; query radius hanya memeriksa sel tetangga dan seluruhnya
+    dikerjakan vektor (searchsorted + repeat), tanpa loop Python per titik.
+    """
+
+    def __init__(self, x, y, cell_size):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.cell_size = float(cell_size)
+        if self.x.size:
+            self.x_min, self.y_min = self.x.min(), self.y.min()
+            cx, cy = self._cells(self.x, self.y)
+            self.n_cols = int(cy.max()) + 1
+        else:
+            self.x_min = self.y_min = 0.0
+            cx = cy = np.zeros(0, dtype=np.int64)
+            self.n_cols = 1
+        keys = cx * self.n_cols + cy
+        self.order = np.argsort(keys, kind="stable")
+        self.cell_keys, self.cell_start, self.cell_count = np.unique(
+            keys[self.order], return_index=True, return_counts=True
+        )
+
+    def __len__(self):
+        return self.x.size
+
+    def _cells(self, x, y):
+        cx = np.floor((x - self.x_min) / self.cell_size).astype(np.int64)
+        cy = np.floor((y - self.y_min) / self.cell_size).astype(np.int64)
+        return cx, cy
+
+    def _query_chunk(self, qx, qy, radius, offset):
+        reach = int(np.ceil(radius / self.cell_size))
+        steps = np.arange(-reach, reach + 1)
+        ddx, ddy = np.meshgrid(steps, steps, indexing="ij")
+        qcx, qcy = self._cells(qx, qy)
+        ncx = (qcx[:, None] + ddx.ravel()[None, :]).ravel()
+        ncy = (qcy[:, None] + ddy.ravel()[None, :]).ravel()
+        q_of_cell = np.repeat(np.arange(qx.size), ddx.size)
+
+        valid = (ncx >= 0) & (ncy >= 0) & (ncy < self.n_cols)
+        keys = ncx[valid] * self.n_cols + ncy[valid]
+        q_of_cell = q_of_cell[valid]
+        pos = np.searchsorted(self.cell_keys, keys)
+        pos_c = np.minimum(pos, max(self.cell_keys.size - 1, 0))
+        found = (pos < self.cell_keys.size) & (self.cell_keys[pos_c] == keys) if self.cell_keys.size else np.zeros(keys.size, bool)
+        pos, q_of_cell = pos[found], q_of_cell[found]
+
+        counts = self.cell_count[pos]
+        total = int(counts.sum())
+        query_idx = np.repeat(q_of_cell, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        point_idx = self.order[np.repeat(self.cell_start[pos], counts) + within]
+
+        dist = np.hypot(self.x[point_idx] - qx[query_idx], self.y[point_idx] - qy[query_idx])
+        keep = dist <= radius
+        return query_idx[keep] + offset, point_idx[keep], dist[keep]
+
+    def query_radius(self, qx, qy, radius):
+        """
+        Semua pasangan (query, titik) dengan jarak <= radius.
+        Kembalikan (query_idx, point_idx, dist) sebagai array sejajar.
+        """
+        qx = np.asarray(qx, dtype=np.float64)
+        qy = np.asarray(qy, dtype=np.float64)
+        if not len(self) or not qx.size:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        parts = [
+            self._query_chunk(qx[i:i + _QUERY_CHUNK], qy[i:i + _QUERY_CHUNK], radius, i)
+            for i in range(0, qx.size, _QUERY_CHUNK)
+        ]
+        return tuple(np.concatenate(arrs) for arrs in zip(*parts))
+
+    def nearest(self, qx, qy, max_distance):
+        """
+        Titik terdekat untuk setiap query dalam max_distance.
+        Kembalikan (point_idx, dist); -1 dan inf jika tidak ada titik dalam jangkauan.
+        """
+        qx = np.asarray(qx, dtype=np.float64)
+        query_idx, point_idx, dist = self.query_radius(qx, qy, max_distance)
+        nearest_idx = np.full(qx.size, -1, dtype=np.int64)
+        nearest_dist = np.full(qx.size, np.inf)
+        if query_idx.size:
+            order = np.lexsort((point_idx, dist, query_idx))
+            first = np.ones(order.size, dtype=bool)
+            first[1:] = query_idx[order][1:] != query_idx[order][:-1]
+            sel = order[first]
+            nearest_idx[query_idx[sel]] = point_idx[sel]
+            nearest_dist[query_idx[sel]] = dist[sel]
+        return nearest_idx, nearest_dist
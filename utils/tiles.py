@@ -0,0 +1,149 @@
+# tiles.py
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.dedup import building_keys, deduplicate
+from utils.ingest_cache import _atomic_write
+from utils.spatial import from_local_xy, to_local_xy
+
+# Ukuran sel grid per level (meter), kasar ke halus; tiap level membagi dua sel level sebelumnya
+TILE_LEVELS_M = (8000, 4000, 2000, 1000, 500, 250, 125)
+# Batas jumlah sel yang dikirim ke browser per tampilan peta
+DEFAULT_MAX_CELLS = 3000
+
+TILES_FILE = "tiles.parquet"
+TILES_META_FILE = "tiles_meta.json"
+
+TILE_COLUMNS = ["level", "cell_size_m", "ix", "iy", "lon", "lat", "area", "kecamatan", "homepass", "SAM", "SOM"]
+
+
+def _cell_origin(buildings):
+    # Titik acuan grid dibulatkan agar sel tetap sama meski data bertambah sedikit
+    lat = np.asarray(buildings["lat"], dtype=np.float64)
+    lon = np.asarray(buildings["lon"], dtype=np.float64)
+    if not np.isfinite(lat).any():
+        return 0.0, 0.0
+    return round(float(np.nanmean(lat)), 1), round(float(np.nanmean(lon)), 1)
+
+
+def build_tiles(buildings: dict, results: dict = None, served=None, som_rate: float = 0.3,
+                levels=TILE_LEVELS_M) -> dict:
+    """
+    Agregasi centroid bangunan (load_buildings / CentroidStore.buildings) ke grid persegi
+    multi-resolusi, dihitung per level dan per kecamatan sepenuhnya dengan NumPy.
+
+    Bangunan duplikat antar file (osm_id sama) dihitung sekali. Overlay SAM/SOM per sel:
+      - dari `served` (mask per bangunan hasil utils.coverage.compute_coverage) jika diberikan,
+        SAM = bangunan terlayani ODP dan SOM = SAM * som_rate;
+      - selain itu dari `results` (hasil run_analysis): SAM/SOM kelurahan dibagi rata ke
+        bangunannya, lalu dijumlahkan per sel.
+    Kembalikan dict {"cells": DataFrame (TILE_COLUMNS), "lat0", "lon0", "levels"}; lon/lat
+    sel adalah sudut barat daya (sesuai GridCellLayer pydeck).
+    """
+    lat0, lon0 = _cell_origin(buildings)
+    lon = np.asarray(buildings["lon"], dtype=np.float64)
+    lat = np.asarray(buildings["lat"], dtype=np.float64)
+    keep = np.isfinite(lon) & np.isfinite(lat)
+    if lon.size:
+        keep &= deduplicate([building_keys(buildings["osm_id"], buildings["osm_type"])])[0][0]
+    rows = np.flatnonzero(keep)
+
+    kel = buildings["kelurahan"].reset_index(drop=True)
+    kel_id = np.asarray(buildings["kelurahan_id"], dtype=np.int64)[rows]
+    kecamatan_names = np.array(list(dict.fromkeys(kel["kecamatan"])), dtype=object)
+    kec_of_kel = pd.Index(kecamatan_names).get_indexer(kel["kecamatan"])
+    area_of_kec = kel.drop_duplicates("kecamatan").set_index("kecamatan")["area"].reindex(kecamatan_names).to_numpy()
+    kec_id = kec_of_kel[kel_id] if rows.size else np.zeros(0, dtype=np.int64)
+
+    if served is not None:
+        sam_w = np.asarray(served, dtype=np.float64)[rows]
+        som_w = sam_w * som_rate
+    else:
+        sam_w = np.zeros(rows.size)
+        som_w = np.zeros(rows.size)
+        if results:
+            unique_hp = np.bincount(kel_id, minlength=len(kel)).astype(np.float64)
+            sam_kel = np.zeros(len(kel))
+            som_kel = np.zeros(len(kel))
+            for i, (kec, name) in enumerate(zip(kel["kecamatan"], kel["kelurahan"])):
+                df = results.get(kec)
+                if df is not None:
+                    match = df.loc[df["kelurahan"] == name]
+                    if len(match):
+                        sam_kel[i], som_kel[i] = match["SAM"].iloc[0], match["SOM"].iloc[0]
+            share = np.divide(1.0, unique_hp, out=np.zeros(len(kel)), where=unique_hp > 0)
+            sam_w = (sam_kel * share)[kel_id]
+            som_w = (som_kel * share)[kel_id]
+
+    x, y = to_local_xy(lon[rows], lat[rows], lat0, lon0)
+    frames = []
+    for level, size in enumerate(levels):
+        ix = np.floor(x / size).astype(np.int64)
+        iy = np.floor(y / size).astype(np.int64)
+        cells, inverse = np.unique(np.stack([ix, iy, kec_id]), axis=1, return_inverse=True)
+        inverse = inverse.ravel()
+        n = cells.shape[1]
+        corner_lon, corner_lat = from_local_xy(cells[0] * size, cells[1] * size, lat0, lon0)
+        frames.append(pd.DataFrame({
+            "level": level,
+            "cell_size_m": float(size),
+            "ix": cells[0],
+            "iy": cells[1],
+            "lon": corner_lon,
+            "lat": corner_lat,
+            "area": area_of_kec[cells[2]] if n else [],
+            "kecamatan": kecamatan_names[cells[2]] if n else [],
+            "homepass": np.bincount(inverse, minlength=n),
+            "SAM": np.round(np.bincount(inverse, weights=sam_w, minlength=n), 2),
+            "SOM": np.round(np.bincount(inverse, weights=som_w, minlength=n), 2),
+        }))
+    cells = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TILE_COLUMNS)
+    return {"cells": cells[TILE_COLUMNS], "lat0": lat0, "lon0": lon0, "levels": [float(s) for s in levels]}
+
+
+def select_tiles(tiles: dict, area: str = None, kecamatan=None, max_cells: int = DEFAULT_MAX_CELLS) -> pd.DataFrame:
+    """
+    Pilih level paling halus yang jumlah selnya <= max_cells untuk tampilan (area dan/atau
+    daftar kecamatan), sehingga ukuran payload peta tetap terbatas di level zoom manapun.
+    Tampilan beberapa kecamatan menjumlahkan sel yang sama lintas kecamatan.
+    """
+    cells = tiles["cells"]
+    if area is not None:
+        cells = cells[cells["area"] == area]
+    if kecamatan is not None:
+        cells = cells[cells["kecamatan"].isin([kecamatan] if isinstance(kecamatan, str) else list(kecamatan))]
+    merged = cells.groupby(["level", "cell_size_m", "ix", "iy", "lon", "lat"], as_index=False)[["homepass", "SAM", "SOM"]].sum()
+    per_level = merged.groupby("level").size()
+    fitting = per_level[per_level <= max_cells]
+    level = int(fitting.index.max()) if len(fitting) else int(per_level.index.min()) if len(per_level) else 0
+    return merged[merged["level"] == level].reset_index(drop=True)
+
+
+def write_tiles(tiles: dict, output_dir: str, meta: dict = None) -> str:
+    """
+    Tulis piramida sel ke output_dir/tiles.parquet beserta tiles_meta.json (ditulis terakhir),
+    keduanya lewat file sementara + os.replace agar aplikasi tidak membaca tile terpotong.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, TILES_FILE)
+    _atomic_write(path, lambda fh: tiles["cells"].to_parquet(fh, index=False))
+    full_meta = {"generated_at": time.time(), "lat0": tiles["lat0"], "lon0": tiles["lon0"],
+                 "levels": tiles["levels"], **(meta or {})}
+    data = json.dumps(full_meta, indent=1, ensure_ascii=False).encode("utf-8")
+    _atomic_write(os.path.join(output_dir, TILES_META_FILE), lambda fh: fh.write(data))
+    return path
+
+
+def read_tiles(output_dir: str):
+    """Baca piramida sel hasil write_tiles, atau None jika belum ada / tidak lengkap."""
+    try:
+        with open(os.path.join(output_dir, TILES_META_FILE), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        cells = pd.read_parquet(os.path.join(output_dir, TILES_FILE))
+    except (OSError, ValueError, ImportError):
+        return None
+    return {"cells": cells, "lat0": meta["lat0"], "lon0": meta["lon0"], "levels": meta["levels"], "meta": meta}
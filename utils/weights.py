@@ -0,0 +1,59 @@
+# weights.py
+import json
+import os
+
+import numpy as np
+
+# Model bobot Homepass default (unit rumah tangga per tag building, per lantai, dan pengecualian)
+DEFAULT_WEIGHTS_PATH = os.path.join("config", "homepass_weights.json")
+
+
+def load_weights(path: str = DEFAULT_WEIGHTS_PATH) -> dict:
+    """
+    Baca model bobot Homepass dari JSON. Kunci yang dipakai:
+      default_units      unit rumah tangga untuk tag building yang tidak terdaftar, termasuk
+                         footprint tanpa nilai building (sebagian besar data OSM di sini)
+      building_units     {tag building: unit} untuk bangunan 1 lantai
+      units_per_level    {tag building: unit tambahan per lantai di atas lantai pertama}
+      max_levels         batas atas building:levels (menahan nilai tag yang salah ketik)
+      exclude_buildings  tag building yang jelas non-hunian (bobot 0)
+      exclude_amenities  tag amenity non-hunian (bobot 0, mis. masjid bertag building=yes)
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        model = json.load(fh)
+    model.setdefault("default_units", 1.0)
+    for key in ("building_units", "units_per_level"):
+        model.setdefault(key, {})
+    for key in ("exclude_buildings", "exclude_amenities"):
+        model.setdefault(key, [])
+    return model
+
+
+def _category_lookup(categories, mapping, default):
+    return np.array([mapping.get(str(c), default) for c in categories], dtype=np.float64)
+
+
+def homepass_weights(columns: dict, model: dict) -> np.ndarray:
+    """
+    Bobot Homepass (unit rumah tangga) per bangunan dari kolom read_feature_columns.
+    Dihitung lewat tabel per kategori (puluhan nilai) lalu diindeks dengan kode per bangunan,
+    sehingga tidak ada loop Python per feature:
+        unit = building_units[tag] + units_per_level[tag] * (lantai - 1)
+    dengan bobot 0 untuk tag building/amenity yang dikecualikan.
+    """
+    if not len(columns["osm_id"]):
+        return np.zeros(0, dtype=np.float64)
+    building_cats = columns["building_categories"]
+    base = _category_lookup(building_cats, model["building_units"], float(model["default_units"]))
+    per_level = _category_lookup(building_cats, model["units_per_level"], 0.0)
+    excluded = np.isin(building_cats.astype(str), list(model["exclude_buildings"]))
+
+    code = columns["building_code"].astype(np.int64)
+    levels = np.nan_to_num(columns["levels"].astype(np.float64), nan=1.0)
+    levels = np.clip(levels, 1.0, float(model.get("max_levels", 30)))
+    weights = base[code] + per_level[code] * (levels - 1.0)
+    weights[excluded[code]] = 0.0
+
+    amenity_excluded = np.isin(columns["amenity_categories"].astype(str), list(model["exclude_amenities"]))
+    weights[amenity_excluded[columns["amenity_code"].astype(np.int64)]] = 0.0
+    return weights